@@ -0,0 +1,231 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Adapters allowing :mod:`asyncio` coroutines to await messages delivered to a
+:class:`mitogen.core.Receiver` or :class:`mitogen.select.Select`, such as the
+result of :meth:`Context.call_async <mitogen.parent.Context.call_async>`.
+
+Messages are handed to each event loop by a :class:`Bridge`, which wakes the
+loop from the broker thread at most once for every batch of messages that
+arrive before the loop runs, rather than dedicating a thread to each pending
+call. This module has no dependency on :mod:`asyncio` until it is used, so it
+remains importable by targets lacking it.
+"""
+
+import collections
+import sys
+import threading
+import weakref
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+import mitogen.core
+
+
+_bridge_by_loop = weakref.WeakKeyDictionary()
+_bridge_lock = threading.Lock()
+
+
+def _get_loop():
+    try:
+        return asyncio.get_running_loop()
+    except (AttributeError, RuntimeError):
+        # Python <3.7, or not called from a coroutine.
+        return asyncio.get_event_loop()
+
+
+def get_bridge(loop=None):
+    """
+    Return the :class:`Bridge` for `loop`, creating it if necessary.
+
+    :param loop:
+        Event loop, or :data:`None` for the running or current loop.
+    """
+    if loop is None:
+        loop = _get_loop()
+    _bridge_lock.acquire()
+    try:
+        bridge = _bridge_by_loop.get(loop)
+        if bridge is None:
+            bridge = Bridge(loop)
+            _bridge_by_loop[loop] = bridge
+        return bridge
+    finally:
+        _bridge_lock.release()
+
+
+class Bridge(object):
+    """
+    Complete futures awaiting messages from receivers and selects on the
+    thread running one event loop.
+
+    Each source a future is waiting on has its `notify` attribute pointed at
+    the bridge while any future is waiting on it. Notifications are recorded
+    on the broker thread, and the loop is woken by one
+    :meth:`call_soon_threadsafe <asyncio.loop.call_soon_threadsafe>` for all
+    that arrive before it next runs.
+    """
+    def __init__(self, loop):
+        self.loop = loop
+        self._lock = threading.Lock()
+        # Sources notified since the last drain, and whether a drain is
+        # already scheduled. Guarded by _lock.
+        self._ready = []
+        self._scheduled = False
+        # Source -> deque of (future, stop_on, transform). Loop thread only.
+        self._waiters = {}
+
+    def __repr__(self):
+        return 'Bridge(%r)' % (self.loop,)
+
+    def _notify(self, source):
+        """
+        Called from any thread each time `source` receives a message.
+        """
+        self._lock.acquire()
+        try:
+            self._ready.append(source)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        finally:
+            self._lock.release()
+
+        try:
+            self.loop.call_soon_threadsafe(self._drain)
+        except RuntimeError:
+            # The loop was closed, nothing remains to wake.
+            pass
+
+    def _drain(self):
+        self._lock.acquire()
+        try:
+            ready = self._ready
+            self._ready = []
+            self._scheduled = False
+        finally:
+            self._lock.release()
+
+        seen = set()
+        for source in ready:
+            if source not in seen:
+                seen.add(source)
+                self._deliver(source)
+
+    def _deliver(self, source):
+        """
+        Complete as many futures waiting on `source` as it has messages for.
+        """
+        waiters = self._waiters.get(source)
+        while waiters:
+            fut, stop_on, transform = waiters[0]
+            if fut.done():
+                # Cancelled by its caller.
+                waiters.popleft()
+                continue
+            try:
+                result = source.get(block=False)
+            except mitogen.core.TimeoutError:
+                break
+            except Exception:
+                e = sys.exc_info()[1]
+                waiters.popleft()
+                if stop_on and isinstance(e, stop_on):
+                    e = StopAsyncIteration()
+                fut.set_exception(e)
+                continue
+
+            waiters.popleft()
+            if transform is None:
+                fut.set_result(result)
+                continue
+            try:
+                fut.set_result(transform(result))
+            except Exception:
+                fut.set_exception(sys.exc_info()[1])
+
+        if not waiters and source in self._waiters:
+            del self._waiters[source]
+            source.notify = None
+
+    def wait(self, source, stop_on=None, transform=None):
+        """
+        Return a future completed with the next message from `source`. Must
+        be called on the loop's thread.
+
+        :param source:
+            :class:`mitogen.core.Receiver` or :class:`mitogen.select.Select`.
+            It must not be a member of a select.
+        :param stop_on:
+            If not :data:`None`, exception class raised by `source` that
+            instead completes the future with :class:`StopAsyncIteration`.
+        :param transform:
+            If not :data:`None`, function applied to the message, whose
+            result or exception completes the future instead.
+        """
+        fut = self.loop.create_future()
+        waiters = self._waiters.get(source)
+        if waiters is None:
+            if source.notify is not None:
+                raise mitogen.core.Error(
+                    '%r already has a notify function, it may be a member '
+                    'of a Select' % (source,)
+                )
+            waiters = collections.deque()
+            self._waiters[source] = waiters
+            source.notify = self._notify
+
+        waiters.append((fut, stop_on, transform))
+        # A message may have arrived before notify was set.
+        self._deliver(source)
+        return fut
+
+
+def get(source, loop=None):
+    """
+    Return a future completed with the next :class:`mitogen.core.Message`
+    from the receiver or select `source`, or the exception its
+    :meth:`get` raises. Awaiting a receiver or select is equivalent.
+    """
+    return get_bridge(loop).wait(source)
+
+
+def _unpickle(msg):
+    return msg.unpickle(throw_dead=False)
+
+
+def call(context, fn, *args, **kwargs):
+    """
+    Like :meth:`Context.call <mitogen.parent.Context.call>`, but return a
+    future completed with the function's return value, or
+    :class:`mitogen.core.CallError`.
+
+    :param context:
+        :class:`mitogen.parent.Context` or :class:`mitogen.parent.CallChain`.
+    """
+    recv = context.call_async(fn, *args, **kwargs)
+    return get_bridge().wait(recv, transform=_unpickle)
+
+
+class Iterator(object):
+    """
+    Asynchronous iterator returned by the `__aiter__` methods of
+    :class:`mitogen.core.Receiver` and :class:`mitogen.select.Select`,
+    yielding messages until the source is empty or raises `stop_on`.
+    """
+    def __init__(self, source, stop_on=None):
+        self.source = source
+        self.stop_on = stop_on
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        if not self.source:
+            raise StopAsyncIteration()
+        return get_bridge().wait(self.source, stop_on=self.stop_on)
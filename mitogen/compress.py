@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Compression of message bodies sent on a stream, enabled by the
+`stream_compression` connection option. Each end of such a stream assigns a
+:class:`Compressor` to :attr:`mitogen.core.MitogenProtocol.compressor`.
+Decompression is part of :mod:`mitogen.core`, so any context accepts
+compressed frames regardless.
+"""
+
+import zlib
+
+import mitogen.core
+
+
+class Compressor(object):
+    """
+    Compress bodies sent on one stream, and count bodies sent and received
+    compressed.
+
+    :param int level:
+        :mod:`zlib` compression level.
+    """
+    #: Bodies shorter than this are never compressed.
+    threshold = 1024
+
+    #: Bodies longer than this have a prefix of this many bytes test
+    #: compressed first, so incompressible data is skipped cheaply.
+    sample = 16384
+
+    #: A body is sent compressed only if its compressed size, or that of its
+    #: sample prefix, is at most this fraction of the original size.
+    max_ratio = 0.9
+
+    def __init__(self, level):
+        self.level = level
+        #: Count of bodies sent compressed.
+        self.tx_compressed_count = 0
+        #: Total size of bodies sent compressed, before compression.
+        self.tx_compressed_in = 0
+        #: Total size of bodies sent compressed, after compression.
+        self.tx_compressed_out = 0
+        #: Count of bodies above :attr:`threshold` sent raw since they did not
+        #: compress.
+        self.tx_incompressible_count = 0
+        #: Total size of compressed bodies received, before decompression.
+        self.rx_compressed_in = 0
+        #: Total size of compressed bodies received, after decompression.
+        self.rx_compressed_out = 0
+
+    def __repr__(self):
+        return 'Compressor(%r)' % (self.level,)
+
+    def compress(self, payload):
+        """
+        Return `payload` compressed at :attr:`level`, or :data:`None` if it
+        does not compress well enough to be worthwhile.
+        """
+        size = len(payload)
+        if size > self.sample:
+            sample = payload[:self.sample]
+            if len(zlib.compress(sample, self.level)) > \
+               (len(sample) * self.max_ratio):
+                return None
+
+        z = zlib.compress(payload, self.level)
+        if len(z) > (size * self.max_ratio):
+            return None
+        return z
+
+    def encode(self, msg, payload):
+        """
+        Return `(enc, body)` describing how `msg` having body `payload` should
+        appear on the wire, compressing the body when worthwhile.
+        """
+        if len(payload) >= self.threshold:
+            z = self.compress(payload)
+            if z is not None:
+                self.tx_compressed_count += 1
+                self.tx_compressed_in += len(payload)
+                self.tx_compressed_out += len(z)
+                return msg.enc | mitogen.core.Message.ENC_ZLIB, z
+            self.tx_incompressible_count += 1
+        return msg.enc, payload
+
+    def get_stats(self):
+        """
+        Return a dict describing body compression on the stream, with the
+        counter attributes of the same name, and the ratios
+        `tx_compression_ratio` and `rx_compression_ratio` of compressed to
+        original size, or :data:`None` when nothing was compressed.
+        """
+        stats = {}
+        for name in ('tx_compressed_count', 'tx_compressed_in',
+                     'tx_compressed_out', 'tx_incompressible_count',
+                     'rx_compressed_in', 'rx_compressed_out'):
+            stats[name] = getattr(self, name)
+        stats['tx_compression_ratio'] = None
+        if self.tx_compressed_in:
+            stats['tx_compression_ratio'] = (
+                float(self.tx_compressed_out) / self.tx_compressed_in
+            )
+        stats['rx_compression_ratio'] = None
+        if self.rx_compressed_out:
+            stats['rx_compression_ratio'] = (
+                float(self.rx_compressed_in) / self.rx_compressed_out
+            )
+        return stats
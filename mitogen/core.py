@@ -120,6 +120,11 @@ if sys.version_info >= (3, 0):
         def __init__(self, file, find_class=find_deny):
             self.find_class = find_class
             super().__init__(file, encoding='bytes')
+    def unpickler_factory(find_class):
+        class FactoryUnpickler(_Unpickler):
+            pass
+        FactoryUnpickler.find_class = staticmethod(find_class)
+        return lambda file: FactoryUnpickler(file, encoding='bytes')
 else:
     from cPickle import PicklingError, Unpickler as _Unpickler, UnpicklingError
     def find_deny(module, name):
@@ -128,6 +133,8 @@ else:
         unpickler = _Unpickler(file)
         unpickler.find_global = find_class
         return unpickler
+    def unpickler_factory(find_class):
+        return lambda file: Unpickler(file, find_class)
 
 if sys.version_info >= (3, 0):
     from pickle import Pickler as _Pickler
@@ -242,6 +249,7 @@ CALL_SERVICE = 110
 STUB_CALL_SERVICE = 111
 GET_RESOURCE = 112
 LOAD_RESOURCE = 113
+BROADCAST = 114
 
 #: Special value used to signal disconnection or the inability to route a
 #: message, when it appears in the `reply_to` field. Usually causes
@@ -579,6 +587,16 @@ def takes_router(func):
     return func
 
 
+def _orders_chain(func):
+    """
+    Decorator marking a function run by :class:`Dispatcher` whose first
+    argument is a chain ID, so a concurrent dispatcher runs it in order with
+    that chain's calls.
+    """
+    func.mitogen_orders_chain = True
+    return func
+
+
 def set_cloexec(fd):
     """
     Set the file descriptor `fd` to automatically close on :func:`os.execve`.
@@ -784,6 +802,12 @@ def iter_split(buf, delim, func):
     return buf[start:], cont
 
 
+#: :func:`mitogen.primitive.dump` and :func:`mitogen.primitive.load` once that
+#: module is imported.
+_dump_primitive = None
+_load_primitive = None
+
+
 class Message(object):
     """
     Messages are the fundamental unit of communication, comprising fields from
@@ -791,8 +815,44 @@ class Message(object):
     :class:`mitogen.core.Router` for ingress messages, and helper methods for
     deserialization and generating replies.
     """
-    ENCS = frozenset(range(0x4d49, 0x4d49+3))
-    ENC_MGC, ENC_PKL, ENC_BIN = sorted(ENCS)
+    ENCS = frozenset(range(0x4d49, 0x4d49+4))
+    ENC_MGC, ENC_PKL, ENC_BIN, ENC_PRM = sorted(ENCS)
+
+    #: :meth:`serialized` pickles values of more than roughly this many
+    #: elements. Decoding :attr:`ENC_PRM` avoids the fixed cost of an
+    #: unpickler, but costs more than pickle for each element.
+    serialized_max_elements = 8
+
+    #: Flag set in the wire encoding of frames whose body was compressed by
+    #: :class:`MitogenProtocol`, turning the ``M`` of the magic into ``m``.
+    #: Never visible in :attr:`enc` of a received message.
+    ENC_ZLIB = 0x2000
+
+    #: Flag set in the wire encoding of frames carrying one fragment of a
+    #: body split by :class:`MitogenProtocol`, as described by
+    #: :attr:`fragment`. Never visible in :attr:`enc` of a received message.
+    ENC_FRAG = 0x1000
+
+    #: Flag set in the wire encoding of :attr:`PRIO_BULK` messages, so their
+    #: priority survives forwarding. Never visible in :attr:`enc` of a
+    #: received message.
+    ENC_BULK = 0x0200
+
+    #: Flag set in the wire encoding of frames whose body is prefixed by
+    #: :attr:`trace_id`. Never visible in :attr:`enc` of a received message.
+    ENC_TRACE = 0x0080
+
+    #: Every flag that may be set in the wire encoding.
+    ENC_FLAGS = ENC_ZLIB | ENC_FRAG | ENC_BULK | ENC_TRACE
+
+    #: Values for :attr:`priority`. Queued messages are written to a stream to
+    #: a child in priority order, lowest value first.
+    PRIO_CONTROL, PRIO_NORMAL, PRIO_BULK = range(3)
+
+    #: Handles whose messages default to :attr:`PRIO_CONTROL`.
+    CONTROL_HANDLES = frozenset([
+        FORWARD_LOG, ADD_ROUTE, DEL_ROUTE, SHUTDOWN, DETACHING,
+    ])
 
     #: Integer target context ID. :class:`Router` delivers messages locally
     #: when their :attr:`dst_id` matches :data:`mitogen.context_id`, otherwise
@@ -817,8 +877,11 @@ class Message(object):
     #: :data:`IS_DEAD` has a special meaning when it appears in this field.
     reply_to = None
 
-    #: Raw message data bytes.
-    data = b('')
+    # Storage for :attr:`data`. When :attr:`_view` is not :data:`None`, it is
+    # a :class:`memoryview` of a :class:`mitogen.recvbuf.ReceiveBuffer`
+    # holding the real body.
+    _data = b('')
+    _view = None
 
     #: Encoding of payload in :attr:`data`, one of the ``ENC_*`` constants.
     #: :attr:`ENC_MGC` is an implicit, legacy value. New features &
@@ -833,6 +896,34 @@ class Message(object):
     #: the :class:`mitogen.select.Select` interface. Defaults to :data:`None`.
     receiver = None
 
+    #: One of the ``PRIO_*`` constants, used when the message waits in the
+    #: write queue of a stream to a child, see
+    #: :class:`mitogen.parent.PriorityWriter`. Messages of equal priority are written in the
+    #: order they were sent, while for example a :attr:`PRIO_CONTROL` message
+    #: is written ahead of any queued :attr:`PRIO_BULK` messages. Large
+    #: :attr:`PRIO_BULK` messages are split into fragments on the wire, so
+    #: other messages wait behind at most one fragment. Only
+    #: :attr:`PRIO_BULK` is transmitted, so that it applies at every hop. If
+    #: :data:`None`, :attr:`PRIO_CONTROL` is used for
+    #: :attr:`CONTROL_HANDLES`, otherwise :attr:`PRIO_NORMAL`.
+    priority = None
+
+    #: If not :data:`None`, the message carries only part of a larger body,
+    #: and this is a tuple `(fragment_id, offset, total)`, where
+    #: `fragment_id` is unique for the body among messages from
+    #: :attr:`src_id`, `offset` is the position of :attr:`data` within the
+    #: body, and `total` is the body's size. Fragments are received only by
+    #: handlers registered using :meth:`Router.add_handler` with
+    #: `streaming=True`, otherwise they are reassembled by the destination
+    #: :class:`Router`.
+    fragment = None
+
+    #: If not :data:`None`, the integer ID of the sampled trace this message
+    #: belongs to, see :attr:`Router.tracer`. It is transmitted with
+    #: the message and copied to any reply, and each context it passes
+    #: through records timestamped events for it.
+    trace_id = None
+
     HEADER_FMT = '>hLLLLLL'
     HEADER_LEN = struct.calcsize(HEADER_FMT)
     HEADER_MAGIC = ENC_MGC
@@ -844,18 +935,65 @@ class Message(object):
         """
         self.src_id = mitogen.context_id
         self.auth_id = mitogen.context_id
-        vars(self).update(kwargs)
-        assert isinstance(self.data, BytesType), 'Message data is not Bytes'
+        self._update(kwargs)
+        assert isinstance(self._data, BytesType), 'Message data is not Bytes'
         if self.enc not in self.ENCS:
             raise ValueError('Invalid enc: %r' % (self.enc,))
 
+    def _update(self, kwargs):
+        for key, value in iteritems(kwargs):
+            setattr(self, key, value)
+
+    def _get_data(self):
+        if self._view is not None:
+            self._data = self._view.tobytes()
+            self._view = None
+        return self._data
+
+    def _set_data(self, data):
+        self._data = data
+        self._view = None
+
+    #: Raw message data bytes. For large frames received by a
+    #: :class:`mitogen.recvbuf.ReceiveBuffer`, the bytes are copied out of the
+    #: receive buffer the first time this attribute is read, see
+    #: :attr:`payload`.
+    data = property(_get_data, _set_data)
+
+    @property
+    def payload(self):
+        """
+        The message body without forcing it to be copied out of any receive
+        buffer: a :class:`memoryview` for large frames delivered by
+        :class:`mitogen.recvbuf.ReceiveBuffer`, otherwise the same bytes as
+        :attr:`data`. Suitable for :func:`len`, forwarding, and writing to
+        files.
+        """
+        if self._view is not None:
+            return self._view
+        return self._data
+
+    def pack_header(self, enc=None, length=None):
+        """
+        Return the serialized header alone, so that it may be written followed
+        by :attr:`payload` without first joining the two.
+
+        :param int enc:
+            If not :data:`None`, wire encoding to use in place of :attr:`enc`.
+        :param int length:
+            If not :data:`None`, body length to use in place of the length of
+            :attr:`payload`.
+        """
+        if enc is None:
+            enc = self.enc
+        if length is None:
+            length = len(self.payload)
+        return struct.pack(self.HEADER_FMT, enc, self.dst_id,
+                           self.src_id, self.auth_id, self.handle,
+                           self.reply_to or 0, length)
+
     def pack(self):
-        return (
-            struct.pack(self.HEADER_FMT, self.enc, self.dst_id,
-                        self.src_id, self.auth_id, self.handle,
-                        self.reply_to or 0, len(self.data))
-            + self.data
-        )
+        return self.pack_header() + self.data
 
     def _unpickle_context(self, context_id, name):
         return _unpickle_context(context_id, name, router=self.router)
@@ -863,33 +1001,17 @@ class Message(object):
     def _unpickle_sender(self, context_id, dst_handle):
         return _unpickle_sender(self.router, context_id, dst_handle)
 
-    def _unpickle_bytes(self, s, encoding):
-        s, n = _codecs.latin_1_encode(s)
-        return s
-
     def _find_global(self, module, func):
         """
         Return the class implementing `module_name.class_name` or raise
         `StreamError` if the module is not whitelisted.
         """
-        if module == __name__:
-            if func == '_unpickle_call_error' or func == 'CallError':
-                return _unpickle_call_error
-            elif func == '_unpickle_sender':
-                return self._unpickle_sender
-            elif func == '_unpickle_context':
-                return self._unpickle_context
-            elif func == 'Blob':
-                return Blob
-            elif func == 'Secret':
-                return Secret
-            elif func == 'Kwargs':
-                return Kwargs
-        elif module == '_codecs' and func == 'encode':
-            return self._unpickle_bytes
-        elif module == '__builtin__' and func == 'bytes':
-            return BytesType
-        raise StreamError('cannot unpickle %r/%r', module, func)
+        if isinstance(self.router, Router):
+            return self.router._find_global(module, func)
+        try:
+            return _UNPICKLE_GLOBALS[module, func]
+        except KeyError:
+            raise StreamError('cannot unpickle %r/%r', module, func)
 
     @property
     def is_dead(self):
@@ -911,10 +1033,70 @@ class Message(object):
 
     @classmethod
     def encoded(cls, obj, enc, **kwargs):
+        if enc is None: return cls.serialized(obj, **kwargs)
         if enc == cls.ENC_PKL: return cls.pickled(obj, **kwargs)
         if enc == cls.ENC_BIN: return cls(data=obj, enc=enc, **kwargs)
+        if enc == cls.ENC_PRM: return cls.primitive(obj, **kwargs)
         raise ValueError('Invalid explicit enc: %r' % (enc,))
 
+    @classmethod
+    def _primitive(cls, obj, limit, kwargs):
+        if _dump_primitive is None:
+            import mitogen.primitive
+        out = []
+        try:
+            _dump_primitive(obj, out, limit)
+        except (ValueError, RuntimeError, struct.error):
+            # Unencodable text, recursion, or an out of range handle.
+            e = sys.exc_info()[1]
+            raise TypeError('cannot serialize: %s' % (e,))
+        return cls(enc=cls.ENC_PRM, data=b('').join(out), **kwargs)
+
+    @classmethod
+    def primitive(cls, obj, **kwargs):
+        """
+        Construct a message with :attr:`data` set to the :attr:`ENC_PRM`
+        serialization of `obj`, setting remaining fields using `kwargs`.
+
+        :attr:`ENC_PRM` is a compact tagged encoding of :data:`None`,
+        :class:`bool`, integers, :class:`float`, bytes, text, :class:`list`,
+        :class:`tuple`, :class:`dict`, :class:`Blob`, :class:`Secret`,
+        :class:`Kwargs`, :class:`Context` and :class:`Sender`, produced by
+        :mod:`mitogen.primitive`, which is imported if necessary, and so must
+        not first be needed on the :class:`Broker` thread of a child. Unlike
+        pickle it cannot name a constructor, so decoding needs no whitelist, although
+        a `find_class` passed to :meth:`unpickle` is still asked to permit
+        :class:`Context` and :class:`Sender`. Unlike pickle it does not
+        preserve shared or recursive references: an object appearing twice
+        in `obj` is decoded as two equal copies, and a container that
+        contains itself cannot be serialized.
+
+        :raises TypeError:
+            `obj` is or contains a type :attr:`ENC_PRM` cannot represent.
+        :returns:
+            The new message.
+        """
+        return cls._primitive(obj, 0xffffffff, kwargs)
+
+    @classmethod
+    def serialized(cls, obj, **kwargs):
+        """
+        Like :meth:`primitive`, but fall back to :meth:`pickled` when `obj`
+        cannot be represented by :attr:`ENC_PRM`, is larger than
+        :attr:`serialized_max_elements`, or :mod:`mitogen.primitive` is not
+        yet imported. Either way, :meth:`unpickle` returns the object at the
+        receiver.
+
+        :returns:
+            The new message.
+        """
+        if _dump_primitive is None:
+            return cls.pickled(obj, **kwargs)
+        try:
+            return cls._primitive(obj, cls.serialized_max_elements, kwargs)
+        except TypeError:
+            return cls.pickled(obj, **kwargs)
+
     @classmethod
     def pickled(cls, *args, **kwargs):
         """
@@ -948,10 +1130,12 @@ class Message(object):
             Optional keyword parameters overriding message fields in the reply.
         """
         if not isinstance(msg, Message):
-            msg = Message.pickled(msg)
+            msg = Message.serialized(msg)
         msg.dst_id = self.src_id
         msg.handle = self.reply_to
-        vars(msg).update(kwargs)
+        if self.trace_id is not None:
+            msg.trace_id = self.trace_id
+        msg._update(kwargs)
         if msg.handle:
             (self.router or router).route(msg)
         else:
@@ -969,6 +1153,7 @@ class Message(object):
     def decode(self, throw=True, throw_dead=True):
         if self.enc == self.ENC_PKL: return self.unpickle(throw, throw_dead)
         if self.enc == self.ENC_BIN: return self.data
+        if self.enc == self.ENC_PRM: return self.unpickle(throw, throw_dead)
         raise ValueError('Invalid explicit enc: %r' % (self.enc,))
 
     def unpickle(self, throw=True, throw_dead=True, find_class=None):
@@ -977,13 +1162,41 @@ class Message(object):
         :exc:`CallError` if the unpickled object is such.
 
         `throw` and `throw_dead` behave the same as with :meth:`unpickle_iter`.
+        :attr:`ENC_PRM` messages are decoded without an unpickler, but
+        `find_class` is still asked to permit any :class:`Context` or
+        :class:`Sender` they contain. Their decoder is in
+        :mod:`mitogen.primitive`, which is imported if necessary, and so must
+        not first be needed on the :class:`Broker` thread of a child.
 
         :param find_class:
             Callable that takes ``(module, func)`` and returns a constructor.
             Defaults to :meth:`_find_global`.
         """
-        if find_class is None: find_class = self._find_global
-        return next(self.unpickle_iter(throw, throw_dead, find_class))
+        if self.enc == self.ENC_PRM:
+            if throw_dead and self.is_dead:
+                self._throw_dead()
+            return self._load_primitive(self.data, 0, find_class)[0]
+        if find_class is not None or not isinstance(self.router, Router):
+            if find_class is None: find_class = self._find_global
+            return next(self.unpickle_iter(throw, throw_dead, find_class))
+
+        # Common case: skip the generator, and use the router's unpickler.
+        if self.enc not in (self.ENC_MGC, self.ENC_PKL):
+            raise ValueError(
+                'Message %r is not pickled, invalid enc=%r', self, self.enc,
+            )
+        if throw_dead and self.is_dead:
+            self._throw_dead()
+        return self._load(self.router._unpickler(BytesIO(self.data)), throw)
+
+    def _load_primitive(self, data, i, find_class=None):
+        if _load_primitive is None:
+            import mitogen.primitive
+        try:
+            return _load_primitive(self, data, i, find_class)
+        except (TypeError, ValueError, RuntimeError, struct.error):
+            e = sys.exc_info()[1]
+            raise StreamError('invalid message: %s', e)
 
     def unpickle_iter(self, throw=True, throw_dead=True, find_class=find_deny):
         """
@@ -1002,31 +1215,41 @@ class Message(object):
         :raises ChannelError:
             The `is_dead` field was set.
         """
-        if self.enc not in (self.ENC_MGC, self.ENC_PKL):
+        if self.enc not in (self.ENC_MGC, self.ENC_PKL, self.ENC_PRM):
             raise ValueError(
                 'Message %r is not pickled, invalid enc=%r', self, self.enc,
             )
         if throw_dead and self.is_dead:
             self._throw_dead()
 
+        if self.enc == self.ENC_PRM:
+            data = self.data
+            i = 0
+            while i < len(data):
+                obj, i = self._load_primitive(data, i, find_class)
+                yield obj
+            return
+
         file = BytesIO(self.data)
         unpickler = Unpickler(file, find_class)
         while file.tell() < len(self.data):
-            try:
-                # Must occur off the broker thread.
-                try:
-                    obj = unpickler.load()
-                except:
-                    LOG.error('raw pickle was: %r', self.data)
-                    raise
-            except (TypeError, ValueError):
-                e = sys.exc_info()[1]
-                raise StreamError('invalid message: %s', e)
+            yield self._load(unpickler, throw)
 
-            if throw and isinstance(obj, CallError):
-                raise obj
+    def _load(self, unpickler, throw):
+        try:
+            # Must occur off the broker thread.
+            try:
+                obj = unpickler.load()
+            except:
+                LOG.error('raw pickle was: %r', self.data)
+                raise
+        except (TypeError, ValueError):
+            e = sys.exc_info()[1]
+            raise StreamError('invalid message: %s', e)
 
-            yield obj
+        if throw and isinstance(obj, CallError):
+            raise obj
+        return obj
 
     def __repr__(self):
         if len(self.data) > 60:
@@ -1053,29 +1276,48 @@ class Sender(object):
     :param int dst_handle:
         Destination handle to send messages to.
     """
+    # Lowest priority used by send(), so close() cannot overtake any message.
+    _close_priority = None
+
     def __init__(self, context, dst_handle):
         self.context = context
         self.dst_handle = dst_handle
 
-    def send(self, data, enc=Message.ENC_PKL):
+    def send(self, data, enc=None, priority=None):
         """
         Send `data` to the remote end.
+
+        :param int enc:
+            Encoding of `data`, one of the ``Message.ENC_*`` constants. If
+            :data:`None`, :attr:`Message.ENC_PRM` is used when it can represent
+            `data`, otherwise :attr:`Message.ENC_PKL`.
+        :param int priority:
+            If not :data:`None`, :attr:`Message.priority` of the message.
         """
         IOLOG.debug('%r.send(%*r.., enc=%s)', self, 100, data, enc)
-        self.context.send(Message.encoded(data, enc, handle=self.dst_handle))
+        close_priority = priority
+        if close_priority is None:
+            close_priority = Message.PRIO_NORMAL
+        if (self._close_priority is None or
+                close_priority > self._close_priority):
+            self._close_priority = close_priority
+        self.context.send(Message.encoded(data, enc, handle=self.dst_handle,
+                                          priority=priority))
 
     explicit_close_msg = 'Sender was explicitly closed'
 
     def close(self):
         """
         Send a dead message to the remote, causing :meth:`ChannelError` to be
-        raised in any waiting thread.
+        raised in any waiting thread. It is sent at the lowest priority used
+        by :meth:`send`, so it cannot overtake any message sent before it.
         """
         IOLOG.debug('%r.close()', self)
         self.context.send(
             Message.dead(
                 reason=self.explicit_close_msg,
-                handle=self.dst_handle
+                handle=self.dst_handle,
+                priority=self._close_priority,
             )
         )
 
@@ -1087,11 +1329,9 @@ class Sender(object):
 
 
 def _unpickle_sender(router, context_id, dst_handle):
-    if not (isinstance(router, Router) and
-            isinstance(context_id, integer_types) and context_id >= 0 and
-            isinstance(dst_handle, integer_types) and dst_handle > 0):
+    if not isinstance(router, Router):
         raise TypeError('cannot unpickle Sender: bad input or missing router')
-    return Sender(Context(router, context_id), dst_handle)
+    return router._unpickle_sender(context_id, dst_handle)
 
 
 class Receiver(object):
@@ -1116,6 +1356,10 @@ class Receiver(object):
         for the receiver to receive a dead message if messages can no longer be
         routed to the context due to disconnection, and ignores messages that
         did not originate from the respondent context.
+
+    :param bool streaming:
+        If :data:`True`, large messages are received as a sequence of
+        fragments, see :meth:`Router.add_handler`.
     """
     #: If not :data:`None`, a function invoked as `notify(receiver)` after a
     #: message has been received. The function is invoked on :class:`Broker`
@@ -1127,7 +1371,8 @@ class Receiver(object):
     raise_channelerror = True
 
     def __init__(self, router, handle=None, persist=True,
-                 respondent=None, policy=None, overwrite=False):
+                 respondent=None, policy=None, overwrite=False,
+                 streaming=False):
         self.router = router
         #: The handle.
         self.handle = handle  # Avoid __repr__ crash in add_handler()
@@ -1139,6 +1384,7 @@ class Receiver(object):
             persist=persist,
             respondent=respondent,
             overwrite=overwrite,
+            streaming=streaming,
         )
 
     def __repr__(self):
@@ -1250,6 +1496,40 @@ class Receiver(object):
             msg._throw_dead()
         return msg
 
+    def get_many(self, max_items=None, timeout=None, block=True,
+                 throw_dead=True):
+        """
+        Like :meth:`get`, but return a list of every message buffered, up to
+        `max_items`, acquiring the underlying latch's lock once.
+
+        If `throw_dead` is :data:`True` and a dead message follows other
+        messages, those are returned, and the dead message is requeued to be
+        thrown by the next call.
+
+        :param int max_items:
+            If not :data:`None`, the maximum number of messages to return.
+        :returns:
+            Non-empty list of :class:`Message`.
+        """
+        IOLOG.debug('%r.get_many(max_items=%r, timeout=%r, block=%r)',
+                    self, max_items, timeout, block)
+        try:
+            msgs = self._latch.get_many(max_items, timeout=timeout,
+                                        block=block)
+        except LatchError:
+            raise ChannelError(self.closed_msg)
+        if throw_dead:
+            for i, msg in enumerate(msgs):
+                if msg.is_dead:
+                    if not i:
+                        msg._throw_dead()
+                    try:
+                        self._latch._requeue(msgs[i:])
+                    except LatchError:
+                        pass  # Closed meanwhile, the next call raises.
+                    return msgs[:i]
+        return msgs
+
     def __iter__(self):
         """
         Yield consecutive :class:`Message` instances delivered to this receiver
@@ -1262,6 +1542,35 @@ class Receiver(object):
                 return
             yield msg
 
+    def iter_many(self, max_items=None):
+        """
+        Like :meth:`__iter__`, but yield lists of every message buffered, up
+        to `max_items`, as returned by :meth:`get_many`.
+        """
+        while True:
+            try:
+                msgs = self.get_many(max_items)
+            except ChannelError:
+                return
+            yield msgs
+
+    def __await__(self):
+        """
+        Allow :mod:`asyncio` coroutines to wait for the next message using
+        ``msg = await recv``, with the same result as :meth:`get`. See
+        :mod:`mitogen.aio`.
+        """
+        import mitogen.aio
+        return mitogen.aio.get(self).__await__()
+
+    def __aiter__(self):
+        """
+        Like :meth:`__iter__`, but for ``async for`` loops in :mod:`asyncio`
+        coroutines.
+        """
+        import mitogen.aio
+        return mitogen.aio.Iterator(self, stop_on=ChannelError)
+
 
 class Channel(Sender, Receiver):
     """
@@ -1348,11 +1657,15 @@ class Importer(object):
     # The Mitogen package is handled specially, since the child context must
     # construct it manually during startup.
     MITOGEN_PKG_CONTENT = [
+        'aio',
         'buildah',
         'compat',
+        'compress',
         'debug',
+        'dispatch',
         'doas',
         'docker',
+        'executor',
         'kubectl',
         'fakessh',
         'fork',
@@ -1365,12 +1678,18 @@ class Importer(object):
         'os_fork',
         'parent',
         'podman',
+        'primitive',
+        'ratelimit',
+        'recvbuf',
         'select',
         'service',
         'setns',
+        'shm',
         'ssh',
+        'stats',
         'su',
         'sudo',
+        'tracing',
         'utils',
     ]
 
@@ -1885,6 +2204,15 @@ class LogHandler(logging.Handler):
         The context to send log messages towards. At present this is always
         the master process.
     """
+    #: Once uncorked, records are gathered until the broker next runs, then
+    #: sent in batches of up to this many records. Batches of more than one
+    #: record are sent as one compressed :data:`FORWARD_LOG` message.
+    max_batch = 100
+
+    #: When not :data:`None`, a :class:`mitogen.ratelimit.LogRateLimiter`
+    #: deciding whether each record is forwarded.
+    limiter = None
+
     def __init__(self, context):
         logging.Handler.__init__(self)
         self.context = context
@@ -1893,6 +2221,10 @@ class LogHandler(logging.Handler):
         # Private synchronization is needed while corked, to ensure no
         # concurrent call to _send() exists during uncork().
         self._buffer_lock = threading.Lock()
+        #: Encoded records awaiting :meth:`_flush`, or :data:`None` while
+        #: corked.
+        self._batch = None
+        self._batch_lock = threading.Lock()
 
     def uncork(self):
         """
@@ -1908,6 +2240,7 @@ class LogHandler(logging.Handler):
             self._buffer = None
         finally:
             self._buffer_lock.release()
+        self._batch = []
 
     def _send(self, msg):
         self._buffer_lock.acquire()
@@ -1920,6 +2253,51 @@ class LogHandler(logging.Handler):
         finally:
             self._buffer_lock.release()
 
+    def _encode(self, name, levelno, msg):
+        encoded = '%s\x00%s\x00%s' % (name, levelno, msg)
+        if isinstance(encoded, UnicodeType):
+            # Logging package emits both :(
+            encoded = encoded.encode('utf-8')
+        return encoded
+
+    def _send_batch(self, batch):
+        if len(batch) == 1:
+            self._send(Message(data=batch[0], handle=FORWARD_LOG))
+        else:
+            data = zlib.compress(b('').join(
+                struct.pack('>L', len(encoded)) + encoded
+                for encoded in batch
+            ))
+            self._send(Message(data=data, enc=Message.ENC_BIN,
+                               handle=FORWARD_LOG))
+
+    def _flush(self):
+        """
+        Send every record gathered since the last call. Runs only on the
+        broker thread, so batches are sent in order, and never while holding
+        :attr:`_batch_lock`, as sending may itself log, which must not wait
+        for a thread blocked in :meth:`emit`.
+        """
+        self._batch_lock.acquire()
+        try:
+            batch = self._batch
+            self._batch = []
+        finally:
+            self._batch_lock.release()
+
+        for i in range(0, len(batch), self.max_batch):
+            self._send_batch(batch[i:i + self.max_batch])
+
+    def _add(self, encoded):
+        self._batch_lock.acquire()
+        try:
+            self._batch.append(encoded)
+            flush = len(self._batch) == 1
+        finally:
+            self._batch_lock.release()
+        if flush:
+            self.context.router.broker.defer(self._flush)
+
     def emit(self, record):
         """
         Send a :data:`FORWARD_LOG` message towards the target context.
@@ -1927,15 +2305,17 @@ class LogHandler(logging.Handler):
         if record.name == 'mitogen.io' or \
            getattr(self.local, 'in_emit', False):
             return
+        if self.limiter and not self.limiter.allow():
+            return
 
         self.local.in_emit = True
         try:
-            msg = self.format(record)
-            encoded = '%s\x00%s\x00%s' % (record.name, record.levelno, msg)
-            if isinstance(encoded, UnicodeType):
-                # Logging package emits both :(
-                encoded = encoded.encode('utf-8')
-            self._send(Message(data=encoded, handle=FORWARD_LOG))
+            encoded = self._encode(record.name, record.levelno,
+                                   self.format(record))
+            if self._batch is None:
+                self._send(Message(data=encoded, handle=FORWARD_LOG))
+            else:
+                self._add(encoded)
         finally:
             self.local.in_emit = False
 
@@ -2027,7 +2407,20 @@ class Stream(object):
         The default implementation reads :attr:`Protocol.read_size` bytes and
         passes the resulting bytestring to :meth:`Protocol.on_receive`. If the
         bytestring is 0 bytes, invokes :meth:`on_disconnect` instead.
+
+        If the protocol has a :attr:`Protocol.receive_buffer`, bytes are
+        instead read directly into it, followed by a call to
+        :meth:`Protocol.on_receive_buffer`.
         """
+        rbuf = self.protocol.receive_buffer
+        if rbuf is not None:
+            n = self.receive_side.readinto(rbuf.reserve(self.protocol.read_size))
+            if not n:
+                LOG.debug('%r: empty read, disconnecting', self.receive_side)
+                return self.on_disconnect(broker)
+            rbuf.commit(n)
+            return self.protocol.on_receive_buffer(broker)
+
         buf = self.receive_side.read(self.protocol.read_size)
         if not buf:
             LOG.debug('%r: empty read, disconnecting', self.receive_side)
@@ -2098,6 +2491,11 @@ class Protocol(object):
     #: active protocol for the stream.
     read_size = CHUNK_SIZE
 
+    #: If not :data:`None`, a :class:`mitogen.recvbuf.ReceiveBuffer` that
+    #: :class:`Stream` reads into directly, calling :meth:`on_receive_buffer`
+    #: rather than :meth:`on_receive`.
+    receive_buffer = None
+
     @classmethod
     def build_stream(cls, *args, **kwargs):
         stream = cls.stream_class()
@@ -2199,54 +2597,225 @@ class BufferedWriter(object):
     Implement buffered output while avoiding quadratic string operations. This
     is currently constructed by each protocol, in future it may become fixed
     for each stream instead.
+
+    Each :meth:`writev` call describes one frame. Frames are written in the
+    order they were queued, see :class:`mitogen.parent.PriorityWriter` for
+    streams to children. Frames queued while the stream is not writeable are
+    coalesced into a single :meth:`Side.writev` call on the next writeability
+    event, bounded by :attr:`max_iovecs` and :attr:`max_bytes`. Frames passed
+    to :meth:`cork` are likewise coalesced, but without waiting for
+    writeability.
     """
+    #: Maximum number of queued buffers gathered by one vectored write.
+    max_iovecs = 256
+
+    #: Stop gathering queued buffers once at least this many bytes were
+    #: gathered. A single larger buffer is still written alone.
+    max_bytes = 262144
+
     def __init__(self, broker, protocol):
         self._broker = broker
         self._protocol = protocol
-        self._buf = collections.deque()
+        #: Queues of frames awaiting writing, drained in order.
+        self._lanes = [collections.deque()]
+        # Remaining buffers of a partially written frame.
+        self._current = []
+        # id(frame) -> function called once the frame is written.
+        self._on_flush = {}
         self._len = 0
+        self._corked = False
+        self._cork_deadline = None
 
     def write(self, s):
         """
         Transmit `s` immediately, falling back to enqueuing it and marking the
         stream writeable if no OS buffer space is available.
         """
+        self.writev((s,))
+
+    def writev(self, bufs, on_flush=None):
+        """
+        Like :meth:`write`, but transmit the sequence of buffers `bufs` as if
+        they were joined, without joining them.
+
+        :param on_flush:
+            If not :data:`None`, function called without arguments once the
+            last of `bufs` has been written.
+        """
         if not self._len:
             # Modifying epoll/Kqueue state is expensive, as are needless broker
             # loops. Rather than wait for writeability, just write immediately,
             # and fall back to the broker loop on error or full buffer.
             try:
-                n = self._protocol.stream.transmit_side.write(s)
+                n = self._protocol.stream.transmit_side.writev(bufs)
                 if n:
-                    if n == len(s):
+                    bufs = self._skip(bufs, n)
+                    if not bufs:
+                        if on_flush is not None:
+                            on_flush()
                         return
-                    s = s[n:]
+                    # The frame has begun, nothing may overtake the rest.
+                    self._current = bufs
+                    if on_flush is not None:
+                        self._on_flush[id(bufs)] = on_flush
+                    for buf in bufs:
+                        self._len += len(buf)
+                    self._broker._start_transmit(self._protocol.stream)
+                    return
             except OSError:
                 pass
 
             self._broker._start_transmit(self._protocol.stream)
-        self._buf.append(s)
-        self._len += len(s)
+
+        self._enqueue(bufs, on_flush)
+
+    def _enqueue(self, bufs, on_flush=None):
+        frame = []
+        for buf in bufs:
+            if buf:
+                frame.append(buf)
+                self._len += len(buf)
+        if frame:
+            self._push(frame)
+            if on_flush is not None:
+                self._on_flush[id(frame)] = on_flush
+
+    def _push(self, frame):
+        self._lanes[0].append(frame)
+
+    def cork(self, bufs, max_bytes, max_delay, on_flush=None):
+        """
+        Like :meth:`writev`, but rather than attempting to write immediately,
+        hold `bufs` until :meth:`uncork` is called by :class:`Broker` at the
+        end of its current loop iteration, so they may be written along with
+        any that follow. Must only be called from the Broker thread.
+
+        :param int max_bytes:
+            Uncork immediately once at least this many bytes are held.
+        :param float max_delay:
+            Uncork immediately when called more than this many seconds after
+            the first buffer was held.
+        """
+        if self._corked:
+            self._enqueue(bufs, on_flush)
+            if self._len >= max_bytes or now() >= self._cork_deadline:
+                self.uncork(self._broker)
+        elif self._len:
+            # Already awaiting writeability, flushing is the same either way.
+            self._enqueue(bufs, on_flush)
+        else:
+            self._corked = True
+            self._cork_deadline = now() + max_delay
+            self._broker._cork(self)
+            self._enqueue(bufs, on_flush)
+            if self._len >= max_bytes:
+                self.uncork(self._broker)
+
+    def uncork(self, broker):
+        """
+        Attempt to write any buffers held by :meth:`cork`, falling back to
+        marking the stream writeable if they could not all be written.
+        """
+        if not self._corked:
+            return
+
+        self._corked = False
+        if self._protocol.stream.transmit_side.closed:
+            return
+
+        try:
+            if not self._transmit(broker):
+                return
+        except OSError:
+            pass
+
+        if self._len:
+            broker._start_transmit(self._protocol.stream)
+
+    def _skip(self, bufs, n):
+        """
+        Return the part of `bufs` remaining after its first `n` bytes.
+        """
+        for i, buf in enumerate(bufs):
+            if n < len(buf):
+                return [BufferType(buf, n)] + list(bufs[i+1:])
+            n -= len(buf)
+        return []
+
+    def _frames(self):
+        """
+        Yield queued frames in the order they will be written.
+        """
+        if self._current:
+            yield self._current
+        for lane in self._lanes:
+            for frame in lane:
+                yield frame
+
+    def _gather(self):
+        bufs = []
+        size = 0
+        for frame in self._frames():
+            for buf in frame:
+                bufs.append(buf)
+                size += len(buf)
+                if len(bufs) >= self.max_iovecs or size >= self.max_bytes:
+                    return bufs
+        return bufs
+
+    def _consume(self, n):
+        """
+        Discard the first `n` queued bytes, in the order of :meth:`_frames`.
+        """
+        self._len -= n
+        while n:
+            if not self._current:
+                for lane in self._lanes:
+                    if lane:
+                        self._current = lane.popleft()
+                        break
+            buf = self._current[0]
+            if n < len(buf):
+                self._current[0] = BufferType(buf, n)
+                break
+            n -= len(buf)
+            del self._current[0]
+            if self._on_flush and not self._current:
+                on_flush = self._on_flush.pop(id(self._current), None)
+                if on_flush is not None:
+                    on_flush()
+
+    def _transmit(self, broker):
+        """
+        Write as many queued buffers as possible in one call, disconnecting
+        the stream and returning :data:`False` if disconnection was detected.
+        """
+        written = self._protocol.stream.transmit_side.writev(self._gather())
+        if not written:
+            LOG.debug('disconnected during write to %r', self)
+            self._protocol.stream.on_disconnect(broker)
+            return False
+
+        IOLOG.debug('transmitted %d bytes to %r', written, self)
+        self._consume(written)
+        return True
 
     def on_transmit(self, broker):
         """
         Respond to stream writeability by retrying previously buffered
         :meth:`write` calls.
         """
-        if self._buf:
-            buf = self._buf.popleft()
-            written = self._protocol.stream.transmit_side.write(buf)
-            if not written:
-                LOG.debug('disconnected during write to %r', self)
-                self._protocol.stream.on_disconnect(broker)
+        try:
+            if self._len and not self._transmit(broker):
                 return
-            elif written != len(buf):
-                self._buf.appendleft(BufferType(buf, written))
-
-            IOLOG.debug('transmitted %d bytes to %r', written, self)
-            self._len -= written
+        except OSError:
+            # Edge-triggered pollers may report a stream they only believe is
+            # writeable.
+            if sys.exc_info()[1].args[0] != errno.EAGAIN:
+                raise
+            return
 
-        if not self._buf:
+        if not self._len:
             broker._stop_transmit(self._protocol.stream)
 
 
@@ -2342,6 +2911,31 @@ class Side(object):
             return b('')
         return s
 
+    if hasattr(os, 'readv'):
+        def readinto(self, view):
+            """
+            Like :meth:`read`, but read directly into the writeable buffer
+            `view`, such as one returned by
+            :meth:`mitogen.recvbuf.ReceiveBuffer.reserve`.
+
+            :returns:
+                Number of bytes read, or 0 to indicate disconnection was
+                detected.
+            """
+            if self.closed:
+                return 0
+            n, disconnected = io_op(os.readv, self.fd, [view])
+            if disconnected:
+                LOG.debug('%r: disconnected during read: %s',
+                          self, disconnected)
+                return 0
+            return n
+    else:
+        def readinto(self, view):
+            s = self.read(len(view))
+            view[:len(s)] = s
+            return len(s)
+
     def write(self, s):
         """
         Write as much of the bytes from `s` as possible to the file descriptor,
@@ -2362,6 +2956,33 @@ class Side(object):
             return None
         return written
 
+    if hasattr(os, 'writev'):
+        def writev(self, bufs):
+            """
+            Like :meth:`write`, but gather the bytes to write from the sequence
+            of buffers `bufs` using a single :func:`os.writev` call.
+
+            :returns:
+                Number of bytes written, or :data:`None` if disconnection was
+                detected.
+            """
+            if self.closed:
+                return None
+
+            written, disconnected = io_op(os.writev, self.fd, bufs)
+            if disconnected:
+                LOG.debug('%r: disconnected during write: %s',
+                          self, disconnected)
+                return None
+            return written
+    else:
+        def writev(self, bufs):
+            # Python 2 lacks os.writev(). Joining is cheaper than paying for a
+            # syscall per buffer. Buffers are always bytes or buffer() here.
+            if len(bufs) == 1:
+                return self.write(bufs[0])
+            return self.write(b('').join([str(buf) for buf in bufs]))
+
 
 class MitogenProtocol(Protocol):
     """
@@ -2377,8 +2998,31 @@ class MitogenProtocol(Protocol):
     #: peer.
     on_message = None
 
+    #: Class used to construct :attr:`Protocol.receive_buffer`, or
+    #: :data:`None` to receive into separately allocated bytestrings, which
+    #: are joined for each frame. Set by importing :mod:`mitogen.recvbuf`.
+    receive_buffer_class = None
+
+    #: Class used to construct the writer queueing output for the stream.
+    writer_class = BufferedWriter
+
+    #: Bodies larger than this are sent as a sequence of
+    #: :attr:`Message.ENC_FRAG` frames carrying at most this many bytes each.
+    #: They are forwarded unchanged by intermediate contexts, and reassembled
+    #: by the destination :class:`Router`.
+    fragment_size = CHUNK_SIZE
+
+    #: Prefix of each fragment body, see :attr:`Message.fragment`.
+    FRAG_FMT = '>LLL'
+    FRAG_LEN = struct.calcsize(FRAG_FMT)
+
+    #: Prefix of each traced body, following any fragment prefix, see
+    #: :attr:`Message.trace_id`.
+    TRACE_FMT = '>Q'
+    TRACE_LEN = struct.calcsize(TRACE_FMT)
+
     def __init__(self, router, remote_id, auth_id=None,
-                 local_id=None, parent_ids=None):
+                 local_id=None, parent_ids=None, compressor=None):
         self._router = router
         self.remote_id = remote_id
         #: If not :data:`None`, :class:`Router` stamps this into
@@ -2395,9 +3039,16 @@ class MitogenProtocol(Protocol):
             auth_id in ([local_id] + parent_ids)
         )
         self.sent_modules = set(['mitogen', 'mitogen.core'])
+        if self.receive_buffer_class is not None:
+            self.receive_buffer = self.receive_buffer_class()
         self._input_buf = collections.deque()
         self._input_buf_len = 0
-        self._writer = BufferedWriter(router.broker, self)
+        self._writer = self.writer_class(router.broker, self)
+
+        #: If not :data:`None`, a :class:`mitogen.compress.Compressor` used to
+        #: compress bodies sent on this stream. Any compressed frame is
+        #: accepted regardless.
+        self.compressor = compressor
 
         #: Routing records the dst_id of every message arriving from this
         #: stream. Any arriving DEL_ROUTE is rebroadcast for any such ID.
@@ -2409,6 +3060,10 @@ class MitogenProtocol(Protocol):
         :class:`StreamError` on failure.
         """
         IOLOG.debug('%r.on_receive()', self)
+        if self.receive_buffer is not None:
+            self.receive_buffer.append(buf)
+            return self.on_receive_buffer(broker)
+
         if self._input_buf and self._input_buf_len < 128:
             self._input_buf[0] += buf
         else:
@@ -2418,6 +3073,14 @@ class MitogenProtocol(Protocol):
         while self._receive_one(broker):
             pass
 
+    def on_receive_buffer(self, broker):
+        """
+        Handle every complete message present in :attr:`receive_buffer`.
+        """
+        IOLOG.debug('%r.on_receive_buffer()', self)
+        while self._receive_one_buffered(broker):
+            pass
+
     corrupt_msg = (
         '%s: Corruption detected: frame signature incorrect. This likely means'
         ' some external process is interfering with the connection. Received:'
@@ -2425,6 +3088,37 @@ class MitogenProtocol(Protocol):
         '%r'
     )
 
+    def _receive_one_buffered(self, broker):
+        rbuf = self.receive_buffer
+        if len(rbuf) < Message.HEADER_LEN:
+            return False
+
+        msg = Message()
+        msg.router = self._router
+        (msg.enc, msg.dst_id, msg.src_id, msg.auth_id,
+         msg.handle, msg.reply_to, msg_len) = rbuf.unpack(Message.HEADER_FMT)
+
+        if (msg.enc & ~Message.ENC_FLAGS) not in Message.ENCS:
+            LOG.error(self.corrupt_msg, self.stream.name, rbuf.peek(2048))
+            self.stream.on_disconnect(broker)
+            return False
+
+        if msg_len > self._router.max_message_size:
+            LOG.error('%r: Maximum message size exceeded (got %d, max %d)',
+                      self, msg_len, self._router.max_message_size)
+            self.stream.on_disconnect(broker)
+            return False
+
+        if len(rbuf) < (msg_len + Message.HEADER_LEN):
+            IOLOG.debug('%r: Input too short (want %d, got %d)',
+                        self, msg_len, len(rbuf) - Message.HEADER_LEN)
+            # Ensure the next read has room for the whole frame.
+            rbuf.reserve(msg_len + Message.HEADER_LEN - len(rbuf))
+            return False
+
+        rbuf.skip(Message.HEADER_LEN)
+        return self._on_frame(broker, msg, rbuf.take(msg_len))
+
     def _receive_one(self, broker):
         if self._input_buf_len < Message.HEADER_LEN:
             return False
@@ -2437,7 +3131,7 @@ class MitogenProtocol(Protocol):
             self._input_buf[0][:Message.HEADER_LEN],
         )
 
-        if msg.enc not in Message.ENCS:
+        if (msg.enc & ~Message.ENC_FLAGS) not in Message.ENCS:
             LOG.error(self.corrupt_msg, self.stream.name, self._input_buf[0][:2048])
             self.stream.on_disconnect(broker)
             return False
@@ -2468,12 +3162,113 @@ class MitogenProtocol(Protocol):
             prev_start = start
             start = 0
 
-        msg.data = b('').join(bits)
         self._input_buf.appendleft(buf[prev_start+len(bit):])
         self._input_buf_len -= total_len
+        return self._on_frame(broker, msg, b('').join(bits))
+
+    def _on_frame(self, broker, msg, data):
+        """
+        Route `msg` having the received body `data`, first decoding any flags
+        present in its wire encoding. Return :data:`False` if the stream was
+        disconnected.
+        """
+        if msg.enc & Message.ENC_FLAGS:
+            data = self._decode_flags(broker, msg, data)
+            if data is None:
+                return False
+
+        if isinstance(data, BytesType):
+            msg._data = data
+        else:
+            msg._view = data
         self._router._async_route(msg, self.stream)
         return True
 
+    def _unpack_prefix(self, broker, data, fmt, size):
+        """
+        Return a tuple of the `fmt` struct at the start of `data` and the
+        remainder of `data`, or disconnect the stream and return :data:`None`
+        if `data` is shorter than `size`.
+        """
+        prefix = data[:size]
+        if not isinstance(prefix, BytesType):
+            prefix = prefix.tobytes()
+        if len(prefix) != size:
+            LOG.error('%r: truncated frame prefix received', self)
+            self.stream.on_disconnect(broker)
+            return None
+        return struct.unpack(fmt, prefix), data[size:]
+
+    def _decode_flags(self, broker, msg, data):
+        """
+        Clear every flag from the wire encoding of `msg`, updating it as they
+        describe, and return the remaining body `data`, or :data:`None` if the
+        stream was disconnected.
+        """
+        if msg.enc & Message.ENC_BULK:
+            msg.enc &= ~Message.ENC_BULK
+            msg.priority = Message.PRIO_BULK
+
+        if msg.enc & Message.ENC_FRAG:
+            msg.enc &= ~Message.ENC_FRAG
+            tup = self._unpack_prefix(broker, data, self.FRAG_FMT,
+                                      self.FRAG_LEN)
+            if tup is None:
+                return None
+            msg.fragment, data = tup
+
+        if msg.enc & Message.ENC_TRACE:
+            msg.enc &= ~Message.ENC_TRACE
+            tup = self._unpack_prefix(broker, data, self.TRACE_FMT,
+                                      self.TRACE_LEN)
+            if tup is None:
+                return None
+            (msg.trace_id,), data = tup
+            self._router._trace(msg.trace_id, 'receive', self.stream.name)
+
+        if msg.enc & Message.ENC_ZLIB:
+            data = self._decompress(broker, msg, data)
+        return data
+
+    def _decompress(self, broker, msg, data):
+        """
+        Clear :data:`Message.ENC_ZLIB` from `msg` and return the decompressed
+        body `data`, or disconnect the stream and return :data:`None` if it is
+        invalid or would inflate beyond :attr:`Router.max_message_size`.
+        """
+        msg.enc &= ~Message.ENC_ZLIB
+        if not isinstance(data, BytesType):
+            # Python 2's zlib refuses the memoryview of large bodies.
+            data = data.tobytes()
+        obj = zlib.decompressobj()
+        try:
+            s = obj.decompress(data, self._router.max_message_size)
+        except zlib.error:
+            LOG.error('%r: decompression failed: %s', self, sys.exc_info()[1])
+            self.stream.on_disconnect(broker)
+            return None
+
+        if obj.unconsumed_tail:
+            LOG.error('%r: Maximum message size exceeded after '
+                      'decompression (max %d)',
+                      self, self._router.max_message_size)
+            self.stream.on_disconnect(broker)
+            return None
+
+        if self.compressor:
+            self.compressor.rx_compressed_in += len(data)
+            self.compressor.rx_compressed_out += len(s)
+        return s
+
+    def _encode(self, msg, payload):
+        """
+        Return `(enc, body)` describing how `msg` having body `payload` should
+        appear on the wire, compressing the body when enabled.
+        """
+        if self.compressor:
+            return self.compressor.encode(msg, payload)
+        return msg.enc, payload
+
     def pending_bytes(self):
         """
         Return the number of bytes queued for transmission on this stream. This
@@ -2492,9 +3287,74 @@ class MitogenProtocol(Protocol):
         IOLOG.debug('%r.on_transmit()', self)
         self._writer.on_transmit(broker)
 
+    def _write(self, bufs, on_flush=None):
+        router = self._router
+        if router.cork_bytes:
+            self._writer.cork(bufs, router.cork_bytes, router.cork_delay,
+                              on_flush)
+        else:
+            self._writer.writev(bufs, on_flush)
+
+    if hasattr(os, 'writev'):
+        def _send_frame(self, header, body):
+            self._write((header, body))
+    else:
+        def _send_frame(self, header, body):
+            # Without os.writev(), joining is cheaper than a syscall per part.
+            self._write((header + body,))
+
+    def _send_traced(self, msg, enc, prefix, body):
+        """
+        Like :meth:`_send_frame`, but append :attr:`Message.trace_id` to the
+        body `prefix`, and record when the frame is queued and written.
+        """
+        router = self._router
+        name = self.stream.name
+        trace_id = msg.trace_id
+        prefix += struct.pack(self.TRACE_FMT, trace_id)
+        header = msg.pack_header(enc | Message.ENC_TRACE,
+                                 len(prefix) + len(body))
+        router._trace(trace_id, 'enqueue', name)
+        self._write((header + prefix, body),
+                    lambda: router._trace(trace_id, 'flush', name))
+
+    def _send_fragment(self, msg, fragment, chunk):
+        enc, body = self._encode(msg, chunk)
+        if msg.priority == Message.PRIO_BULK:
+            enc |= Message.ENC_BULK
+        prefix = struct.pack(self.FRAG_FMT, *fragment)
+        if msg.trace_id is not None:
+            return self._send_traced(msg, enc | Message.ENC_FRAG, prefix,
+                                     body)
+        header = msg.pack_header(enc | Message.ENC_FRAG,
+                                 self.FRAG_LEN + len(body))
+        self._send_frame(header + prefix, body)
+
+    def _send_fragments(self, msg, payload):
+        fragment_id = self._router._allocate_fragment_id()
+        size = self.fragment_size
+        for offset in range(0, len(payload), size):
+            self._send_fragment(msg, (fragment_id, offset, len(payload)),
+                                BufferType(payload, offset)[:size])
+
     def _send(self, msg):
         IOLOG.debug('%r._send(%r)', self, msg)
-        self._writer.write(msg.pack())
+        if PY3:
+            payload = msg.payload
+        else:
+            payload = msg.data
+
+        if msg.fragment is not None:
+            return self._send_fragment(msg, msg.fragment, payload)
+        if len(payload) > self.fragment_size:
+            return self._send_fragments(msg, payload)
+
+        enc, body = self._encode(msg, payload)
+        if msg.priority == Message.PRIO_BULK:
+            enc |= Message.ENC_BULK
+        if msg.trace_id is not None:
+            return self._send_traced(msg, enc, b(''), body)
+        self._send_frame(msg.pack_header(enc, len(body)), body)
 
     def send(self, msg):
         """
@@ -2549,7 +3409,7 @@ class Context(object):
         LOG.debug('%r: disconnecting', self)
         fire(self, 'disconnect')
 
-    def send_async(self, msg, persist=False):
+    def send_async(self, msg, persist=False, priority=None):
         """
         Arrange for `msg` to be delivered to this context, with replies
         directed to a newly constructed receiver. :attr:`dst_id
@@ -2563,6 +3423,9 @@ class Context(object):
         :param mitogen.core.Message msg:
             The message.
 
+        :param int priority:
+            If not :data:`None`, set as :attr:`Message.priority` of `msg`.
+
         :returns:
             :class:`Receiver` configured to receive any replies sent to the
             message's `reply_to` handle.
@@ -2570,6 +3433,8 @@ class Context(object):
         receiver = Receiver(self.router, persist=persist, respondent=self)
         msg.dst_id = self.context_id
         msg.reply_to = receiver.handle
+        if priority is not None:
+            msg.priority = priority
 
         LOG.debug('sending message to %r: %r', self, msg)
         self.send(msg)
@@ -2637,6 +3502,29 @@ def _unpickle_context(context_id, name, router=None):
     return Context(None, context_id, name)  # For plain Jane pickle.
 
 
+def _unpickle_bytes(s, encoding):
+    s, n = _codecs.latin_1_encode(s)
+    return s
+
+
+#: `(module, name)` -> constructor for every global permitted in pickles by
+#: :meth:`Message._find_global`. Each :class:`Router` extends a copy with
+#: constructors bound to it.
+_UNPICKLE_GLOBALS = {
+    (__name__, '_unpickle_call_error'): _unpickle_call_error,
+    (__name__, 'CallError'): _unpickle_call_error,
+    (__name__, '_unpickle_context'): _unpickle_context,
+    (__name__, '_unpickle_sender'):
+        lambda context_id, dst_handle: _unpickle_sender(None, context_id,
+                                                        dst_handle),
+    (__name__, 'Blob'): Blob,
+    (__name__, 'Secret'): Secret,
+    (__name__, 'Kwargs'): Kwargs,
+    ('_codecs', 'encode'): _unpickle_bytes,
+    ('__builtin__', 'bytes'): BytesType,
+}
+
+
 class Poller(object):
     """
     A poller manages OS file descriptors the user is waiting to become
@@ -2788,7 +3676,9 @@ class Latch(object):
     Latches implement queues using the UNIX self-pipe trick, and a per-thread
     :func:`socket.socketpair` that is lazily created the first time any
     latch attempts to sleep on a thread, and dynamically associated with the
-    waiting Latch only for duration of the wait.
+    waiting Latch only for duration of the wait. On Python 3, where waiting on
+    a lock has neither problem, sleeping threads wait on a pooled
+    :class:`threading.Lock` instead, see :attr:`sleep_on_lock`.
 
     See :ref:`waking-sleeping-threads` for further discussion.
     """
@@ -2805,6 +3695,13 @@ class Latch(object):
     #: efficiently implement waiting on multiple event sources.
     notify = None
 
+    #: If :data:`True`, sleeping threads wait on a pooled
+    #: :class:`threading.Lock` released by :meth:`put`, rather than a
+    #: socketpair, avoiding a system call pair and a poller per wakeup.
+    #: Requires Python 3, where lock waits may time out without polling, and
+    #: are interrupted by signals.
+    sleep_on_lock = sys.version_info >= (3, 2)
+
     # The _cls_ prefixes here are to make it crystal clear in the code which
     # state mutation isn't covered by :attr:`_lock`.
 
@@ -2818,13 +3715,20 @@ class Latch(object):
     #: reference the same underlying kernel object in use by the parent.
     _cls_all_sockets = []
 
+    #: List of reusable locks used when :attr:`sleep_on_lock` is
+    #: :data:`True`, each held until released by :meth:`put`. The same
+    #: mutation rules as :attr:`_cls_idle_socketpairs` apply.
+    _cls_idle_locks = []
+
     def __init__(self):
         self.closed = False
         self._lock = threading.Lock()
         #: List of unconsumed enqueued items.
         self._queue = []
         #: List of `(wsock, cookie)` awaiting an element, where `wsock` is the
-        #: socketpair's write side, and `cookie` is the string to write.
+        #: socketpair's write side, and `cookie` is the string to write. If
+        #: the thread sleeps on a lock, `wsock` is the lock and `cookie` is
+        #: :data:`None`.
         self._sleeping = []
         #: Number of elements of :attr:`_sleeping` that have already been
         #: woken, and have a corresponding element index from :attr:`_queue`
@@ -2837,6 +3741,7 @@ class Latch(object):
         Clean up any files belonging to the parent process after a fork.
         """
         cls._cls_idle_socketpairs = []
+        cls._cls_idle_locks = []
         while cls._cls_all_sockets:
             cls._cls_all_sockets.pop().close()
 
@@ -2949,12 +3854,19 @@ class Latch(object):
                 return self._queue.pop(i)
             if not block:
                 raise TimeoutError()
-            rsock, wsock = self._get_socketpair()
-            cookie = self._make_cookie()
-            self._sleeping.append((wsock, cookie))
+            if self.sleep_on_lock:
+                lock = self._get_lock()
+                self._sleeping.append((lock, None))
+            else:
+                rsock, wsock = self._get_socketpair()
+                cookie = self._make_cookie()
+                self._sleeping.append((wsock, cookie))
         finally:
             self._lock.release()
 
+        if self.sleep_on_lock:
+            return self._get_sleep_lock(lock, timeout)
+
         poller = self.poller_class()
         poller.start_receive(rsock.fileno())
         try:
@@ -2962,6 +3874,163 @@ class Latch(object):
         finally:
             poller.close()
 
+    def get_many(self, max_items=None, timeout=None, block=True):
+        """
+        Return a list of every enqueued object, up to `max_items`, acquiring
+        the latch's lock once, or sleep waiting for at least one.
+
+        :param int max_items:
+            If not :data:`None`, the maximum number of objects to return.
+        :param float timeout:
+            If not :data:`None`, specifies a timeout in seconds.
+        :param bool block:
+            If :data:`False`, immediately raise
+            :class:`mitogen.core.TimeoutError` if the latch is empty.
+
+        :raises mitogen.core.LatchError:
+            :meth:`close` has been called, and the object is no longer valid.
+        :raises mitogen.core.TimeoutError:
+            Timeout was reached.
+        :returns:
+            Non-empty list of de-queued objects, in the order they were
+            enqueued.
+        """
+        self._lock.acquire()
+        try:
+            if self.closed:
+                raise LatchError()
+            items = self._take(max_items)
+        finally:
+            self._lock.release()
+
+        if not items:
+            items.append(self.get(timeout=timeout, block=block))
+            if max_items is None or max_items > 1:
+                # Anything enqueued while we slept.
+                self._lock.acquire()
+                try:
+                    if not self.closed:
+                        items.extend(self._take(max_items and max_items - 1))
+                finally:
+                    self._lock.release()
+        return items
+
+    def _take(self, max_items):
+        """
+        Remove and return up to `max_items` objects not already assigned to
+        a waking thread. Must be called with :attr:`_lock` held.
+        """
+        i = len(self._sleeping)
+        if max_items is None:
+            j = len(self._queue)
+        else:
+            j = min(len(self._queue), i + max_items)
+        items = self._queue[i:j]
+        del self._queue[i:j]
+        return items
+
+    def _requeue(self, items):
+        """
+        Return `items` taken by :meth:`get_many` to the head of the queue, in
+        order, waking any sleeping threads for them. :attr:`notify` is not
+        called again, as it was when they were first enqueued.
+
+        :raises mitogen.core.LatchError:
+            :meth:`close` has been called, and the object is no longer valid.
+        """
+        self._lock.acquire()
+        try:
+            if self.closed:
+                raise LatchError()
+            self._queue[self._waking:self._waking] = items
+            i = self._waking
+            self._waking = min(len(self._sleeping), i + len(items))
+            to_wake = self._sleeping[i:self._waking]
+        finally:
+            self._lock.release()
+
+        for wsock, cookie in to_wake:
+            self._wake(wsock, cookie)
+
+    def _get_lock(self):
+        """
+        Return an unused lock in the held state, creating one if none exist.
+        """
+        try:
+            return self._cls_idle_locks.pop()  # pop() must be atomic
+        except IndexError:
+            lock = threading.Lock()
+            lock.acquire()
+            return lock
+
+    def _get_sleep_lock(self, lock, timeout):
+        """
+        When a result is not immediately available, sleep waiting for
+        :meth:`put` to release our lock.
+        """
+        IOLOG.debug('%r._get_sleep_lock(timeout=%r)', self, timeout)
+        if timeout is None:
+            timeout = -1
+        else:
+            timeout = min(max(0, timeout), threading.TIMEOUT_MAX)
+
+        try:
+            woken = lock.acquire(True, timeout)
+        except:
+            # The timeout is within range, so a signal handler raised.
+            self._forget_sleep_lock(lock)
+            raise
+
+        self._lock.acquire()
+        try:
+            i = self._sleeping.index((lock, None))
+            del self._sleeping[i]
+            if i < self._waking and not woken:
+                # put() chose us before the timeout, but has not yet released
+                # the lock. It is about to.
+                lock.acquire()
+                woken = True
+            # Held again, so it may be reused.
+            self._cls_idle_locks.append(lock)
+            if not woken:
+                raise TimeoutError()
+
+            self._waking -= 1
+            if self.closed:
+                raise LatchError()
+            IOLOG.debug('%r.get() wake -> %r', self, self._queue[i])
+            return self._queue.pop(i)
+        finally:
+            self._lock.release()
+
+    def _forget_sleep_lock(self, lock):
+        """
+        Remove the sleeper sleeping on `lock` after its sleep was interrupted,
+        passing any item :meth:`put` already chose for it to the next sleeper,
+        or leaving it at the head of the queue.
+        """
+        to_wake = None
+        self._lock.acquire()
+        try:
+            i = self._sleeping.index((lock, None))
+            del self._sleeping[i]
+            if i < self._waking:
+                # put() chose us, and released or is about to release the
+                # lock.
+                lock.acquire()
+                self._waking -= 1
+                self._queue.insert(self._waking, self._queue.pop(i))
+                if self._waking < len(self._sleeping):
+                    to_wake = self._sleeping[self._waking]
+                    self._waking += 1
+            # Held again, so it may be reused.
+            self._cls_idle_locks.append(lock)
+        finally:
+            self._lock.release()
+
+        if to_wake:
+            self._wake(*to_wake)
+
     def _get_sleep(self, poller, timeout, block, rsock, wsock, cookie):
         """
         When a result is not immediately available, sleep waiting for
@@ -3034,8 +4103,7 @@ class Latch(object):
             if self._waking < len(self._sleeping):
                 wsock, cookie = self._sleeping[self._waking]
                 self._waking += 1
-                IOLOG.debug('%r.put() -> waking wfd=%r',
-                                    self, wsock.fileno())
+                IOLOG.debug('%r.put() -> waking %r', self, wsock)
             elif self.notify:
                 self.notify(self)
         finally:
@@ -3045,6 +4113,9 @@ class Latch(object):
             self._wake(wsock, cookie)
 
     def _wake(self, wsock, cookie):
+        if cookie is None:
+            wsock.release()  # Thread sleeping on a lock.
+            return
         written, disconnected = io_op(os.write, wsock.fileno(), cookie)
         assert written == len(cookie) and not disconnected
 
@@ -3064,9 +4135,14 @@ class Waker(Protocol):
 
     .. _UNIX self-pipe trick: https://cr.yp.to/docs/selfpipe.html
     """
-    read_size = 1
+    read_size = 128
     broker_ident = None
 
+    #: :data:`True` while a byte written by :meth:`_wake` has not yet been
+    #: noticed by :meth:`on_receive`, so further calls to :meth:`defer` need
+    #: not write another.
+    _wake_pending = False
+
     @classmethod
     def build_stream(cls, broker):
         stream = super(Waker, cls).build_stream(broker)
@@ -3096,14 +4172,18 @@ class Waker(Protocol):
         Drain the pipe and fire callbacks. Since :attr:`_deferred` is
         synchronized, :meth:`defer` and :meth:`on_receive` can conspire to
         ensure only one byte needs to be pending regardless of queue length.
+
+        Only calls queued on entry are run, so producers that keep the queue
+        busy cannot starve other streams. Any added meanwhile wrote a byte of
+        their own and run on the next loop iteration.
         """
         IOLOG.debug('%r.on_receive()', self)
-        while True:
-            try:
-                func, args, kwargs = self._deferred.popleft()
-            except IndexError:
-                return
-
+        # Clear before draining: a producer seeing the flag set is certain
+        # its call is drained below.
+        self._wake_pending = False
+        popleft = self._deferred.popleft
+        for _ in range(len(self._deferred)):
+            func, args, kwargs = popleft()
             try:
                 func(*args, **kwargs)
             except Exception:
@@ -3147,7 +4227,33 @@ class Waker(Protocol):
         IOLOG.debug('%r.defer() [fd=%r]', self,
                             self.stream.transmit_side.fd)
         self._deferred.append((func, args, kwargs))
-        self._wake()
+        if not self._wake_pending:
+            self._wake_pending = True
+            self._wake()
+
+    def defer_many(self, calls):
+        """
+        Like :meth:`defer`, but arrange for a sequence of calls to execute in
+        order on the broker thread, waking it at most once.
+
+        :param list calls:
+            Sequence of `(func, args, kwargs)` tuples.
+        :raises mitogen.core.Error:
+            :meth:`defer_many` was called after :class:`Broker` has begun
+            shutdown.
+        """
+        if thread.get_ident() == self.broker_ident:
+            IOLOG.debug('%r.defer_many() [immediate]', self)
+            for func, args, kwargs in calls:
+                func(*args, **kwargs)
+            return
+        if self._broker._exitted:
+            raise Error(self.broker_shutdown_msg)
+
+        self._deferred.extend(calls)
+        if not self._wake_pending:
+            self._wake_pending = True
+            self._wake()
 
 
 class IoLoggerProtocol(DelimitedProtocol):
@@ -3242,6 +4348,28 @@ class Router(object):
     #: parameter.
     unidirectional = False
 
+    #: When nonzero, messages sent from the :class:`Broker` thread, including
+    #: those passed to :meth:`route` from other threads, are not written
+    #: immediately, but held ("corked") until the end of the current broker
+    #: loop iteration or until this many bytes are held for a stream, so
+    #: bursts of small messages are written using few system calls and
+    #: packets. Trades latency for throughput, disabled by default.
+    cork_bytes = 0
+
+    #: When :attr:`cork_bytes` is nonzero, maximum seconds a message may be
+    #: held during a single long broker loop iteration.
+    cork_delay = 0.005
+
+    #: When not :data:`None`, a :class:`mitogen.stats.RouterStats` counting
+    #: messages, bytes and drops per handle and per stream. Disabled by
+    #: default.
+    stats = None
+
+    #: When not :data:`None`, a :class:`mitogen.tracing.Tracer` sampling
+    #: messages passed to :meth:`route`, and recording events for sampled
+    #: messages passing through this context. Disabled by default.
+    tracer = None
+
     duplicate_handle_msg = 'cannot register a handle that already exists'
     refused_msg = 'refused by policy'
     invalid_handle_msg = 'invalid handle'
@@ -3268,6 +4396,21 @@ class Router(object):
         self._handle_map = {}
         #: Context -> set { handle, .. }
         self._handles_by_respondent = {}
+        #: Handles registered with streaming=True.
+        self._streaming_handles = set()
+        #: (src_id, fragment_id) -> [chunks, size received, Stream, accept?]
+        self._fragments = {}
+        self._last_fragment_id = 0
+        #: (context ID, handle) -> weakref to the Sender messages naming it
+        #: share.
+        self._sender_by_key = {}
+        #: (module, name) -> constructor, for :meth:`_find_global`.
+        self._unpickle_globals = dict(_UNPICKLE_GLOBALS)
+        self._unpickle_globals.update({
+            (__name__, '_unpickle_context'): self._unpickle_context,
+            (__name__, '_unpickle_sender'): self._unpickle_sender,
+        })
+        self._unpickler = unpickler_factory(self._find_global)
         self.add_handler(self._on_del_route, DEL_ROUTE)
 
     def __repr__(self):
@@ -3308,6 +4451,12 @@ class Router(object):
         for context in notify:
             context.on_disconnect()
 
+        for key, state in list(self._fragments.items()):
+            if state[2] is stream:
+                del self._fragments[key]
+        if self.stats:
+            self.stats.forget_stream(stream)
+
     def _on_broker_exit(self):
         """
         Called prior to broker exit, informs callbacks registered with
@@ -3330,6 +4479,47 @@ class Router(object):
             name='self',
         )
 
+    def _find_global(self, module, func):
+        """
+        Return the constructor for `module.func` from a precomputed table, or
+        raise :class:`StreamError` if it is not whitelisted. Used by
+        :meth:`Message.unpickle` for messages received by this router.
+        """
+        try:
+            return self._unpickle_globals[module, func]
+        except KeyError:
+            raise StreamError('cannot unpickle %r/%r', module, func)
+
+    def _unpickle_context(self, context_id, name):
+        return _unpickle_context(context_id, name, router=self)
+
+    def _unpickle_sender(self, context_id, dst_handle):
+        """
+        Return the :class:`Sender` for `dst_handle` in `context_id`, reusing
+        any instance still referenced elsewhere, so messages naming the same
+        sender do not each construct one.
+        """
+        key = context_id, dst_handle
+        ref = self._sender_by_key.get(key)
+        sender = ref and ref()
+        if sender is None:
+            if not (isinstance(context_id, integer_types) and
+                    context_id >= 0 and
+                    isinstance(dst_handle, integer_types) and
+                    dst_handle > 0):
+                raise TypeError('cannot unpickle Sender: bad input or '
+                                'missing router')
+            sender = Sender(self.context_by_id(context_id), dst_handle)
+            self._sender_by_key[key] = weakref.ref(sender,
+                                                   self._on_sender_gc(key))
+        return sender
+
+    def _on_sender_gc(self, key):
+        def on_gc(ref):
+            if self._sender_by_key.get(key) is ref:
+                self._sender_by_key.pop(key, None)
+        return on_gc
+
     def context_by_id(self, context_id, via_id=None, create=True, name=None):
         """
         Return or construct a :class:`Context` given its ID. An internal
@@ -3416,12 +4606,13 @@ class Router(object):
             The handle wasn't registered.
         """
         _, _, _, respondent = self._handle_map.pop(handle)
+        self._streaming_handles.discard(handle)
         if respondent:
             self._handles_by_respondent[respondent].discard(handle)
 
     def add_handler(self, fn, handle=None, persist=True,
                     policy=None, respondent=None,
-                    overwrite=False):
+                    overwrite=False, streaming=False):
         """
         Invoke `fn(msg)` on the :class:`Broker` thread for each Message sent to
         `handle` from this context. Unregister after one invocation if
@@ -3470,6 +4661,16 @@ class Router(object):
         :param bool overwrite:
             If :data:`True`, allow existing handles to be silently overwritten.
 
+        :param bool streaming:
+            If :data:`True`, messages too large for a single frame are not
+            reassembled before delivery. Instead `fn` is invoked once for
+            each fragment as it arrives, with :attr:`Message.fragment`
+            describing its place in the body, so the body is never buffered
+            whole by the receiver. Its total size remains limited by
+            :attr:`max_message_size` of the sending context.
+            If `persist` is :data:`False`, the handler is unregistered after
+            the first message's final fragment.
+
         :return:
             `handle`, or if `handle` was :data:`None`, the newly allocated
             handle.
@@ -3482,6 +4683,10 @@ class Router(object):
             raise Error(self.duplicate_handle_msg)
 
         self._handle_map[handle] = persist, fn, policy, respondent
+        if streaming:
+            self._streaming_handles.add(handle)
+        else:
+            self._streaming_handles.discard(handle)
         if respondent:
             if respondent not in self._handles_by_respondent:
                 self._handles_by_respondent[respondent] = set()
@@ -3496,6 +4701,7 @@ class Router(object):
             _, fn, _, _  = self._handle_map[handle]
             fn(Message.dead(self.respondent_disconnect_msg))
             del self._handle_map[handle]
+            self._streaming_handles.discard(handle)
 
     def _maybe_send_dead(self, unreachable, msg, reason, *args):
         """
@@ -3531,31 +4737,98 @@ class Router(object):
                 )
             )
 
-    def _invoke(self, msg, stream):
+    def _allocate_fragment_id(self):
+        """
+        Return the ID for the next body fragmented by a stream. Must only be
+        called from the Broker thread.
+        """
+        self._last_fragment_id = (self._last_fragment_id + 1) & 0xffffffff
+        return self._last_fragment_id
+
+    def _on_fragment(self, msg, stream):
+        """
+        Deliver the fragment `msg` addressed to this context, either directly
+        to a streaming handler, or by reassembling its body.
+        """
+        fragment_id, offset, total = msg.fragment
+        end = offset + len(msg.payload)
+        if msg.handle in self._streaming_handles:
+            return self._invoke(msg, stream, end >= total, offset == 0)
+
+        key = msg.src_id, fragment_id
+        state = self._fragments.get(key)
+        if state is None:
+            state = self._fragments[key] = [
+                [], 0, stream, total <= self.max_message_size
+            ]
+            if not state[3]:
+                self._maybe_send_dead(False, msg, self.too_large_msg % (
+                    self.max_message_size,
+                ))
+
+        if offset != state[1]:
+            LOG.error('%r: fragment out of sequence, discarding body: %r',
+                      self, msg)
+            del self._fragments[key]
+            return
+
+        state[1] = end
+        if state[3]:
+            # Copy, rather than pin a receive buffer for every fragment.
+            state[0].append(msg.data)
+        if end < total:
+            return
+
+        del self._fragments[key]
+        if state[3]:
+            msg.fragment = None
+            msg.data = b('').join(state[0])
+            self._invoke(msg, stream)
+
+    def _invoke(self, msg, stream, last=True, first=True):
         # IOLOG.debug('%r._invoke(%r)', self, msg)
+        # A refused body is reported once, by its first fragment.
         try:
             persist, fn, policy, respondent = self._handle_map[msg.handle]
         except KeyError:
-            self._maybe_send_dead(True, msg, reason=self.invalid_handle_msg)
+            if self.stats:
+                self.stats.count_drop(None)
+            if first:
+                self._maybe_send_dead(True, msg,
+                                      reason=self.invalid_handle_msg)
             return
 
         if respondent and not (msg.is_dead or
                                msg.src_id == respondent.context_id):
-            self._maybe_send_dead(True, msg, 'reply from unexpected context')
+            if self.stats:
+                self.stats.count_drop(persist and msg.handle or None)
+            if first:
+                self._maybe_send_dead(True, msg,
+                                      'reply from unexpected context')
             return
 
         if policy and not policy(msg, stream):
-            self._maybe_send_dead(True, msg, self.refused_msg)
+            if self.stats:
+                self.stats.count_drop(persist and msg.handle or None)
+            if first:
+                self._maybe_send_dead(True, msg, self.refused_msg)
             return
 
-        if not persist:
+        if last and not persist:
             self.del_handler(msg.handle)
 
+        if self.stats:
+            return self.stats.invoke(self, msg, fn,
+                                     persist and msg.handle or None)
         try:
             fn(msg)
         except Exception:
             LOG.exception('%r._invoke(%r): %r crashed', self, msg, fn)
 
+    def _trace(self, trace_id, event, detail=None):
+        if self.tracer:
+            self.tracer.record(trace_id, event, detail)
+
     def _async_route(self, msg, in_stream=None):
         """
         Arrange for `msg` to be forwarded towards its destination. If its
@@ -3570,60 +4843,84 @@ class Router(object):
             performing source route verification, to ensure sensitive messages
             such as ``CALL_FUNCTION`` arrive only from trusted contexts.
         """
-        IOLOG.debug('%r._async_route(%r, %r)', self, msg, in_stream)
+        if IOLOG.isEnabledFor(logging.DEBUG):
+            IOLOG.debug('%r._async_route(%r, %r)', self, msg, in_stream)
+
+        if msg.trace_id is not None:
+            self._trace(msg.trace_id, 'route', msg.dst_id)
 
-        if len(msg.data) > self.max_message_size:
+        if len(msg.payload) > self.max_message_size:
             self._maybe_send_dead(False, msg, self.too_large_msg % (
                 self.max_message_size,
             ))
             return
 
-        parent_stream = self._stream_by_id.get(mitogen.parent_id)
-        src_stream = self._stream_by_id.get(msg.src_id, parent_stream)
-
-        # When the ingress stream is known, verify the message was received on
-        # the same as the stream we would expect to receive messages from the
-        # src_id and auth_id. This is like Reverse Path Filtering in IP, and
-        # ensures messages from a privileged context cannot be spoofed by a
-        # child.
+        # Streams for the parent and msg.src_id are looked up only if needed,
+        # as local delivery and forwarding to a known stream are by far the
+        # most common cases.
+        stream_by_id = self._stream_by_id
         if in_stream:
-            auth_stream = self._stream_by_id.get(msg.auth_id, parent_stream)
-            if in_stream != auth_stream:
+            if self.stats:
+                self.stats.count_stream(in_stream, 0, msg)
+
+            # When the ingress stream is known, verify the message was
+            # received on the same as the stream we would expect to receive
+            # messages from the src_id and auth_id. This is like Reverse Path
+            # Filtering in IP, and ensures messages from a privileged context
+            # cannot be spoofed by a child.
+            auth_stream = (stream_by_id.get(msg.auth_id) or
+                           stream_by_id.get(mitogen.parent_id))
+            if in_stream is not auth_stream:
                 LOG.error('%r: bad auth_id: got %r via %r, not %r: %r',
                           self, msg.auth_id, in_stream, auth_stream, msg)
+                if self.stats:
+                    self.stats.count_stream(in_stream, 4, None)
                 return
 
-            if msg.src_id != msg.auth_id and in_stream != src_stream:
-                LOG.error('%r: bad src_id: got %r via %r, not %r: %r',
-                          self, msg.src_id, in_stream, src_stream, msg)
-                return
+            if msg.src_id != msg.auth_id:
+                src_stream = (stream_by_id.get(msg.src_id) or
+                              stream_by_id.get(mitogen.parent_id))
+                if in_stream is not src_stream:
+                    LOG.error('%r: bad src_id: got %r via %r, not %r: %r',
+                              self, msg.src_id, in_stream, src_stream, msg)
+                    if self.stats:
+                        self.stats.count_stream(in_stream, 4, None)
+                    return
 
             # If the stream's MitogenProtocol has auth_id set, copy it to the
             # message. This allows subtrees to become privileged by stamping a
             # parent's context ID. It is used by mitogen.unix to mark client
             # streams (like Ansible WorkerProcess) as having the same rights as
             # the parent.
-            if in_stream.protocol.auth_id is not None:
-                msg.auth_id = in_stream.protocol.auth_id
-            if in_stream.protocol.on_message is not None:
-                in_stream.protocol.on_message(in_stream, msg)
+            protocol = in_stream.protocol
+            if protocol.auth_id is not None:
+                msg.auth_id = protocol.auth_id
+            if protocol.on_message is not None:
+                protocol.on_message(in_stream, msg)
 
             # Record the IDs the source ever communicated with.
-            in_stream.protocol.egress_ids.add(msg.dst_id)
+            protocol.egress_ids.add(msg.dst_id)
 
         if msg.dst_id == mitogen.context_id:
+            if msg.fragment is not None:
+                return self._on_fragment(msg, in_stream)
             return self._invoke(msg, in_stream)
 
-        out_stream = self._stream_by_id.get(msg.dst_id)
-        if (not out_stream) and (parent_stream != src_stream or not in_stream):
+        out_stream = stream_by_id.get(msg.dst_id)
+        if not out_stream:
             # No downstream route exists. The message could be from a child or
             # ourselves for a parent, in which case we must forward it
             # upstream, or it could be from a parent for a dead child, in which
             # case its src_id/auth_id would fail verification if returned to
             # the parent, so in that case reply with a dead message instead.
-            out_stream = parent_stream
+            parent_stream = stream_by_id.get(mitogen.parent_id)
+            src_stream = stream_by_id.get(msg.src_id, parent_stream)
+            if parent_stream != src_stream or not in_stream:
+                out_stream = parent_stream
 
         if out_stream is None:
+            if in_stream and self.stats:
+                self.stats.count_stream(in_stream, 4, None)
             self._maybe_send_dead(True, msg, self.no_route_msg,
                                   msg.dst_id, mitogen.context_id)
             return
@@ -3631,12 +4928,16 @@ class Router(object):
         if in_stream and self.unidirectional and not \
                 (in_stream.protocol.is_privileged or
                  out_stream.protocol.is_privileged):
+            if self.stats:
+                self.stats.count_stream(in_stream, 4, None)
             self._maybe_send_dead(True, msg, self.unidirectional_msg,
                                   in_stream.protocol.remote_id,
                                   out_stream.protocol.remote_id,
                                   mitogen.context_id)
             return
 
+        if self.stats:
+            self.stats.count_stream(out_stream, 2, msg)
         out_stream.protocol._send(msg)
 
     def route(self, msg):
@@ -3649,6 +4950,8 @@ class Router(object):
 
         This may be called from any thread.
         """
+        if self.tracer:
+            self.tracer.sample(msg)
         self.broker.defer(self._async_route, msg)
 
 
@@ -3679,11 +4982,16 @@ class Broker(object):
     def __init__(self, poller_class=None, activate_compat=True):
         self._alive = True
         self._exitted = False
+        self._corked = []
         self._waker = Waker.build_stream(self)
         #: Arrange for `func(\*args, \**kwargs)` to be executed on the broker
         #: thread, or immediately if the current thread is the broker thread.
         #: Safe to call from any thread.
         self.defer = self._waker.protocol.defer
+        #: Arrange for a sequence of `(func, args, kwargs)` tuples to be
+        #: executed in order on the broker thread, waking it at most once.
+        #: Safe to call from any thread. See :meth:`Waker.defer_many`.
+        self.defer_many = self._waker.protocol.defer_many
         self.poller = self.poller_class()
         self.poller.start_receive(
             self._waker.receive_side.fd,
@@ -3813,6 +5121,20 @@ class Broker(object):
             self._call(side.stream, func)
         if timer_to is not None:
             self.timers.expire()
+        if self._corked:
+            self._uncork()
+
+    def _cork(self, writer):
+        """
+        Arrange for :meth:`BufferedWriter.uncork` to be called on `writer` at
+        the end of the current loop iteration.
+        """
+        self._corked.append(writer)
+
+    def _uncork(self):
+        corked, self._corked = self._corked, []
+        for writer in corked:
+            self._call(writer._protocol.stream, writer.uncork)
 
     def _broker_exit(self):
         """
@@ -3908,9 +5230,17 @@ class Dispatcher(object):
     If a :class:`mitogen.parent.CallChain` sending a message is in pipelined
     mode, any exception that occurs is recorded, and causes all subsequent
     calls with the same `chain_id` to fail with the same exception.
+
+    If the `max_concurrent_calls` connection option is set, calls instead run
+    on a pool of up to that many threads. Calls of a pipelined chain still run
+    one at a time in the order they arrived, while other calls may overlap.
     """
     _service_recv = None
 
+    #: :class:`mitogen.dispatch.Pool` running calls, or :data:`None` when
+    #: calls run on the main thread.
+    _pool = None
+
     def __repr__(self):
         return 'Dispatcher'
 
@@ -3935,6 +5265,10 @@ class Dispatcher(object):
         )
         self._service_recv.notify = self._on_call_service
         listen(econtext.broker, 'shutdown', self._on_broker_shutdown)
+        #: Maximum number of calls running concurrently, or 0 to run them one
+        #: at a time on the main thread.
+        self.max_concurrent_calls = econtext.config.get(
+            'max_concurrent_calls') or 0
 
     def _on_broker_shutdown(self):
         if self._service_recv.notify == self._on_call_service:
@@ -3943,14 +5277,11 @@ class Dispatcher(object):
 
     @classmethod
     @takes_econtext
+    @_orders_chain
     def forget_chain(cls, chain_id, econtext):
         econtext.dispatcher._error_by_chain_id.pop(chain_id, None)
 
-    def _parse_request(self, msg):
-        data = msg.unpickle(throw=False)
-        LOG.debug('%r: dispatching %r', self, data)
-
-        chain_id, modname, klass, func, args, kwargs = data
+    def _resolve(self, modname, klass, func, kwargs):
         obj = import_module(modname)
         if klass:
             obj = getattr(obj, klass)
@@ -3959,25 +5290,38 @@ class Dispatcher(object):
             kwargs.setdefault('econtext', self.econtext)
         if getattr(fn, 'mitogen_takes_router', None):
             kwargs.setdefault('router', self.econtext.router)
+        return fn
 
-        return chain_id, fn, args, kwargs
+    def _parse_request(self, msg):
+        if msg.enc == Message.ENC_PRM and _dump_primitive is None:
+            # The parent speaks ENC_PRM, so reply in kind.
+            import mitogen.primitive
+        data = msg.unpickle(throw=False)
+        LOG.debug('%r: dispatching %r', self, data)
 
-    def _dispatch_one(self, msg):
-        try:
-            chain_id, fn, args, kwargs = self._parse_request(msg)
-        except Exception:
-            return None, CallError(sys.exc_info()[1])
+        chain_id, modname, klass, func, args, kwargs = data
+        fn = self._resolve(modname, klass, func, kwargs)
+        return chain_id, fn, args, kwargs
 
+    def _call(self, chain_id, fn, args, kwargs):
         if chain_id in self._error_by_chain_id:
-            return chain_id, self._error_by_chain_id[chain_id]
+            return self._error_by_chain_id[chain_id]
 
         try:
-            return chain_id, fn(*args, **kwargs)
+            return fn(*args, **kwargs)
         except Exception:
             e = CallError(sys.exc_info()[1])
             if chain_id is not None:
                 self._error_by_chain_id[chain_id] = e
-            return chain_id, e
+            return e
+
+    def _dispatch_one(self, msg):
+        try:
+            chain_id, fn, args, kwargs = self._parse_request(msg)
+        except Exception:
+            return None, CallError(sys.exc_info()[1])
+
+        return chain_id, self._call(chain_id, fn, args, kwargs)
 
     def _on_call_service(self, recv):
         """
@@ -4011,6 +5355,13 @@ class Dispatcher(object):
         import mitogen.service
         mitogen.service.get_or_create_pool(router=self.econtext.router)
 
+    def _reply(self, msg, chain_id, ret):
+        LOG.debug('%r: %r -> %r', self, msg, ret)
+        if msg.reply_to:
+            msg.reply(ret)
+        elif isinstance(ret, CallError) and chain_id is None:
+            LOG.error('No-reply function call failed: %s', ret)
+
     def _dispatch_calls(self):
         for msg in self.recv:
             if msg.handle == STUB_CALL_SERVICE:
@@ -4018,18 +5369,30 @@ class Dispatcher(object):
                     self._init_service_pool()
                 continue
 
+            if self._pool is not None:
+                self._pool.submit(msg)
+                continue
+
+            trace_id = msg.trace_id
+            if trace_id is not None:
+                self.econtext.router._trace(trace_id, 'call_start')
             chain_id, ret = self._dispatch_one(msg)
-            LOG.debug('%r: %r -> %r', self, msg, ret)
-            if msg.reply_to:
-                msg.reply(ret)
-            elif isinstance(ret, CallError) and chain_id is None:
-                LOG.error('No-reply function call failed: %s', ret)
+            if trace_id is not None:
+                self.econtext.router._trace(trace_id, 'call_end')
+            self._reply(msg, chain_id, ret)
 
     def run(self):
         if self.econtext.config.get('on_start'):
             self.econtext.config['on_start'](self.econtext)
 
-        _profile_hook('mitogen.child_main', self._dispatch_calls)
+        if self.max_concurrent_calls:
+            import mitogen.dispatch
+            self._pool = mitogen.dispatch.Pool(self, self.max_concurrent_calls)
+        try:
+            _profile_hook('mitogen.child_main', self._dispatch_calls)
+        finally:
+            if self._pool is not None:
+                self._pool.close()
 
 
 class ExternalContext(object):
@@ -4133,11 +5496,17 @@ class ExternalContext(object):
         out_fd = self.config.get('out_fd', pty.STDOUT_FILENO)
         out_fd2 = os.dup(out_fd)
         out_fp = os.fdopen(out_fd2, 'wb', 0)
-        self.stream = MitogenProtocol.build_stream(
-            self.router,
-            parent_id,
-            local_id=self.config['context_id'],
-            parent_ids=self.config['parent_ids']
+        # mitogen.fork may supply a Stream subclass sharing state with the
+        # parent, such as mitogen.shm.Stream.
+        stream_factory = self.config.get('stream_factory', Stream)
+        self.stream = stream_factory()
+        self.stream.set_protocol(
+            MitogenProtocol(
+                self.router,
+                parent_id,
+                local_id=self.config['context_id'],
+                parent_ids=self.config['parent_ids'],
+            )
         )
         for f in in_fp, out_fp:
             fd = f.fileno()
@@ -4284,6 +5653,22 @@ class ExternalContext(object):
         # Reopen with line buffering.
         sys.stdout = os.fdopen(pty.STDOUT_FILENO, 'w', 1)
 
+    def _setup_log_rate_limit(self):
+        import mitogen.ratelimit
+        self.log_handler.limiter = mitogen.ratelimit.LogRateLimiter(
+            self.log_handler, self.config['log_rate_limit']
+        )
+
+    def _setup_receive_buffer(self):
+        import mitogen.recvbuf
+        self.broker.defer(mitogen.recvbuf.install, self.stream.protocol)
+
+    def _setup_compression(self):
+        import mitogen.compress
+        self.stream.protocol.compressor = mitogen.compress.Compressor(
+            self.config['stream_compression']
+        )
+
     def main(self):
         self._setup_master()
         try:
@@ -4318,6 +5703,12 @@ class ExternalContext(object):
                     self.stream.transmit_side.write(b('MITO002\n'))
                 self.broker._py24_25_compat()
                 self.log_handler.uncork()
+                if self.config.get('log_rate_limit'):
+                    self._setup_log_rate_limit()
+                if self.config.get('stream_compression'):
+                    self._setup_compression()
+                if sys.version_info >= (2, 7):
+                    self._setup_receive_buffer()
                 self.dispatcher.run()
                 LOG.debug('ExternalContext.main() normal exit')
             except KeyboardInterrupt:
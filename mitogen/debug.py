@@ -87,15 +87,22 @@ def get_routers():
     )
 
 
+def _router_info(id_, router):
+    info = {
+        'id': id_,
+        'streams': len(set(router._stream_by_id.values())),
+        'contexts': len(set(router._context_by_id.values())),
+        'handles': len(router._handle_map),
+    }
+    if router.stats:
+        info['stats'] = router.stats.get()
+    return info
+
+
 def get_router_info():
     return {
         'routers': dict(
-            (id_, {
-                'id': id_,
-                'streams': len(set(router._stream_by_id.values())),
-                'contexts': len(set(router._context_by_id.values())),
-                'handles': len(router._handle_map),
-            })
+            (id_, _router_info(id_, router))
             for id_, router in get_routers().items()
         )
     }
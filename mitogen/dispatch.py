@@ -0,0 +1,170 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Functions run by :class:`mitogen.core.Dispatcher` to implement the batched
+and streaming call styles of :class:`mitogen.parent.CallChain`, and the pool
+of threads it runs calls on when the `max_concurrent_calls` connection option
+is set. A child imports this module on its main thread when first needed.
+"""
+
+import sys
+import threading
+
+import mitogen.core
+
+
+@mitogen.core.takes_econtext
+@mitogen.core._orders_chain
+def call_many(chain_id, calls, econtext):
+    """
+    Implement :meth:`mitogen.parent.CallChain.call_many` by running each
+    `(modname, klass, func, args, kwargs)` tuple of `calls` in order,
+    returning a list of their results, with a :class:`mitogen.core.CallError`
+    in place of the result of any call that failed.
+    """
+    dispatcher = econtext.dispatcher
+    results = []
+    for modname, klass, func, args, kwargs in calls:
+        try:
+            fn = dispatcher._resolve(modname, klass, func, kwargs)
+        except Exception:
+            results.append(mitogen.core.CallError(sys.exc_info()[1]))
+            continue
+        results.append(dispatcher._call(chain_id, fn, args, kwargs))
+    return results
+
+
+@mitogen.core.takes_econtext
+def call_iter(modname, klass, func, args, kwargs, sender, window, econtext):
+    """
+    Implement :meth:`mitogen.parent.CallChain.call_iter` by iterating the
+    result of the function named by `(modname, klass, func)`, sending each
+    item as a 1-tuple to `sender`. At most `window` items are sent ahead of
+    the integer credits returned to the :class:`mitogen.core.Sender` first
+    sent to `sender`. The call completes early, returning :data:`None` like a
+    finished iteration, if that sender is closed.
+    """
+    fn = econtext.dispatcher._resolve(modname, klass, func, kwargs)
+    credits = mitogen.core.Receiver(econtext.router, respondent=sender.context)
+    it = None
+    try:
+        sender.send(credits.to_sender())
+        it = iter(fn(*args, **kwargs))
+        for item in it:
+            while window <= 0:
+                try:
+                    window += credits.get().unpickle()
+                except mitogen.core.ChannelError:
+                    return
+            sender.send((item,))
+            window -= 1
+    finally:
+        credits.close()
+        close = getattr(it, 'close', None)
+        if close:
+            close()
+
+
+class Pool(object):
+    """
+    Run calls received by `dispatcher` on up to `size` threads. Calls of a
+    pipelined chain, or of functions decorated by
+    :func:`mitogen.core._orders_chain`, still run one at a time in the order
+    they arrived, while other calls may overlap.
+    """
+    def __init__(self, dispatcher, size):
+        self.dispatcher = dispatcher
+        #: :class:`mitogen.core.Latch` of calls awaiting a thread.
+        self._pending = mitogen.core.Latch()
+        #: Chain ID -> list of calls waiting for a running call of the chain.
+        self._waiting_by_chain_id = {}
+        self._lock = threading.Lock()
+        for x in range(size):
+            th = threading.Thread(
+                target=self._main,
+                name='mitogen.dispatcher.%d' % (x,),
+            )
+            th.daemon = True
+            th.start()
+
+    def __repr__(self):
+        return 'Pool(%r)' % (self.dispatcher,)
+
+    def submit(self, msg):
+        """
+        Parse a call on the main thread, so imports needed to find the
+        function happen there, then queue it for a pool thread, or behind a
+        running call of the same chain.
+        """
+        try:
+            chain_id, fn, args, kwargs = self.dispatcher._parse_request(msg)
+        except Exception:
+            e = mitogen.core.CallError(sys.exc_info()[1])
+            self.dispatcher._reply(msg, None, e)
+            return
+
+        key = chain_id
+        if key is None and getattr(fn, 'mitogen_orders_chain', None):
+            key = args[0]
+        call = (key, msg, chain_id, fn, args, kwargs)
+        if key is not None:
+            self._lock.acquire()
+            try:
+                waiting = self._waiting_by_chain_id.get(key)
+                if waiting is not None:
+                    waiting.append(call)
+                    return
+                self._waiting_by_chain_id[key] = []
+            finally:
+                self._lock.release()
+        self._pending.put(call)
+
+    def close(self):
+        """
+        Cause each pool thread to exit once its current call completes.
+        """
+        self._pending.close()
+
+    def _next_call(self, key):
+        """
+        Return the next waiting call of the chain `key`, or mark the chain
+        idle and return :data:`None`.
+        """
+        if key is None:
+            return None
+        self._lock.acquire()
+        try:
+            waiting = self._waiting_by_chain_id[key]
+            if waiting:
+                return waiting.pop(0)
+            del self._waiting_by_chain_id[key]
+        finally:
+            self._lock.release()
+
+    def _main(self):
+        dispatcher = self.dispatcher
+        router = dispatcher.econtext.router
+        while True:
+            try:
+                call = self._pending.get()
+            except mitogen.core.LatchError:
+                return
+
+            # Run the chain's later calls on this thread, keeping them in
+            # order without a trip through the queue.
+            while call is not None:
+                key, msg, chain_id, fn, args, kwargs = call
+                try:
+                    trace_id = msg.trace_id
+                    if trace_id is not None:
+                        router._trace(trace_id, 'call_start')
+                    ret = dispatcher._call(chain_id, fn, args, kwargs)
+                    if trace_id is not None:
+                        router._trace(trace_id, 'call_end')
+                    dispatcher._reply(msg, chain_id, ret)
+                except Exception:
+                    mitogen.core.LOG.exception('%r: failed to reply to %r',
+                                               self, msg)
+                call = self._next_call(key)
@@ -0,0 +1,331 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+:class:`concurrent.futures.Executor` running function calls across a pool of
+contexts.
+"""
+
+import collections
+import inspect
+import itertools
+import sys
+import threading
+
+try:
+    import concurrent.futures
+    ExecutorBase = concurrent.futures.Executor
+    Future = concurrent.futures.Future
+except ImportError:
+    # Targets only need run_chunk().
+    ExecutorBase = object
+    Future = None
+
+import mitogen.core
+import mitogen.parent
+
+
+def run_chunk(modname, klass, func, chunk):
+    """
+    Invoked in the target context to run one chunk of :meth:`Executor.map`,
+    returning the list of results of calling the function named by
+    `(modname, klass, func)` with each argument tuple in `chunk`.
+    """
+    obj = mitogen.core.import_module(modname)
+    if klass:
+        obj = getattr(obj, klass)
+    fn = getattr(obj, func)
+    return [fn(*args) for args in chunk]
+
+
+def _spec(fn):
+    klass = None
+    if inspect.ismethod(fn):
+        klass = mitogen.core.to_text(fn.__self__.__name__)
+    return (mitogen.core.to_text(fn.__module__), klass,
+            mitogen.core.to_text(fn.__name__))
+
+
+def _chunks(iterables, chunksize):
+    it = iter(zip(*iterables))
+    while True:
+        chunk = tuple(itertools.islice(it, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+class WorkItem(object):
+    def __init__(self, future, fn, args, kwargs):
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        #: :data:`True` once the future was marked running.
+        self.started = False
+
+
+class Slot(object):
+    """
+    Per-context scheduling state of an :class:`Executor`.
+    """
+    def __init__(self, context):
+        self.context = context
+        self.chain = mitogen.parent.CallChain(context)
+        #: Calls awaiting a reply.
+        self.inflight = 0
+        #: :data:`True` once the context disconnected.
+        self.dead = False
+        mitogen.core.listen(context, 'disconnect', self._on_disconnect)
+
+    def _on_disconnect(self):
+        self.dead = True
+
+    def __repr__(self):
+        return 'Slot(%r, inflight=%d, dead=%r)' % (
+            self.context, self.inflight, self.dead,
+        )
+
+
+class Executor(ExecutorBase):
+    """
+    :class:`concurrent.futures.Executor` submitting calls to the least loaded
+    of `contexts`, with at most `max_inflight` calls awaiting a reply from
+    each. Calls beyond that are queued until a reply arrives.
+
+    Calls are sent without waiting for earlier replies, but each is
+    independent: unlike a pipelined :class:`mitogen.parent.CallChain`, an
+    exception raised by one call does not fail later calls.
+
+    If a context disconnects, calls in flight to it are resubmitted to the
+    remaining contexts, so functions should be safe to run twice. Once no
+    context remains, queued calls fail with
+    :class:`mitogen.core.ChannelError`. A call whose reply is lost for any
+    other reason, such as exceeding the maximum message size, fails with
+    :class:`mitogen.core.ChannelError` without being resubmitted.
+
+    Replies are unpickled and futures completed on a private thread, which is
+    also responsible for submitting queued calls as capacity becomes
+    available.
+
+    :param list contexts:
+        :class:`mitogen.parent.Context` instances to run calls on.
+    :param int max_inflight:
+        Maximum calls awaiting a reply from each context.
+    """
+    #: Default maximum calls awaiting a reply from each context.
+    max_inflight = 16
+
+    lost_msg = 'every context of the Executor has disconnected'
+    shutdown_msg = 'cannot schedule new futures after shutdown'
+
+    def __init__(self, contexts, max_inflight=None):
+        if max_inflight is not None:
+            self.max_inflight = max_inflight
+        self._slots = [Slot(context) for context in contexts]
+        self._lock = threading.Lock()
+        self._pending = collections.deque()
+        # Receiver -> (Slot, WorkItem) for calls awaiting a reply.
+        self._inflight = {}
+        self._shutdown = False
+        # Receivers having a reply, put by the broker thread.
+        self._latch = mitogen.core.Latch()
+        self._thread = threading.Thread(
+            target=self._manage,
+            name='mitogen.executor.Executor',
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __repr__(self):
+        return 'Executor(%d contexts, %d pending, %d inflight)' % (
+            len(self._slots), len(self._pending), len(self._inflight),
+        )
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Schedule `fn(*args, **kwargs)` to run on one of the contexts, and
+        return a :class:`concurrent.futures.Future` representing its result.
+        `fn` is subject to the same restrictions as for
+        :meth:`Context.call_async <mitogen.parent.Context.call_async>`.
+        """
+        future = Future()
+        self._lock.acquire()
+        try:
+            if self._shutdown:
+                raise RuntimeError(self.shutdown_msg)
+            self._pending.append(WorkItem(future, fn, args, kwargs))
+        finally:
+            self._lock.release()
+        self._dispatch()
+        return future
+
+    def map(self, fn, *iterables, **kwargs):
+        """
+        Like :meth:`concurrent.futures.Executor.map`. If `chunksize` is
+        greater than 1, each call sent runs `fn` for up to `chunksize` items,
+        reducing per-call overhead for short functions.
+        """
+        chunksize = kwargs.pop('chunksize', 1)
+        if chunksize < 1:
+            raise ValueError('chunksize must be >= 1.')
+        if chunksize == 1:
+            return super(Executor, self).map(fn, *iterables, **kwargs)
+
+        modname, klass, func = _spec(fn)
+        results = super(Executor, self).map(
+            run_chunk,
+            itertools.repeat(modname),
+            itertools.repeat(klass),
+            itertools.repeat(func),
+            _chunks(iterables, chunksize),
+            **kwargs
+        )
+        return self._flatten(results)
+
+    def _flatten(self, results):
+        for result in results:
+            for value in result:
+                yield value
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        Refuse further calls, optionally cancelling any that were not yet
+        sent, and if `wait` is :data:`True`, wait for those already sent to
+        complete.
+        """
+        self._lock.acquire()
+        try:
+            self._shutdown = True
+            if cancel_futures:
+                while self._pending:
+                    self._pending.popleft().future.cancel()
+            self._close_if_idle()
+        finally:
+            self._lock.release()
+        if wait:
+            self._thread.join()
+
+    def _close_if_idle(self):
+        if self._shutdown and not (self._pending or self._inflight):
+            self._latch.close()
+
+    def _pick(self):
+        """
+        Return the live slot with fewest calls in flight if it has capacity,
+        otherwise :data:`None`. Call with :attr:`_lock` held.
+        """
+        best = None
+        for slot in self._slots:
+            if not slot.dead and (best is None or
+                                  slot.inflight < best.inflight):
+                best = slot
+        if best is not None and best.inflight < self.max_inflight:
+            return best
+
+    def _take(self):
+        """
+        Remove and return a list of `(slot, item)` to send. Call with
+        :attr:`_lock` held.
+        """
+        sends = []
+        while self._pending:
+            slot = self._pick()
+            if slot is None:
+                break
+            item = self._pending.popleft()
+            if not (item.started or
+                    item.future.set_running_or_notify_cancel()):
+                continue  # Cancelled.
+            item.started = True
+            slot.inflight += 1
+            sends.append((slot, item))
+
+        if self._pending and not [s for s in self._slots if not s.dead]:
+            e = mitogen.core.ChannelError(self.lost_msg)
+            while self._pending:
+                item = self._pending.popleft()
+                if item.started or item.future.set_running_or_notify_cancel():
+                    item.future.set_exception(e)
+        return sends
+
+    def _dispatch(self):
+        self._lock.acquire()
+        try:
+            sends = self._take()
+        finally:
+            self._lock.release()
+
+        for slot, item in sends:
+            try:
+                recv = slot.chain.call_async(item.fn, *item.args,
+                                             **item.kwargs)
+            except Exception:
+                self._lock.acquire()
+                try:
+                    slot.inflight -= 1
+                    self._close_if_idle()
+                finally:
+                    self._lock.release()
+                item.future.set_exception(sys.exc_info()[1])
+                continue
+
+            self._lock.acquire()
+            try:
+                self._inflight[recv] = (slot, item)
+            finally:
+                self._lock.release()
+            recv.notify = self._latch.put
+            if recv.size():
+                # The reply arrived before notify was set.
+                self._latch.put(recv)
+
+    def _complete(self, recv):
+        try:
+            msg = recv.get(block=False, throw_dead=False)
+        except mitogen.core.TimeoutError:
+            return  # Put twice, already completed.
+
+        lost = False
+        self._lock.acquire()
+        try:
+            slot, item = self._inflight.pop(recv)
+            slot.inflight -= 1
+            if msg.is_dead and self._is_lost(slot, msg):
+                slot.dead = lost = True
+                self._pending.appendleft(item)
+        finally:
+            self._lock.release()
+
+        if not lost:
+            try:
+                item.future.set_result(msg.unpickle())
+            except Exception:
+                item.future.set_exception(sys.exc_info()[1])
+
+    def _is_lost(self, slot, msg):
+        """
+        Return :data:`True` if the dead reply `msg` means the context of
+        `slot` disconnected, rather than the call or its reply being refused.
+        The reply may be handled before :meth:`Slot._on_disconnect` runs.
+        """
+        reason = msg.data.decode('utf-8', 'replace')
+        return slot.dead or (
+            reason == slot.context.router.respondent_disconnect_msg
+        )
+
+    def _manage(self):
+        while True:
+            try:
+                recvs = self._latch.get_many()
+            except mitogen.core.LatchError:
+                return
+            for recv in recvs:
+                self._complete(recv)
+            self._dispatch()
+            self._lock.acquire()
+            try:
+                self._close_if_idle()
+            finally:
+                self._lock.release()
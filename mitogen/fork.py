@@ -152,9 +152,14 @@ class Options(mitogen.parent.Options):
     #: User-supplied function for cleaning up child process state.
     on_fork = None
 
+    #: If not :data:`None`, size in bytes of each :class:`mitogen.shm.Ring`
+    #: carrying bulk data between parent and child.
+    shared_memory = None
+
     def __init__(self, old_router, max_message_size, on_fork=None, debug=False,
                  profiling=False, unidirectional=False, on_start=None,
-                 name=None):
+                 name=None, stream_compression=None, log_rate_limit=None,
+                 shared_memory=False, max_concurrent_calls=None):
         if not FORK_SUPPORTED:
             raise Error(self.python_version_msg)
 
@@ -162,9 +167,17 @@ class Options(mitogen.parent.Options):
         super(Options, self).__init__(
             max_message_size=max_message_size, debug=debug,
             profiling=profiling, unidirectional=unidirectional, name=name,
+            stream_compression=stream_compression,
+            log_rate_limit=log_rate_limit,
+            max_concurrent_calls=max_concurrent_calls,
         )
         self.on_fork = on_fork
         self.on_start = on_start
+        if shared_memory is True:
+            from mitogen.shm import Channel
+            self.shared_memory = Channel.size
+        elif shared_memory:
+            self.shared_memory = int(shared_memory)
 
         responder = getattr(old_router, 'responder', None)
         if isinstance(responder, mitogen.parent.ModuleForwarder):
@@ -184,7 +197,14 @@ class Connection(mitogen.parent.Connection):
 
     name_prefix = u'fork'
 
+    #: The :class:`mitogen.shm.Channel` shared with the child, if the
+    #: `shared_memory` option was specified.
+    channel = None
+
     def start_child(self):
+        if self.options.shared_memory:
+            from mitogen.shm import Channel
+            self.channel = Channel(self.options.shared_memory)
         parentfp, childfp = mitogen.parent.create_socketpair()
         pid = os.fork()
         if pid:
@@ -208,15 +228,30 @@ class Connection(mitogen.parent.Connection):
         config['setup_package'] = False
         if self.options.on_start:
             config['on_start'] = self.options.on_start
+        if self.channel:
+            config['stream_factory'] = self.channel.child_stream
         return config
 
+    def stream_factory(self):
+        if not self.channel:
+            return super(Connection, self).stream_factory()
+        stream = self.channel.parent_stream()
+        stream.set_protocol(
+            self.stream_protocol_class(broker=self._router.broker)
+        )
+        return stream
+
     def _child_main(self, childfp):
         on_fork()
         if self.options.on_fork:
             self.options.on_fork()
         mitogen.core.set_blocking(childfp.fileno(), True)
 
-        childfp.send(b('MITO002\n'))
+        if self.channel:
+            from mitogen.shm import frame
+            childfp.send(frame(b('MITO002\n')))
+        else:
+            childfp.send(b('MITO002\n'))
 
         # Expected by the ExternalContext.main().
         os.dup2(childfp.fileno(), 1)
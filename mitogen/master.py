@@ -42,6 +42,7 @@ import os
 import pkgutil
 import re
 import string
+import struct
 import sys
 import threading
 import types
@@ -83,6 +84,7 @@ import mitogen.core
 import mitogen.imports
 import mitogen.minify
 import mitogen.parent
+import mitogen.recvbuf
 
 from mitogen.core import any
 from mitogen.core import b
@@ -364,7 +366,44 @@ class LogForwarder(object):
                       self, msg.src_id)
             return
 
-        name, level_s, s = msg.data.decode('utf-8', 'replace').split('\x00', 2)
+        if msg.enc != msg.ENC_BIN:
+            self._log(context, msg.data)
+            return
+
+        # A batch of length-prefixed records from LogHandler.
+        data = msg.data
+        if not isinstance(data, mitogen.core.BytesType):
+            data = data.tobytes()
+        obj = zlib.decompressobj()
+        try:
+            data = obj.decompress(data, self._router.max_message_size)
+        except zlib.error:
+            LOG.error('%s: dropping corrupt log batch from %r', self, context)
+            return
+        if obj.unconsumed_tail:
+            LOG.error('%s: dropping oversized log batch from %r',
+                      self, context)
+            return
+
+        records = []
+        offset = 0
+        while offset < len(data):
+            if offset + 4 > len(data):
+                break
+            size, = struct.unpack('>L', data[offset:offset+4])
+            offset += 4
+            if offset + size > len(data):
+                break
+            records.append(data[offset:offset+size])
+            offset += size
+        else:
+            for record in records:
+                self._log(context, record)
+            return
+        LOG.error('%s: dropping truncated log batch from %r', self, context)
+
+    def _log(self, context, data):
+        name, level_s, s = data.decode('utf-8', 'replace').split('\x00', 2)
 
         logger_name = '%s.[%s]' % (name, context.name)
         logger = self._cache.get(logger_name)
@@ -386,7 +425,7 @@ class LogForwarder(object):
             }
         )
         record.mitogen_message = s
-        record.mitogen_context = self._router.context_by_id(msg.src_id)
+        record.mitogen_context = context
         record.mitogen_name = name
         logger.handle(record)
 
@@ -1364,6 +1403,10 @@ class Broker(mitogen.core.Broker):
     _watcher = None
     poller_class = mitogen.parent.PREFERRED_POLLER
 
+    #: Class instantiated as :attr:`timers`, either
+    #: :class:`mitogen.parent.TimerList` or :class:`mitogen.parent.TimerWheel`.
+    timers_class = mitogen.parent.TimerList
+
     def __init__(self, install_watcher=True):
         if install_watcher:
             self._watcher = ThreadWatcher.watch(
@@ -1371,7 +1414,7 @@ class Broker(mitogen.core.Broker):
                 on_join=self.shutdown,
             )
         super(Broker, self).__init__()
-        self.timers = mitogen.parent.TimerList()
+        self.timers = self.timers_class()
 
     def shutdown(self):
         super(Broker, self).shutdown()
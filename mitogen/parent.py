@@ -35,6 +35,7 @@ connection.
 """
 
 import binascii
+import collections
 import errno
 import fcntl
 import getpass
@@ -679,6 +680,150 @@ class TimerList(object):
                 timer.func()
 
 
+class WheelTimer(Timer):
+    """
+    A :class:`Timer` belonging to a :class:`TimerWheel`, which is removed from
+    the wheel as soon as it is cancelled.
+    """
+    def __init__(self, when, func, wheel, tick):
+        self.when = when
+        self.func = func
+        self._wheel = wheel
+        self._tick = tick
+
+    def cancel(self):
+        if self.active:
+            self.active = False
+            self._wheel._remove(self)
+
+
+class TimerWheel(object):
+    """
+    A hashed timing wheel, offering the same interface as :class:`TimerList`
+    while scheduling and cancelling events in constant time.
+
+    Events are hashed by their due tick into one of :attr:`size` slots.
+    :meth:`expire` visits only the slots for ticks that passed since it last
+    ran, and :meth:`get_timeout` remembers the earliest event, so the cost of
+    the broker loop does not depend on the number of outstanding events.
+    Events due within the same tick may expire in any order.
+
+    Install it on a broker by setting
+    :attr:`mitogen.master.Broker.timers_class`.
+    """
+    _now = mitogen.core.now
+
+    #: Seconds covered by each slot.
+    resolution = 0.01
+
+    #: Number of slots. Events due more than :attr:`size` ticks ahead share
+    #: slots with earlier events, and are skipped until their turn comes.
+    size = 512
+
+    def __init__(self):
+        self._slots = [{} for _ in range(self.size)]
+        # Lowest tick whose slot may still hold due events.
+        self._tick = 0
+        self._count = 0
+        # Earliest event, or None if it must be searched for.
+        self._earliest = None
+
+    def __len__(self):
+        return self._count
+
+    def _remove(self, timer):
+        del self._slots[timer._tick % self.size][id(timer)]
+        self._count -= 1
+        if timer is self._earliest:
+            self._earliest = None
+
+    def _find_earliest(self):
+        for tick in range(self._tick, self._tick + self.size):
+            earliest = None
+            for timer in self._slots[tick % self.size].values():
+                if timer._tick == tick and (earliest is None or
+                                            timer.when < earliest.when):
+                    earliest = timer
+            if earliest is not None:
+                return earliest
+
+        # All events are more than one revolution away.
+        for slot in self._slots:
+            for timer in slot.values():
+                if earliest is None or timer.when < earliest.when:
+                    earliest = timer
+        return earliest
+
+    def get_timeout(self):
+        """
+        Return the floating point seconds until the next event is due.
+
+        :returns:
+            Floating point delay, or 0.0, or :data:`None` if no events are
+            scheduled.
+        """
+        if not self._count:
+            return None
+        if self._earliest is None:
+            self._earliest = self._find_earliest()
+        return max(0, self._earliest.when - self._now())
+
+    def schedule(self, when, func):
+        """
+        Schedule a future event.
+
+        :param float when:
+            UNIX time in seconds when event should occur.
+        :param callable func:
+            Callable to invoke on expiry.
+        :returns:
+            A :class:`WheelTimer` instance, exposing :meth:`Timer.cancel`,
+            which may be used to cancel the future invocation.
+        """
+        tick = int(when / self.resolution)
+        if not self._count:
+            self._tick = min(tick, int(self._now() / self.resolution))
+        elif tick < self._tick:
+            # Already due, ensure its slot is visited by the next expire().
+            tick = self._tick
+
+        timer = WheelTimer(when, func, self, tick)
+        self._slots[tick % self.size][id(timer)] = timer
+        self._count += 1
+        if self._count == 1 or (self._earliest is not None and
+                                when < self._earliest.when):
+            self._earliest = timer
+        return timer
+
+    def expire(self):
+        """
+        Invoke callbacks for any events in the past.
+        """
+        if not self._count:
+            return
+        if self._earliest is None:
+            self._earliest = self._find_earliest()
+        now = self._now()
+        now_tick = int(now / self.resolution)
+        if self._earliest.when > now:
+            # Nothing is due, so no slot need be visited.
+            if now_tick > self._tick:
+                self._tick = now_tick
+            return
+
+        stop = min(now_tick, self._tick + self.size - 1)
+        for tick in range(self._tick, stop + 1):
+            slot = self._slots[tick % self.size]
+            for timer in [t for t in slot.values() if t.when <= now]:
+                # An earlier callback may have cancelled it.
+                if timer.active:
+                    self._remove(timer)
+                    timer.active = False
+                    timer.func()
+        if now_tick > self._tick:
+            self._tick = now_tick
+
+
 class PartialZlib(object):
     """
     Because the mitogen.core source has a line appended to it during bootstrap,
@@ -1021,32 +1166,95 @@ class KqueuePoller(mitogen.core.Poller):
 class EpollPoller(mitogen.core.Poller):
     """
     Poller based on the Linux :linux:man7:`epoll` interface.
+
+    Registering or removing interest in an FD is applied immediately, since
+    the FD may be closed soon after, but other changes are batched and applied
+    once per :meth:`poll`, skipping any that cancel out.
+
+    :param bool edge_triggered:
+        If not :data:`None`, overrides :attr:`edge_triggered`.
     """
     SUPPORTED = hasattr(select, 'epoll')
     _inmask = SUPPORTED and select.EPOLLIN | select.EPOLLHUP
+    _outmask = SUPPORTED and select.EPOLLOUT | select.EPOLLHUP | select.EPOLLERR
 
-    def __init__(self):
+    #: If :data:`True`, write interest is registered edge-triggered, in a
+    #: separate epoll instance nested within the main one, and kept for as
+    #: long as the FD is in use. Whether each FD is writeable is tracked here
+    #: rather than in the kernel, so a stream that repeatedly fills and drains
+    #: its buffer costs no :linux:man2:`epoll_ctl` calls. Read interest is
+    #: unaffected, since readers do not report when they drained an FD.
+    edge_triggered = False
+
+    #: Maximum events returned by each :linux:man2:`epoll_wait` call.
+    max_events = 256
+
+    def __init__(self, edge_triggered=None):
         super(EpollPoller, self).__init__()
+        if edge_triggered is not None:
+            self.edge_triggered = edge_triggered
         self._epoll = select.epoll(32)
-        self._registered_fds = set()
+        # FD -> mask registered with the kernel.
+        self._registered = {}
+        # FDs whose registration may differ from _rfds/_wfds.
+        self._dirty = set()
+        if self.edge_triggered:
+            self._wepoll = select.epoll(32)
+            self._wepoll_fd = self._wepoll.fileno()
+            self._epoll.register(self._wepoll_fd, select.EPOLLIN)
+            # FDs registered with _wepoll.
+            self._wregistered = set()
+            # FDs believed writeable, having seen an edge since last found
+            # otherwise.
+            self._writeable = set()
 
     def close(self):
         super(EpollPoller, self).close()
         self._epoll.close()
+        if self.edge_triggered:
+            self._wepoll.close()
+
+    def _mask(self, fd):
+        mask = (fd in self._rfds) and select.EPOLLIN
+        if not self.edge_triggered:
+            mask |= (fd in self._wfds) and select.EPOLLOUT
+        return mask
 
     def _control(self, fd):
         IOLOG.debug('%r._control(%r)', self, fd)
-        mask = (((fd in self._rfds) and select.EPOLLIN) |
-                ((fd in self._wfds) and select.EPOLLOUT))
-        if mask:
-            if fd in self._registered_fds:
+        mask = self._mask(fd)
+        if not mask:
+            self._dirty.discard(fd)
+            if self._registered.pop(fd, None) is not None:
+                self._epoll.unregister(fd)
+        elif fd not in self._registered:
+            self._epoll.register(fd, mask)
+            self._registered[fd] = mask
+        else:
+            self._dirty.add(fd)
+
+    def _apply(self):
+        """
+        Apply batched registration changes.
+        """
+        dirty = self._dirty
+        self._dirty = set()
+        for fd in dirty:
+            mask = self._mask(fd)
+            if mask and mask != self._registered.get(fd, mask):
                 self._epoll.modify(fd, mask)
-            else:
-                self._epoll.register(fd, mask)
-                self._registered_fds.add(fd)
-        elif fd in self._registered_fds:
-            self._epoll.unregister(fd)
-            self._registered_fds.remove(fd)
+                self._registered[fd] = mask
+
+    def _control_write(self, fd):
+        IOLOG.debug('%r._control_write(%r)', self, fd)
+        if fd in self._wfds:
+            if fd not in self._wregistered:
+                self._wepoll.register(fd, self._outmask | select.EPOLLET)
+                self._wregistered.add(fd)
+        elif fd in self._wregistered and fd not in self._rfds:
+            self._wepoll.unregister(fd)
+            self._wregistered.discard(fd)
+            self._writeable.discard(fd)
 
     def start_receive(self, fd, data=None):
         IOLOG.debug('%r.start_receive(%r, %r)', self, fd, data)
@@ -1057,25 +1265,49 @@ class EpollPoller(mitogen.core.Poller):
         IOLOG.debug('%r.stop_receive(%r)', self, fd)
         self._rfds.pop(fd, None)
         self._control(fd)
+        if self.edge_triggered:
+            self._control_write(fd)
 
     def start_transmit(self, fd, data=None):
         IOLOG.debug('%r.start_transmit(%r, %r)',
             self, fd, data)
         self._wfds[fd] = (data or fd, self._generation)
-        self._control(fd)
+        if self.edge_triggered:
+            self._control_write(fd)
+        else:
+            self._control(fd)
 
     def stop_transmit(self, fd):
         IOLOG.debug('%r.stop_transmit(%r)', self, fd)
         self._wfds.pop(fd, None)
-        self._control(fd)
+        if self.edge_triggered:
+            self._control_write(fd)
+        else:
+            self._control(fd)
 
     def _poll(self, timeout):
+        if self._dirty:
+            self._apply()
+
         the_timeout = -1
         if timeout is not None:
             the_timeout = timeout
-
-        events, _ = mitogen.core.io_op(self._epoll.poll, the_timeout, 32)
+        if self.edge_triggered:
+            for fd in self._writeable:
+                if fd in self._wfds:
+                    # Already known writeable, don't block.
+                    the_timeout = 0
+                    break
+
+        events, _ = mitogen.core.io_op(self._epoll.poll, the_timeout,
+                                       self.max_events)
         for fd, event in events:
+            if self.edge_triggered and fd == self._wepoll_fd:
+                wevents, _ = mitogen.core.io_op(self._wepoll.poll, 0,
+                                                self.max_events)
+                for wfd, wevent in wevents:
+                    self._writeable.add(wfd)
+                continue
             if event & self._inmask:
                 data, gen = self._rfds.get(fd, (None, None))
                 if gen and gen < self._generation:
@@ -1088,6 +1320,17 @@ class EpollPoller(mitogen.core.Poller):
                     IOLOG.debug('%r: POLLOUT: %r', self, fd)
                     yield data
 
+        if self.edge_triggered and self._writeable:
+            for fd in list(self._writeable):
+                data, gen = self._wfds.get(fd, (None, None))
+                if gen and gen < self._generation:
+                    IOLOG.debug('%r: POLLOUT: %r', self, fd)
+                    yield data
+                    if fd in self._wfds:
+                        # Still waiting to write, so the FD filled up. A new
+                        # edge arrives once it drains.
+                        self._writeable.discard(fd)
+
 
 POLLERS = (EpollPoller, KqueuePoller, PollPoller, mitogen.core.Poller)
 PREFERRED_POLLER = next(cls for cls in POLLERS if cls.SUPPORTED)
@@ -1242,11 +1485,45 @@ class LogProtocol(LineLoggingProtocolMixin, mitogen.core.DelimitedProtocol):
         LOG.info(u'%s: %s', self.stream.name, line.decode('utf-8', 'replace'))
 
 
+class PriorityWriter(mitogen.core.BufferedWriter):
+    """
+    Extend core.BufferedWriter to queue frames in a separate lane for each of
+    the :attr:`mitogen.core.Message.priority` values. Lanes are drained in
+    priority order, except that a partially written frame always completes
+    first.
+    """
+    #: Priority of frames queued by the next :meth:`writev` or :meth:`cork`,
+    #: set by :meth:`MitogenProtocol._send`.
+    priority = mitogen.core.Message.PRIO_NORMAL
+
+    def __init__(self, broker, protocol):
+        super(PriorityWriter, self).__init__(broker, protocol)
+        self._lanes = [
+            collections.deque()
+            for x in range(mitogen.core.Message.PRIO_BULK + 1)
+        ]
+
+    def _push(self, frame):
+        self._lanes[self.priority].append(frame)
+
+
 class MitogenProtocol(mitogen.core.MitogenProtocol):
     """
-    Extend core.MitogenProtocol to cause SHUTDOWN to be sent to the child
-    during graceful shutdown.
+    Extend core.MitogenProtocol to write messages in priority order, and to
+    cause SHUTDOWN to be sent to the child during graceful shutdown.
     """
+    writer_class = PriorityWriter
+
+    def _send(self, msg):
+        priority = msg.priority
+        if priority is None:
+            if msg.handle in mitogen.core.Message.CONTROL_HANDLES:
+                priority = mitogen.core.Message.PRIO_CONTROL
+            else:
+                priority = mitogen.core.Message.PRIO_NORMAL
+        self._writer.priority = priority
+        super(MitogenProtocol, self)._send(msg)
+
     def on_shutdown(self, broker):
         """
         Respond to the broker's request for the stream to shut down by sending
@@ -1280,6 +1557,18 @@ class Options(object):
     #: True if unidirectional routing is enabled in the new child.
     unidirectional = False
 
+    #: If not :data:`None`, :mod:`zlib` level at which large message bodies
+    #: are compressed by both ends of the stream to the new child.
+    stream_compression = None
+
+    #: If not :data:`None`, maximum log records per second the new child
+    #: forwards to the master.
+    log_rate_limit = None
+
+    #: If not :data:`None`, maximum function calls the new child runs
+    #: concurrently on a pool of threads.
+    max_concurrent_calls = None
+
     #: Passed via Router wrapper methods, must eventually be passed to
     #: ExternalContext.main().
     max_message_size = None
@@ -1293,7 +1582,9 @@ class Options(object):
 
     def __init__(self, max_message_size, name=None, remote_name=None,
                  python_path=None, debug=False, connect_timeout=None,
-                 profiling=False, unidirectional=False, old_router=None):
+                 profiling=False, unidirectional=False, old_router=None,
+                 stream_compression=None, log_rate_limit=None,
+                 max_concurrent_calls=None):
         self.name = name
         self.max_message_size = max_message_size
         if python_path:
@@ -1310,6 +1601,12 @@ class Options(object):
         self.profiling = profiling
         self.unidirectional = unidirectional
         self.max_message_size = max_message_size
+        if stream_compression:
+            self.stream_compression = int(stream_compression)
+        if log_rate_limit is not None:
+            self.log_rate_limit = float(log_rate_limit)
+        if max_concurrent_calls:
+            self.max_concurrent_calls = int(max_concurrent_calls)
         self.connect_deadline = mitogen.core.now() + self.connect_timeout
 
 
@@ -1369,6 +1666,10 @@ class Connection(object):
     #: on the exit status of the subprocess.
     _reaper = None
 
+    #: :class:`mitogen.compress.Compressor` for the stream to the child, when
+    #: :attr:`Options.stream_compression` is set.
+    _compressor = None
+
     #: On failure, the exception object that should be propagated back to the
     #: user.
     exception = None
@@ -1506,6 +1807,9 @@ class Connection(object):
             'profiling': self.options.profiling,
             'unidirectional': self.options.unidirectional,
             'max_message_size': self.options.max_message_size,
+            'stream_compression': self.options.stream_compression,
+            'log_rate_limit': self.options.log_rate_limit,
+            'max_concurrent_calls': self.options.max_concurrent_calls,
             'version': mitogen.__version__,
         }
 
@@ -1553,6 +1857,7 @@ class Connection(object):
                 MitogenProtocol(
                     router=self._router,
                     remote_id=self.context.context_id,
+                    compressor=self._compressor,
                 )
             )
             self._router.route_monitor.notice_stream(self.stdio_stream)
@@ -1711,6 +2016,10 @@ class Connection(object):
 
     def connect(self, context):
         self.context = context
+        if self.options.stream_compression:
+            # Imported here, since the broker thread of a child cannot import.
+            from mitogen.compress import Compressor
+            self._compressor = Compressor(self.options.stream_compression)
         self.latch = mitogen.core.Latch()
         self._router.broker.defer(self._async_connect)
         self.latch.get()
@@ -1757,6 +2066,100 @@ class ChildIdAllocator(object):
         return self.allocate()
 
 
+class ResultIterator(object):
+    """
+    Iterator returned by :meth:`CallChain.call_iter`, lazily producing each
+    item yielded by a function in a remote context as it arrives, and granting
+    the function credit to send more items as they are consumed.
+
+    Iteration raises :class:`mitogen.core.CallError` if the function raised
+    an exception, or :class:`mitogen.core.ChannelError` if the context
+    disconnected. :meth:`close` stops the function before it is exhausted,
+    and is invoked automatically when the iterator is garbage collected. The
+    context manager protocol is supported to ensure :meth:`close` is invoked
+    promptly.
+
+    :param mitogen.core.Receiver recv:
+        Receiver the call was made with.
+    :param int window:
+        Number of items the function may send before awaiting credit.
+    """
+    def __init__(self, recv, window):
+        self.recv = recv
+        self.window = window
+        #: :class:`mitogen.core.Sender` returning credit to the function, once
+        #: it has announced it.
+        self._credit = None
+        #: Items consumed without yet returning their credit.
+        self._consumed = 0
+        self._closed = False
+
+    def __repr__(self):
+        return 'ResultIterator(%r)' % (self.recv,)
+
+    def __del__(self):
+        # An iterator abandoned unfinished must still release the function,
+        # which otherwise waits forever for credit, blocking its thread.
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _1, _2, _3):
+        self.close()
+
+    def _get(self):
+        while True:
+            obj = self.recv.get().unpickle()
+            if not isinstance(obj, mitogen.core.Sender):
+                return obj
+            self._credit = obj
+
+    def __next__(self):
+        if self._closed:
+            raise StopIteration
+        try:
+            obj = self._get()
+        except mitogen.core.Error:
+            self.close()
+            raise
+        if obj is None:
+            # The call's own return value marks the end of its items.
+            self._credit = None
+            self.close()
+            raise StopIteration
+
+        self._consumed += 1
+        if self._consumed >= max(1, self.window // 2):
+            self._credit.send(self._consumed)
+            self._consumed = 0
+        return obj[0]
+
+    next = __next__
+
+    def close(self):
+        """
+        Stop receiving items, causing the function to finish at its next
+        attempt to send an item beyond its remaining credit.
+        """
+        if not self._closed:
+            self._closed = True
+            if self._credit is not None:
+                self._credit.close()
+            self.recv.close()
+
+
+#: Specs naming the functions of :mod:`mitogen.dispatch`, which is only
+#: imported by the child running them.
+_CALL_ITER_SPEC = (mitogen.core.to_text('mitogen.dispatch'), None,
+                   mitogen.core.to_text('call_iter'))
+_CALL_MANY_SPEC = (mitogen.core.to_text('mitogen.dispatch'), None,
+                   mitogen.core.to_text('call_many'))
+
+
 class CallChain(object):
     """
     Deliver :data:`mitogen.core.CALL_FUNCTION` messages to a target context,
@@ -1875,7 +2278,12 @@ class CallChain(object):
         'serializing arbitrary program state.'
     )
 
-    def make_msg(self, fn, *args, **kwargs):
+    def make_spec(self, fn):
+        """
+        Return the `(modname, klass, funcname)` tuple naming `fn` in a
+        :data:`mitogen.core.CALL_FUNCTION` message, or raise :class:`TypeError`
+        if `fn` cannot be invoked remotely.
+        """
         if getattr(fn, closure_attr, None) is not None:
             raise TypeError(self.closures_msg)
         if fn.__name__ == '<lambda>':
@@ -1889,16 +2297,14 @@ class CallChain(object):
         else:
             klass = None
 
-        tup = (
-            self.chain_id,
+        return (
             mitogen.core.to_text(fn.__module__),
             klass,
             mitogen.core.to_text(fn.__name__),
-            args,
-            mitogen.core.Kwargs(kwargs)
         )
-        return mitogen.core.Message.pickled(tup,
-            handle=mitogen.core.CALL_FUNCTION)
+
+    def make_msg(self, fn, *args, **kwargs):
+        return _make_call_msg(self.chain_id, self.make_spec(fn), args, kwargs)
 
     def call_no_reply(self, fn, *args, **kwargs):
         """
@@ -1985,6 +2391,349 @@ class CallChain(object):
         receiver = self.call_async(fn, *args, **kwargs)
         return receiver.get().unpickle(throw_dead=False)
 
+    #: Number of items a function invoked by :meth:`call_iter` may send before
+    #: awaiting credit from the caller.
+    iter_window = 64
+
+    def call_iter(self, fn, *args, **kwargs):
+        """
+        Like :meth:`call_async`, but for a function returning an iterable,
+        such as a generator function. Each item is sent as a separate message
+        as the function produces it, rather than the complete result being
+        built and serialized in the target context.
+
+        Flow control allows the function to run at most :attr:`iter_window`
+        items ahead of the caller. A slow caller therefore suspends the
+        function, blocking the thread it runs on in the target context.
+
+        :returns:
+            :class:`ResultIterator` producing each item as it arrives::
+
+                for path in context.call_iter(walk_tree, '/var/log'):
+                    print(path)
+        """
+        LOG.debug('starting iterating function call to %s: %r',
+                  self.context.name or self.context.context_id,
+                  CallSpec(fn, args, kwargs))
+        router = self.context.router
+        recv = mitogen.core.Receiver(router, respondent=self.context)
+        msg = _make_call_msg(
+            self.chain_id,
+            _CALL_ITER_SPEC,
+            self.make_spec(fn) + (args, mitogen.core.Kwargs(kwargs),
+                                  recv.to_sender(), self.iter_window),
+            {},
+        )
+        msg.dst_id = self.context.context_id
+        msg.reply_to = recv.handle
+        self.context.send(msg)
+        return ResultIterator(recv, self.iter_window)
+
+    def call_many(self, calls):
+        """
+        Invoke a batch of functions in order, using a single message and a
+        single reply, to avoid the overhead of a round-trip for each of many
+        small calls.
+
+        :param list calls:
+            List of `(fn, args, kwargs)` tuples, where each `fn` obeys the same
+            restrictions as :meth:`call_async`.
+        :returns:
+            List of return values, in the order of `calls`, with a
+            :class:`mitogen.core.CallError` in place of the return value of
+            any call that raised an exception. When pipelining is enabled, a
+            failure causes every subsequent call to fail with the same
+            exception, as with calls made individually.
+
+        ::
+
+            for path, st in zip(paths, chain.call_many([
+                (os.stat, (path,), {}) for path in paths
+            ])):
+                if isinstance(st, mitogen.core.CallError):
+                    print('%s: %s' % (path, st))
+        """
+        recv = self.context.send_async(self.make_many_msg(calls))
+        return recv.get().unpickle(throw_dead=False)
+
+    def make_many_msg(self, calls):
+        specs = [
+            self.make_spec(fn) + (tuple(args), mitogen.core.Kwargs(kwargs))
+            for fn, args, kwargs in calls
+        ]
+        # The batch itself is sent without a chain ID, so it is not cancelled
+        # by a prior failure, as mitogen.dispatch.call_many() reports it per
+        # call.
+        return _make_call_msg(
+            None,
+            _CALL_MANY_SPEC,
+            (self.chain_id, specs),
+            {},
+        )
+
+
+def _make_call_msg(chain_id, spec, args, kwargs):
+    if mitogen.is_master and mitogen.core._dump_primitive is None:
+        # A child imports the encoder only on its main thread, once a call
+        # arrives encoded this way. A master may import it on any thread.
+        mitogen.core.import_module('mitogen.primitive')
+    modname, klass, funcname = spec
+    tup = (
+        chain_id,
+        modname,
+        klass,
+        funcname,
+        args,
+        mitogen.core.Kwargs(kwargs)
+    )
+    return mitogen.core.Message.serialized(tup,
+        handle=mitogen.core.CALL_FUNCTION)
+
+
+def _resolve_spec(spec):
+    modname, klass, funcname = spec
+    obj = mitogen.core.import_module(modname)
+    if klass:
+        obj = getattr(obj, klass)
+    return getattr(obj, funcname)
+
+
+def _reduce_group(router, reducer_spec, spec, args, kwargs, context_ids,
+                  econtext=None):
+    """
+    Run the function named by `spec` in each of `context_ids`, using one call
+    per next hop towards them, and fold successful results together using
+    the reducer named by `reducer_spec`. Return `(result, count, failures)`,
+    where `count` is the number of results folded into `result`, and
+    `failures` maps the ID of each context whose call failed to a
+    :class:`mitogen.core.CallError`.
+
+    Only the initiating context, where `econtext` is :data:`None`, calls
+    contexts reached via its parent, each directly. Elsewhere, members without
+    a route below this context fail locally, rather than being sent back
+    upstream.
+    """
+    by_hop = {}
+    local = False
+    failures = {}
+    for context_id in context_ids:
+        if context_id == mitogen.context_id:
+            local = True
+            continue
+        stream = router._stream_by_id.get(context_id)
+        if stream is not None:
+            hop_id = stream.protocol.remote_id
+            by_hop.setdefault(hop_id, []).append(context_id)
+        elif econtext is None and router.stream_by_id(context_id):
+            by_hop[context_id] = [context_id]
+        else:
+            failures[context_id] = mitogen.core.CallError(
+                router.no_route_msg, context_id, mitogen.context_id)
+
+    # Start every subtree before running any local call, so they proceed in
+    # parallel with it.
+    pending = []
+    for hop_id, members in by_hop.items():
+        context = router.context_by_id(hop_id)
+        if members == [hop_id]:
+            msg = _make_call_msg(None, spec, args, kwargs)
+        else:
+            msg = _make_call_msg(None, _REDUCE_GROUP_SPEC,
+                (reducer_spec, spec, args, kwargs, members), {})
+        pending.append((members, members != [hop_id],
+                        context.send_async(msg)))
+
+    results = []
+    if local:
+        try:
+            fn = _resolve_spec(spec)
+            kwargs = dict(kwargs)
+            if getattr(fn, 'mitogen_takes_econtext', None):
+                kwargs.setdefault('econtext', econtext)
+            if getattr(fn, 'mitogen_takes_router', None):
+                kwargs.setdefault('router', router)
+            results.append((fn(*args, **kwargs), 1))
+        except Exception:
+            e = sys.exc_info()[1]
+            failures[mitogen.context_id] = mitogen.core.CallError(e)
+
+    for members, is_subtree, recv in pending:
+        try:
+            result = recv.get().unpickle()
+        except mitogen.core.CallError:
+            e = sys.exc_info()[1]
+            failures.update((context_id, e) for context_id in members)
+            continue
+        except mitogen.core.ChannelError:
+            e = mitogen.core.CallError(sys.exc_info()[1])
+            failures.update((context_id, e) for context_id in members)
+            continue
+
+        if is_subtree:
+            result, count, sub_failures = result
+            failures.update(sub_failures)
+            if count:
+                results.append((result, count))
+        else:
+            results.append((result, 1))
+
+    if not results:
+        return None, 0, failures
+
+    reducer = _resolve_spec(reducer_spec)
+    result, count = results[0]
+    for value, n in results[1:]:
+        result = reducer(result, value)
+        count += n
+    return result, count, failures
+
+
+@mitogen.core.takes_econtext
+def _reduce_subtree(reducer_spec, spec, args, kwargs, context_ids, econtext):
+    """
+    Implement :meth:`GroupCallChain.call_reduce` in an intermediate context.
+    """
+    return _reduce_group(econtext.router, reducer_spec, spec, args, kwargs,
+                         context_ids, econtext)
+
+
+_REDUCE_GROUP_SPEC = (u'mitogen.parent', None, u'_reduce_subtree')
+
+
+class GroupCallChain(CallChain):
+    """
+    Like :class:`CallChain`, but deliver each call to every context in a
+    group using :meth:`Router.broadcast`, so a call is serialized once, and
+    crosses any connection shared by routes to several group members only
+    once, irrespective of the number of members beyond it.
+
+    :param list contexts:
+        Target contexts, which must share a router.
+    :param bool pipelined:
+        Enable pipelining. An exception in one context cancels subsequent
+        calls only in that context.
+
+    ::
+
+        chain = mitogen.parent.GroupCallChain(contexts)
+        for context, uptime in zip(contexts, chain.call(get_uptime)):
+            print(context.name, uptime)
+    """
+    def __init__(self, contexts, pipelined=False):
+        super(GroupCallChain, self).__init__(None, pipelined=pipelined)
+        self.contexts = list(contexts)
+        self.router = self.contexts[0].router
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, self.contexts)
+
+    def call_no_reply(self, fn, *args, **kwargs):
+        """
+        Like :meth:`CallChain.call_no_reply`, for every context in the group.
+        """
+        LOG.debug('starting no-reply function call to %d contexts: %r',
+                  len(self.contexts), CallSpec(fn, args, kwargs))
+        self.router.broadcast(self.make_msg(fn, *args, **kwargs),
+                              [(c.context_id, None) for c in self.contexts])
+
+    def call_async(self, fn, *args, **kwargs):
+        """
+        Like :meth:`CallChain.call_async`, for every context in the group.
+
+        :returns:
+            List of :class:`mitogen.core.Receiver`, one for each context, in
+            the order the contexts were given. They may be consumed as they
+            complete using :class:`mitogen.select.Select`.
+        """
+        LOG.debug('starting function call to %d contexts: %r',
+                  len(self.contexts), CallSpec(fn, args, kwargs))
+        return self._broadcast_async(self.make_msg(fn, *args, **kwargs))
+
+    def _broadcast_async(self, msg):
+        recvs = [
+            mitogen.core.Receiver(self.router, persist=False, respondent=c)
+            for c in self.contexts
+        ]
+        self.router.broadcast(
+            msg,
+            [(c.context_id, recv.handle)
+             for c, recv in zip(self.contexts, recvs)]
+        )
+        return recvs
+
+    def _get_all(self, recvs):
+        msgs = [recv.get(throw_dead=False) for recv in recvs]
+        return [msg.unpickle() for msg in msgs]
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Like :meth:`CallChain.call`, for every context in the group.
+
+        :returns:
+            List of return values, in the order the contexts were given.
+        :raises mitogen.core.CallError:
+            An exception was raised in any context during execution. Results
+            are awaited from every context before the first such exception, in
+            context order, is raised.
+        """
+        return self._get_all(self.call_async(fn, *args, **kwargs))
+
+    def call_many(self, calls):
+        """
+        Like :meth:`CallChain.call_many`, for every context in the group.
+
+        :returns:
+            List of result lists, in the order the contexts were given.
+        """
+        return self._get_all(self._broadcast_async(self.make_many_msg(calls)))
+
+    def call_iter(self, fn, *args, **kwargs):
+        """
+        Not supported: items are streamed from a single context. Use
+        :meth:`Context.call_iter` with each context instead.
+        """
+        raise TypeError('%s does not support call_iter()' % (
+            self.__class__.__name__,
+        ))
+
+    def call_reduce(self, reducer, fn, *args, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` in every context of the group, combining
+        results using `reducer(a, b)` in each intermediate context before they
+        travel upstream, so only one result arrives from every subtree.
+
+        Each context on the path towards several group members receives a
+        single call for all of them, forwards it towards them in the same
+        way, and waits for their results. It therefore cannot run other calls
+        until the subtree completes. Calls are not affected by pipelining.
+
+        :param reducer:
+            A free function or class method, like `fn`, returning the
+            combination of two results. Since results are combined as they
+            arrive in differing subtrees, it must be associative and
+            commutative, like :func:`operator.add` or :func:`max`.
+        :returns:
+            `(result, failures)`, where `result` is the combination of every
+            successful result, or :data:`None` if no call succeeded, and
+            `failures` is a dict mapping the context ID of every failed call to
+            a :class:`mitogen.core.CallError` describing its failure.
+
+        ::
+
+            total, failures = chain.call_reduce(operator.add, count_files)
+            for context_id, e in failures.items():
+                print('%s failed: %s' % (context_id, e))
+        """
+        spec = self.make_spec(fn)
+        reducer_spec = self.make_spec(reducer)
+        LOG.debug('starting reducing function call to %d contexts: %r',
+                  len(self.contexts), CallSpec(fn, args, kwargs))
+        result, count, failures = _reduce_group(
+            self.router, reducer_spec, spec, args, kwargs,
+            [c.context_id for c in self.contexts],
+        )
+        return result, failures
+
 
 class Context(mitogen.core.Context):
     """
@@ -2034,6 +2783,12 @@ class Context(mitogen.core.Context):
         """
         self.default_call_chain.call_no_reply(fn, *args, **kwargs)
 
+    def call_iter(self, fn, *args, **kwargs):
+        """
+        See :meth:`CallChain.call_iter`.
+        """
+        return self.default_call_chain.call_iter(fn, *args, **kwargs)
+
     def shutdown(self, wait=False):
         """
         Arrange for the context to receive a ``SHUTDOWN`` message, triggering
@@ -2116,6 +2871,13 @@ class RouteMonitor(object):
             policy=is_immediate_child,
             overwrite=True,
         )
+        self.router.add_handler(
+            fn=self._on_broadcast,
+            handle=mitogen.core.BROADCAST,
+            persist=True,
+            policy=mitogen.core.has_parent_authority,
+            overwrite=True,
+        )
 
     def __repr__(self):
         return 'RouteMonitor()'
@@ -2292,6 +3054,28 @@ class RouteMonitor(object):
             self._propagate_up(mitogen.core.DEL_ROUTE, target_id)
         self._propagate_down(mitogen.core.DEL_ROUTE, target_id)
 
+    def _on_broadcast(self, msg):
+        """
+        Respond to :data:`mitogen.core.BROADCAST` from a parent by rebuilding
+        the enclosed message and replicating it again towards each of its
+        destinations, via :meth:`Router.broadcast`.
+        """
+        if msg.is_dead:
+            return
+
+        handle, enc, data, dsts = msg.unpickle(throw=False)
+        self.router._async_broadcast(
+            mitogen.core.Message(
+                src_id=msg.src_id,
+                auth_id=msg.auth_id,
+                handle=handle,
+                enc=enc,
+                data=data,
+                priority=msg.priority,
+            ),
+            dsts,
+        )
+
 
 class Router(mitogen.core.Router):
     context_class = Context
@@ -2334,6 +3118,71 @@ class Router(mitogen.core.Router):
         stream.conn.detached = True
         msg.reply(None)
 
+    def broadcast(self, msg, dsts):
+        """
+        Arrange for a copy of `msg` to be delivered to each of many contexts,
+        sending only one copy over any stream shared by routes to several of
+        them. Safe to call from any thread.
+
+        Destinations that share a next hop are sent as a single
+        :data:`mitogen.core.BROADCAST` message to that hop, whose
+        :class:`RouteMonitor` repeats the process using its own routing table,
+        so copies are made only where routes diverge.
+
+        :param mitogen.core.Message msg:
+            Message to deliver. Its :attr:`dst_id
+            <mitogen.core.Message.dst_id>` and :attr:`reply_to
+            <mitogen.core.Message.reply_to>` fields are ignored.
+        :param list dsts:
+            List of `(context_id, reply_to)` tuples, describing each
+            destination and the handle it should send any reply to.
+        """
+        self.broker.defer(self._async_broadcast, msg, list(dsts))
+
+    def _async_broadcast(self, msg, dsts):
+        by_stream = {}
+        parent_stream = self._stream_by_id.get(mitogen.parent_id)
+        for dst_id, reply_to in dsts:
+            stream = self._stream_by_id.get(dst_id)
+            if dst_id == mitogen.context_id or stream is None or \
+                    stream is parent_stream:
+                # Local delivery, upward routes, or no route at all, where
+                # the usual dead message handling applies.
+                self._broadcast_one(msg, dst_id, reply_to)
+            else:
+                by_stream.setdefault(stream, []).append((dst_id, reply_to))
+
+        for stream, group in by_stream.items():
+            if len(group) == 1:
+                self._broadcast_one(msg, *group[0])
+                continue
+
+            self._async_route(
+                mitogen.core.Message.pickled(
+                    (msg.handle, msg.enc, msg.data, group),
+                    src_id=msg.src_id,
+                    auth_id=msg.auth_id,
+                    dst_id=stream.protocol.remote_id,
+                    handle=mitogen.core.BROADCAST,
+                    priority=msg.priority,
+                )
+            )
+
+    def _broadcast_one(self, msg, dst_id, reply_to):
+        self._async_route(
+            mitogen.core.Message(
+                src_id=msg.src_id,
+                auth_id=msg.auth_id,
+                dst_id=dst_id,
+                handle=msg.handle,
+                reply_to=reply_to,
+                enc=msg.enc,
+                data=msg.data,
+                priority=msg.priority,
+                router=self,
+            )
+        )
+
     def get_streams(self):
         """
         Return an atomic snapshot of all streams in existence at time of call.
@@ -0,0 +1,204 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Encoder and decoder for :attr:`mitogen.core.Message.ENC_PRM`. Only contexts
+that import this module produce the encoding: a master imports it when it
+first sends a function call, so calls are encoded this way, and a child
+imports it on its main thread when it first receives such a call, so it
+replies in kind. Until then, :meth:`mitogen.core.Message.serialized` falls
+back to pickle. Decoding imports it if necessary.
+"""
+
+import _codecs
+import struct
+
+import mitogen.core
+from mitogen.core import b
+from mitogen.core import iteritems
+from mitogen.core import integer_types
+from mitogen.core import BytesType
+from mitogen.core import Blob
+from mitogen.core import Context
+from mitogen.core import Kwargs
+from mitogen.core import Secret
+from mitogen.core import Sender
+from mitogen.core import UnicodeType
+
+
+_PRM_NONE, _PRM_TRUE, _PRM_FALSE = b('N'), b('T'), b('F')
+_PRM_INT, _PRM_LONG, _PRM_FLOAT = b('i'), b('L'), b('f')
+_PRM_BYTES, _PRM_BLOB, _PRM_TEXT, _PRM_SECRET = b('b'), b('B'), b('u'), b('S')
+_PRM_TUPLE, _PRM_LIST, _PRM_DICT, _PRM_KWARGS = b('t'), b('l'), b('d'), b('K')
+_PRM_CONTEXT, _PRM_SENDER = b('C'), b('R')
+_PRM_CONTAINERS = {
+    _PRM_TUPLE: tuple,
+    _PRM_LIST: lambda items: items,
+    _PRM_DICT: dict,
+    _PRM_KWARGS: lambda items: Kwargs(dict(items)),
+}
+
+if hasattr(struct, 'Struct'):
+    _pack_L = struct.Struct('>L').pack
+    _pack_q = struct.Struct('>q').pack
+    _unpack_L = struct.Struct('>L').unpack_from
+    _unpack_q = struct.Struct('>q').unpack_from
+    _unpack_d = struct.Struct('>d').unpack_from
+else:
+    def _pack_L(n): return struct.pack('>L', n)
+    def _pack_q(n): return struct.pack('>q', n)
+    def _unpack_L(s, i): return struct.unpack('>L', s[i:i+4])
+    def _unpack_q(s, i): return struct.unpack('>q', s[i:i+8])
+    def _unpack_d(s, i): return struct.unpack('>d', s[i:i+8])
+
+
+def dump(obj, out, limit):
+    """
+    Append the :attr:`mitogen.core.Message.ENC_PRM` serialization of `obj`
+    to the list `out`.
+
+    :raises TypeError:
+        `obj` is or contains a type that cannot be represented, or `out` would
+        grow beyond roughly `limit` elements.
+    """
+    typ = type(obj)
+    if typ is UnicodeType or typ is Secret:
+        s, _ = _codecs.utf_8_encode(obj)
+        out.append((typ is Secret and _PRM_SECRET or _PRM_TEXT) +
+                   _pack_L(len(s)))
+        out.append(s)
+    elif typ is int and -0x8000000000000000 <= obj <= 0x7fffffffffffffff:
+        out.append(_PRM_INT + _pack_q(obj))
+    elif typ is tuple or typ is list:
+        if len(out) + len(obj) > limit:
+            raise TypeError('too many elements')
+        out.append((typ is tuple and _PRM_TUPLE or _PRM_LIST) +
+                   _pack_L(len(obj)))
+        for item in obj:
+            dump(item, out, limit)
+    elif obj is None:
+        out.append(_PRM_NONE)
+    elif typ is BytesType or typ is Blob:
+        out.append((typ is Blob and _PRM_BLOB or _PRM_BYTES) +
+                   _pack_L(len(obj)))
+        out.append(BytesType(obj))
+    elif typ is dict or typ is Kwargs:
+        if len(out) + 2 * len(obj) > limit:
+            raise TypeError('too many elements')
+        out.append((typ is Kwargs and _PRM_KWARGS or _PRM_DICT) +
+                   _pack_L(len(obj)))
+        for key, value in iteritems(obj):
+            dump(key, out, limit)
+            dump(value, out, limit)
+    elif typ is bool:
+        out.append(obj and _PRM_TRUE or _PRM_FALSE)
+    elif typ is float:
+        out.append(_PRM_FLOAT + struct.pack('>d', obj))
+    elif typ in mitogen.core.integer_types:
+        s = str(obj)
+        out.append(_PRM_LONG + _pack_L(len(s)) + b(s))
+    elif isinstance(obj, Context):
+        out.append(_PRM_CONTEXT + _pack_L(obj.context_id))
+        dump(obj.name, out, limit)
+    elif isinstance(obj, Sender):
+        out.append(_PRM_SENDER + struct.pack('>LL', obj.context.context_id,
+                                             obj.dst_handle))
+    else:
+        raise TypeError('cannot serialize %r' % (typ,))
+
+
+def load(msg, s, i, find_class=None):
+    """
+    Return `(obj, i)`, where `obj` is the :attr:`mitogen.core.Message.ENC_PRM`
+    value starting at offset `i` of `s`, and `i` is the offset following it.
+    :class:`mitogen.core.Context` and :class:`mitogen.core.Sender` instances
+    are constructed using `msg`, after asking `find_class` for the constructor
+    pickle would name, if it is not :data:`None`.
+
+    :raises ValueError:
+        `s` is truncated or invalid.
+    """
+    # Containers being filled, as [tag, items, item_count], avoiding a
+    # recursive call for every element.
+    stack = []
+    while True:
+        tag = s[i:i+1]
+        i += 1
+        if tag == _PRM_TEXT or tag == _PRM_SECRET:
+            n, = _unpack_L(s, i)
+            i += 4 + n
+            obj = s[i-n:i]
+            if len(obj) != n:
+                raise ValueError('truncated text')
+            obj, _ = _codecs.utf_8_decode(obj, 'strict', True)
+            if tag == _PRM_SECRET:
+                obj = Secret(obj)
+        elif tag == _PRM_INT:
+            obj, = _unpack_q(s, i)
+            i += 8
+        elif tag in _PRM_CONTAINERS:
+            n, = _unpack_L(s, i)
+            i += 4
+            if n:
+                if tag == _PRM_DICT or tag == _PRM_KWARGS:
+                    n *= 2
+                stack.append([tag, [], n])
+                continue
+            obj = _PRM_CONTAINERS[tag]([])
+        elif tag == _PRM_NONE:
+            obj = None
+        elif tag == _PRM_BYTES or tag == _PRM_BLOB:
+            n, = _unpack_L(s, i)
+            i += 4 + n
+            obj = s[i-n:i]
+            if len(obj) != n:
+                raise ValueError('truncated bytes')
+            if tag == _PRM_BLOB:
+                obj = Blob(obj)
+        elif tag == _PRM_TRUE:
+            obj = True
+        elif tag == _PRM_FALSE:
+            obj = False
+        elif tag == _PRM_FLOAT:
+            obj, = _unpack_d(s, i)
+            i += 8
+        elif tag == _PRM_LONG:
+            n, = _unpack_L(s, i)
+            i += 4 + n
+            obj = s[i-n:i]
+            if not (0 < n < 10000 and len(obj) == n):
+                raise ValueError('bad integer')
+            obj = integer_types[-1](obj.decode('ascii'))
+        elif tag == _PRM_CONTEXT:
+            context_id, = _unpack_L(s, i)
+            name, i = load(msg, s, i + 4, find_class)
+            if find_class is not None:
+                find_class('mitogen.core', '_unpickle_context')
+            obj = msg._unpickle_context(context_id, name)
+        elif tag == _PRM_SENDER:
+            context_id, = _unpack_L(s, i)
+            handle, = _unpack_L(s, i + 4)
+            i += 8
+            if find_class is not None:
+                find_class('mitogen.core', '_unpickle_sender')
+            obj = msg._unpickle_sender(context_id, handle)
+        else:
+            raise ValueError('bad tag %r at offset %d' % (tag, i - 1))
+
+        while stack:
+            top = stack[-1]
+            top[1].append(obj)
+            if len(top[1]) < top[2]:
+                break
+            stack.pop()
+            items = top[1]
+            if top[0] == _PRM_DICT or top[0] == _PRM_KWARGS:
+                items = zip(items[::2], items[1::2])
+            obj = _PRM_CONTAINERS[top[0]](items)
+        else:
+            return obj, i
+
+
+mitogen.core._dump_primitive = dump
+mitogen.core._load_primitive = load
@@ -0,0 +1,81 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Rate limiting of the :mod:`logging` records a child forwards, enabled by the
+`log_rate_limit` connection option. The child imports this module on its
+main thread once connected, assigning a :class:`LogRateLimiter` to
+:attr:`mitogen.core.LogHandler.limiter`.
+"""
+
+import logging
+import threading
+
+import mitogen.core
+
+
+class LogRateLimiter(object):
+    """
+    Permit `handler` to forward at most `rate` records per second, allowing
+    bursts of up to one second's worth. Excess records are dropped before they
+    are formatted, and their number is reported by a warning forwarded once
+    the broker next runs.
+
+    :param mitogen.core.LogHandler handler:
+        The uncorked handler to limit.
+    :param float rate:
+        Maximum records per second.
+    """
+    dropped_msg = '%d log records dropped by rate limit'
+
+    def __init__(self, handler, rate):
+        self.handler = handler
+        self.rate = rate
+        self._tokens = rate
+        self._last_emit = mitogen.core.now()
+        #: Records dropped, yet to be reported.
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return 'LogRateLimiter(%r)' % (self.rate,)
+
+    def allow(self):
+        """
+        Return :data:`True` if another record may be forwarded, otherwise
+        count it as dropped.
+        """
+        self._lock.acquire()
+        try:
+            t = mitogen.core.now()
+            self._tokens = min(self.rate, self._tokens +
+                               (t - self._last_emit) * self.rate)
+            self._last_emit = t
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+
+            self._dropped += 1
+            report = self._dropped == 1
+        finally:
+            self._lock.release()
+        if report:
+            # Report promptly even if no further record is allowed.
+            self.handler.context.router.broker.defer(self._report)
+        return False
+
+    def _report(self):
+        """
+        Forward a warning giving the records dropped since the last call. Runs
+        on the broker thread.
+        """
+        self._lock.acquire()
+        try:
+            dropped = self._dropped
+            self._dropped = 0
+        finally:
+            self._lock.release()
+        handler = self.handler
+        handler._add(handler._encode('mitogen', logging.WARNING,
+                                     self.dropped_msg % (dropped,)))
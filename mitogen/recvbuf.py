@@ -0,0 +1,167 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Receive buffer that :class:`mitogen.core.MitogenProtocol` parses frames from
+in place. Importing this module assigns :class:`ReceiveBuffer` to
+:attr:`mitogen.core.MitogenProtocol.receive_buffer_class`, so streams created
+afterwards use it. A master imports it via :mod:`mitogen.master`, while a
+child imports it on its main thread once connected, then calls
+:func:`install` on the broker thread for the stream to its parent.
+"""
+
+import mmap
+import struct
+import sys
+
+import mitogen.core
+
+
+class ReceiveBuffer(object):
+    """
+    Growable byte buffer that :class:`mitogen.core.Stream` reads directly into, so
+    that frames can be parsed in place rather than repeatedly joined from
+    separately allocated reads.
+
+    Data is appended at :attr:`end` and consumed from :attr:`start`. Small
+    frames are copied out as :class:`bytes`, while frames of at least
+    :attr:`copy_threshold` bytes are handed out as :class:`memoryview` slices
+    of the buffer, avoiding any copy until a consumer needs real bytes. Since
+    the storage behind a handed out slice must never change, once that has
+    happened the next compaction moves unconsumed data to a fresh buffer
+    rather than reusing the old one.
+
+    :param int size:
+        Initial and minimum capacity in bytes. The buffer grows as required to
+        hold the largest partially received frame, and shrinks back to this
+        size once drained.
+    """
+    #: :data:`True` if the running interpreter has the required
+    #: :class:`bytearray` and :class:`memoryview` support.
+    SUPPORTED = sys.version_info >= (2, 7)
+
+    #: Frames smaller than this are copied out of the buffer, since for them
+    #: the cost of a copy is less than the cost of giving up buffer reuse.
+    copy_threshold = 16384
+
+    def __init__(self, size=mitogen.core.CHUNK_SIZE):
+        self.size = size
+        #: Offset of the first unconsumed byte.
+        self.start = 0
+        #: Offset following the last valid byte.
+        self.end = 0
+        self._alloc(size)
+
+    def _alloc(self, size):
+        if size > self.size and mitogen.core.PY3:
+            # Unlike bytearray(), anonymous mappings are not zeroed upfront, so
+            # growing for a huge frame costs no more than receiving it. Python
+            # 2 cannot make a memoryview of a mapping.
+            self.buf = mmap.mmap(-1, size)
+        else:
+            self.buf = bytearray(size)
+        self._view = memoryview(self.buf)
+        self._exported = False
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return 'ReceiveBuffer(%d/%d)' % (len(self), len(self.buf))
+
+    def _make_room(self, n):
+        pending = self.end - self.start
+        size = max(self.size, len(self.buf))
+        while size < (pending + n):
+            size *= 2
+        old_view = self._view[self.start:self.end]
+        if self._exported or size != len(self.buf):
+            self._alloc(size)
+        self.buf[:pending] = old_view.tobytes()
+        self.start = 0
+        self.end = pending
+
+    def reserve(self, n):
+        """
+        Return a writeable :class:`memoryview` of at least `n` bytes following
+        :attr:`end`, compacting or growing the buffer as necessary. Call
+        :meth:`commit` with the number of bytes actually written.
+        """
+        if (len(self.buf) - self.end) < n:
+            self._make_room(n)
+        return self._view[self.end:]
+
+    def commit(self, n):
+        """
+        Mark `n` bytes written into the last :meth:`reserve` result as valid.
+        """
+        self.end += n
+
+    def append(self, s):
+        """
+        Copy the bytestring `s` into the buffer.
+        """
+        n = len(s)
+        self.reserve(n)[:n] = s
+        self.commit(n)
+
+    def peek(self, n):
+        """
+        Return up to `n` unconsumed bytes without consuming them.
+        """
+        return self._view[self.start:min(self.end, self.start+n)].tobytes()
+
+    def unpack(self, fmt):
+        """
+        Apply :func:`struct.unpack_from` to the unconsumed data.
+        """
+        return struct.unpack_from(fmt, self.buf, self.start)
+
+    def skip(self, n):
+        """
+        Consume the next `n` bytes without returning them.
+        """
+        self.start += n
+
+    def take(self, n):
+        """
+        Consume and return the next `n` bytes, as :class:`bytes` for small
+        sizes, otherwise as a :class:`memoryview` sharing the buffer.
+        """
+        start = self.start
+        self.start += n
+        if n < self.copy_threshold:
+            data = self._view[start:self.start].tobytes()
+        else:
+            data = self._view[start:self.start]
+            self._exported = True
+
+        if self.start == self.end:
+            if self._exported or len(self.buf) > self.size:
+                self._alloc(self.size)
+            self.start = self.end = 0
+        return data
+
+
+def install(protocol):
+    """
+    Switch `protocol`, constructed before this module was imported, to
+    receiving into an instance of its
+    :attr:`mitogen.core.MitogenProtocol.receive_buffer_class`, moving into it
+    any partial frame already received. Runs on the broker thread.
+    """
+    klass = protocol.receive_buffer_class
+    if protocol.receive_buffer is not None or klass is None:
+        return
+
+    rbuf = klass()
+    for buf in protocol._input_buf:
+        rbuf.append(buf)
+    protocol._input_buf.clear()
+    protocol._input_buf_len = 0
+    protocol.receive_buffer = rbuf
+
+
+if ReceiveBuffer.SUPPORTED:
+    mitogen.core.MitogenProtocol.receive_buffer_class = ReceiveBuffer
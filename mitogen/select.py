@@ -113,11 +113,13 @@ class Select(object):
     notify = None
 
     def __init__(self, receivers=(), oneshot=True):
-        self._receivers = []
+        #: Member receivers, latches and selects, as a dict keyed by each,
+        #: for constant time membership tests and removal.
+        self._receivers = {}
         self._oneshot = oneshot
         self._latch = mitogen.core.Latch()
-        for recv in receivers:
-            self.add(recv)
+        if receivers:
+            self.add_many(receivers)
 
     @classmethod
     def all(cls, receivers):
@@ -194,15 +196,41 @@ class Select(object):
         while self._receivers:
             yield self.get_event()
 
+    def iter_many(self, max_items=None):
+        """
+        Like :meth:`iter_data`, but yield lists of :attr:`Event.data` for
+        every event available, up to `max_items`, as returned by
+        :meth:`get_many`.
+        """
+        while self._receivers:
+            yield self.get_many(max_items)
+
+    def __await__(self):
+        """
+        Allow :mod:`asyncio` coroutines to wait for the next event using
+        ``data = await select``, with the same result as :meth:`get`. See
+        :mod:`mitogen.aio`.
+        """
+        import mitogen.aio
+        return mitogen.aio.get(self).__await__()
+
+    def __aiter__(self):
+        """
+        Like :meth:`iter_data`, but for ``async for`` loops in :mod:`asyncio`
+        coroutines.
+        """
+        import mitogen.aio
+        return mitogen.aio.Iterator(self)
+
     loop_msg = 'Adding this Select instance would create a Select cycle'
 
     def _check_no_loop(self, recv):
         if recv is self:
             raise Error(self.loop_msg)
 
+        if recv in self._receivers:
+            raise Error(self.loop_msg)
         for recv_ in self._receivers:
-            if recv_ == recv:
-                raise Error(self.loop_msg)
             if isinstance(recv_, Select):
                 recv_._check_no_loop(recv)
 
@@ -217,14 +245,31 @@ class Select(object):
             An attempt was made to add a :class:`Select` to which this select
             is indirectly a member of.
         """
-        if isinstance(recv, Select):
-            recv._check_no_loop(self)
+        self.add_many([recv])
+
+    def add_many(self, recvs):
+        """
+        Add each :class:`mitogen.core.Receiver`, :class:`Select` or
+        :class:`mitogen.core.Latch` from an iterable to the select. Every
+        object is checked before any is added, so on error the select is
+        unchanged.
+
+        :raises mitogen.select.Error:
+            An attempt was made to add a :class:`Select` to which this select
+            is indirectly a member of, or an object is already owned by a
+            select.
+        """
+        recvs = list(recvs)
+        for recv in recvs:
+            if isinstance(recv, Select):
+                recv._check_no_loop(self)
+            if recv.notify is not None:
+                raise Error(self.owned_msg)
 
-        self._receivers.append(recv)
-        if recv.notify is not None:
-            raise Error(self.owned_msg)
+        for recv in recvs:
+            self._receivers[recv] = None
+            recv.notify = self._put
 
-        recv.notify = self._put
         # After installing the notify function, _put() will potentially begin
         # receiving calls from other threads immediately, but not for items
         # they already had buffered. For those we call _put(), possibly
@@ -233,8 +278,9 @@ class Select(object):
         # the underlying receivers. We handle the possibility of receivers
         # marked notified yet empty inside Select.get(), so this should be
         # robust.
-        for _ in mitogen.core.range(recv.size()):
-            self._put(recv)
+        for recv in recvs:
+            for _ in mitogen.core.range(recv.size()):
+                self._put(recv)
 
     not_present_msg = 'Instance is not a member of this Select'
 
@@ -246,10 +292,10 @@ class Select(object):
         """
         try:
             if recv.notify != self._put:
-                raise ValueError
-            self._receivers.remove(recv)
+                raise KeyError
+            del self._receivers[recv]
             recv.notify = None
-        except (IndexError, ValueError):
+        except KeyError:
             raise Error(self.not_present_msg)
 
     def close(self):
@@ -263,7 +309,7 @@ class Select(object):
         is called automatically when the Python :keyword:`with` statement is
         used.
         """
-        for recv in self._receivers[:]:
+        for recv in list(self._receivers):
             self.remove(recv)
         self._latch.close()
 
@@ -326,23 +372,95 @@ class Select(object):
 
         while True:
             recv = self._latch.get(timeout=timeout, block=block)
-            try:
-                if isinstance(recv, Select):
-                    event = recv.get_event(block=False)
-                else:
-                    event = Event()
-                    event.source = recv
-                    event.data = recv.get(block=False)
-                if self._oneshot:
-                    self.remove(recv)
-                if isinstance(recv, mitogen.core.Receiver):
-                    # Remove in 0.3.x.
-                    event.data.receiver = recv
+            event = self._get_event(recv)
+            if event is not None:
+                self._finish_event(recv, event)
                 return event
-            except mitogen.core.TimeoutError:
-                # A receiver may have been queued with no result if another
-                # thread drained it before we woke up, or because another
-                # thread drained it between add() calling recv.empty() and
-                # self._put(), or because Select.add() caused duplicate _put()
-                # calls. In this case simply retry.
-                continue
+
+    def get_many(self, max_items=None, timeout=None, block=True):
+        """
+        Call `get_events(max_items, timeout, block)` returning
+        :attr:`Event.data` of each available event.
+        """
+        return [event.data
+                for event in self.get_events(max_items, timeout, block)]
+
+    def get_events(self, max_items=None, timeout=None, block=True):
+        """
+        Like :meth:`get_event`, but return a list of every available
+        :class:`Event`, up to `max_items`. The select's own queue is drained
+        with a single call to :meth:`mitogen.core.Latch.get_many`.
+
+        An exception raised by a source, such as :class:`ChannelError
+        <mitogen.core.ChannelError>` for a dead message, is only raised when
+        no other events precede it. Otherwise the preceding events are
+        returned, and the exception is raised by the next call.
+
+        :param int max_items:
+            If not :data:`None`, the maximum number of events to return.
+        :return:
+            Non-empty list of :class:`Event`.
+        """
+        if not self._receivers:
+            raise Error(self.empty_msg)
+
+        while True:
+            recvs = self._latch.get_many(max_items, timeout=timeout,
+                                         block=block)
+            events = []
+            for i, recv in enumerate(recvs):
+                if events and isinstance(recv, Select):
+                    # May raise, so it must lead the next batch.
+                    self._requeue(recvs[i:])
+                    return events
+                try:
+                    event = self._get_event(recv, throw_dead=not events)
+                except Exception:
+                    self._requeue(recvs[i+1:])
+                    raise
+                if event is None:
+                    continue
+                if isinstance(recv, mitogen.core.Receiver) and \
+                        event.data.is_dead:
+                    # Only when events is non-empty, so it leads the next
+                    # batch, where it is thrown.
+                    recv._latch._requeue([event.data])
+                    self._requeue(recvs[i:])
+                    return events
+                self._finish_event(recv, event)
+                events.append(event)
+            if events:
+                return events
+
+    def _requeue(self, recvs):
+        self._latch._requeue(recvs)
+
+    def _get_event(self, recv, throw_dead=True):
+        """
+        Fetch the event `recv` was queued for, or return :data:`None` if it
+        has none.
+        """
+        try:
+            if isinstance(recv, Select):
+                return recv.get_event(block=False)
+            event = Event()
+            event.source = recv
+            if isinstance(recv, mitogen.core.Receiver):
+                event.data = recv.get(block=False, throw_dead=throw_dead)
+            else:
+                event.data = recv.get(block=False)
+            return event
+        except mitogen.core.TimeoutError:
+            # A receiver may have been queued with no result if another
+            # thread drained it before we woke up, or because another
+            # thread drained it between add() calling recv.empty() and
+            # self._put(), or because Select.add() caused duplicate _put()
+            # calls. In this case simply retry.
+            return None
+
+    def _finish_event(self, recv, event):
+        if self._oneshot:
+            self.remove(recv)
+        if isinstance(recv, mitogen.core.Receiver):
+            # Remove in 0.3.x.
+            event.data.receiver = recv
@@ -991,7 +991,9 @@ class FileService(Service):
             s = fp.read(self.IO_SIZE)
             if s:
                 state.unacked += len(s)
-                sender.send(s, mitogen.core.Message.ENC_BIN)
+                # Let replies and control messages overtake file data.
+                sender.send(s, mitogen.core.Message.ENC_BIN,
+                            mitogen.core.Message.PRIO_BULK)
             else:
                 # File is done. Cause the target's receive loop to exit by
                 # closing the sender, close the file, and remove the job entry.
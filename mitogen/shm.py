@@ -0,0 +1,421 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Shared memory transport for children started by :mod:`mitogen.fork`, enabled
+by its `shared_memory` option.
+
+Each direction of a connection has a :class:`Ring` mapped before the child is
+forked. Small writes travel over the connection's socket as usual, while
+larger writes are copied into the ring, and only a 4 byte token announcing
+their length is sent over the socket. The socket therefore remains the
+doorbell, orders ring data relative to inline data, and reports
+disconnection exactly as before, while bulk data crosses from one process to
+the other with a single copy in each, rather than being copied into and out
+of the kernel.
+"""
+
+import errno
+import mmap
+import os
+import struct
+
+import mitogen.core
+
+
+#: Prefix of every chunk written to the socket: the chunk length, with
+#: :data:`RING_FLAG` set if the chunk was placed in the ring rather than
+#: following the prefix.
+HEADER_FMT = '>L'
+HEADER_LEN = struct.calcsize(HEADER_FMT)
+RING_FLAG = 0x80000000
+
+
+def frame(s):
+    """
+    Return bytestring `s` encoded as an inline chunk, for writing to a socket
+    before its :class:`Side` exists.
+    """
+    return struct.pack(HEADER_FMT, len(s)) + s
+
+
+def _eagain():
+    return OSError(errno.EAGAIN, os.strerror(errno.EAGAIN))
+
+
+class Ring(object):
+    """
+    Single producer, single consumer byte ring in an anonymous shared mapping,
+    inherited by a forked child.
+
+    The producer owns :attr:`head`, and the consumer owns :attr:`tail`, which
+    it publishes in the mapping's header after each read, so the producer can
+    learn how much space was freed. Positions are byte counts since the ring
+    was created. A stale published tail only causes the producer to
+    underestimate free space, and the consumer learns where data begins from
+    the tokens on the socket, which are always sent after the data is copied.
+    """
+    #: Offset of the ring's data, following the published tail.
+    data_offset = 64
+
+    def __init__(self, size):
+        assert 0 < size < RING_FLAG
+        self.size = size
+        self.mmap = mmap.mmap(-1, self.data_offset + size)
+        if mitogen.core.PY3:
+            self._view = memoryview(self.mmap)
+        else:
+            self._view = self.mmap
+        #: Bytes written by the producer.
+        self.head = 0
+        #: Bytes read by the consumer.
+        self.tail = 0
+
+    def __repr__(self):
+        return 'Ring(size=%d)' % (self.size,)
+
+    def close(self):
+        if self._view is not self.mmap:
+            self._view.release()
+        self.mmap.close()
+
+    def free(self):
+        """
+        Return the number of bytes the producer may write.
+        """
+        tail, = struct.unpack_from('=Q', self.mmap, 0)
+        return self.size - (self.head - tail)
+
+    def write(self, bufs, n):
+        """
+        Copy the first `n` bytes of the sequence of buffers `bufs` following
+        :attr:`head`, without publishing them. `n` must not exceed
+        :meth:`free`.
+        """
+        pos = self.head
+        for buf in bufs:
+            if not n:
+                break
+            if len(buf) > n:
+                buf = mitogen.core.BufferType(buf, 0)[:n]
+            if not mitogen.core.PY3:
+                buf = str(buf)
+            offset = 0
+            while offset < len(buf):
+                start = pos % self.size
+                chunk = min(len(buf) - offset, self.size - start)
+                start += self.data_offset
+                self._view[start:start+chunk] = buf[offset:offset+chunk]
+                offset += chunk
+                pos += chunk
+            n -= len(buf)
+
+    def commit(self, n):
+        """
+        Advance :attr:`head` past `n` bytes copied by :meth:`write`.
+        """
+        self.head += n
+
+    def read(self, view):
+        """
+        Fill the writeable buffer `view` with bytes following :attr:`tail`,
+        and publish the new tail.
+        """
+        n = len(view)
+        offset = 0
+        while offset < n:
+            start = self.tail % self.size
+            chunk = min(n - offset, self.size - start)
+            start += self.data_offset
+            view[offset:offset+chunk] = self._view[start:start+chunk]
+            offset += chunk
+            self.tail += chunk
+        struct.pack_into('=Q', self.mmap, 0, self.tail)
+
+
+class Side(mitogen.core.Side):
+    """
+    :class:`mitogen.core.Side` that moves chunks of at least
+    :attr:`threshold` bytes through `ring`, so :meth:`readinto` and
+    :meth:`writev` behave as if the ring's contents were carried by the
+    underlying socket.
+
+    Since a read from the socket may yield only a token, :meth:`read` and
+    :meth:`readinto` return :data:`None` when no data is available yet. Since
+    a token may announce more data than fits in the reader's buffer,
+    :attr:`pending` indicates bytes remain to be read without the socket
+    becoming readable again.
+    """
+    #: Writes smaller than this are sent inline, since a token costs the same
+    #: system call as the data would.
+    threshold = 4096
+
+    def __init__(self, stream, fp, ring, **kwargs):
+        super(Side, self).__init__(stream, fp, **kwargs)
+        self.ring = ring
+        # Reader state: bytes received from the socket, the span of them not
+        # yet parsed, and the remainder of the chunk being read.
+        self._buf = bytearray(mitogen.core.CHUNK_SIZE)
+        self._view = memoryview(self._buf)
+        self._pos = 0
+        self._end = 0
+        self._inline = 0
+        self._ring_left = 0
+        # Writer state: the unsent part of a token, the inline bytes it
+        # announced that are yet to be sent, and the bytes it announced that
+        # were placed in the ring but not yet reported as written.
+        self._header = mitogen.core.b('')
+        self._owed = 0
+        self._unreported = 0
+
+    def close(self):
+        if not self.closed:
+            super(Side, self).close()
+            if mitogen.core.PY3:
+                self._view.release()
+            self.ring.close()
+
+    @property
+    def pending(self):
+        """
+        :data:`True` if :meth:`readinto` can return data without reading the
+        socket.
+        """
+        avail = self._end - self._pos
+        if self._ring_left:
+            return True
+        if self._inline:
+            return avail > 0
+        return avail >= HEADER_LEN
+
+    def _decode(self, view):
+        end = self._end
+        pos = self._pos
+        size = len(view)
+        out = 0
+        while out < size:
+            if self._ring_left:
+                n = min(self._ring_left, size - out)
+                self.ring.read(view[out:out+n])
+                self._ring_left -= n
+            elif self._inline:
+                n = min(self._inline, end - pos, size - out)
+                if not n:
+                    break
+                view[out:out+n] = self._view[pos:pos+n]
+                self._inline -= n
+                pos += n
+            elif end - pos >= HEADER_LEN:
+                word, = struct.unpack_from(HEADER_FMT, self._buf, pos)
+                pos += HEADER_LEN
+                if word & RING_FLAG:
+                    self._ring_left = word ^ RING_FLAG
+                else:
+                    self._inline = word
+                continue
+            else:
+                break
+            out += n
+        self._pos = pos
+        return out
+
+    if hasattr(os, 'readv'):
+        def _recv(self, view):
+            return super(Side, self).readinto(view)
+    else:
+        def _recv(self, view):
+            s = super(Side, self).read(len(view))
+            view[:len(s)] = s
+            return len(s)
+
+    def readinto(self, view):
+        """
+        Like :meth:`mitogen.core.Side.readinto`, except the socket is only
+        read if :attr:`pending` is :data:`False`.
+
+        :returns:
+            Number of bytes read, 0 to indicate disconnection was detected, or
+            :data:`None` if no data was available.
+        """
+        if self.closed:
+            return 0
+        if not self.pending:
+            if self._pos:
+                # Any unparsed bytes are part of a token.
+                avail = self._end - self._pos
+                self._buf[:avail] = self._buf[self._pos:self._end]
+                self._pos = 0
+                self._end = avail
+            n = self._recv(self._view[self._end:])
+            if not n:
+                return 0
+            self._end += n
+        return self._decode(view) or None
+
+    def read(self, n=mitogen.core.CHUNK_SIZE):
+        """
+        Like :meth:`readinto`, but return a bytestring, the empty string to
+        indicate disconnection, or :data:`None`.
+        """
+        buf = bytearray(n)
+        n = self.readinto(memoryview(buf))
+        if n is None:
+            return None
+        return bytes(buf[:n])
+
+    def _write_owed(self, bufs):
+        n = self._owed
+        head = []
+        for buf in bufs:
+            if len(buf) >= n:
+                head.append(mitogen.core.BufferType(buf, 0)[:n])
+                break
+            head.append(buf)
+            n -= len(buf)
+        written = super(Side, self).writev(head)
+        if written is not None:
+            self._owed -= written
+        return written
+
+    def _resume(self, bufs):
+        if self._header:
+            n = super(Side, self).write(self._header)
+            if n is None:
+                return None
+            self._header = self._header[n:]
+            if self._header:
+                raise _eagain()
+
+        if self._unreported:
+            # The caller still holds these bytes, since a partially sent
+            # token must not appear to complete the write.
+            n = self._unreported
+            self._unreported = 0
+            return n
+
+        if self._owed:
+            return self._write_owed(bufs)
+        return self.writev(bufs)
+
+    def _write_ring(self, bufs, n):
+        self.ring.write(bufs, n)
+        header = struct.pack(HEADER_FMT, RING_FLAG | n)
+        sent = super(Side, self).write(header)
+        if sent is None:
+            return None
+        self.ring.commit(n)
+        if sent < HEADER_LEN:
+            self._header = header[sent:]
+            self._unreported = 1
+            return n - 1
+        return n
+
+    def writev(self, bufs):
+        """
+        Like :meth:`mitogen.core.Side.writev`, but if the ring has space for
+        at least :attr:`threshold` bytes of `bufs`, copy them to the ring and
+        send only a token, otherwise send `bufs` inline following a token.
+
+        Raises :data:`errno.EAGAIN` if only part of a token could be sent,
+        since the caller expects a nonzero count of its own bytes.
+        """
+        if self.closed:
+            return None
+        if self._header or self._unreported or self._owed:
+            return self._resume(bufs)
+
+        total = 0
+        for buf in bufs:
+            total += len(buf)
+
+        if total >= self.threshold:
+            n = min(total, self.ring.free())
+            if n >= self.threshold:
+                return self._write_ring(bufs, n)
+
+        header = struct.pack(HEADER_FMT, total)
+        sent = super(Side, self).writev([header] + list(bufs))
+        if sent is None:
+            return None
+        if sent < HEADER_LEN:
+            self._header = header[sent:]
+            sent = HEADER_LEN
+        self._owed = total - (sent - HEADER_LEN)
+        if sent == HEADER_LEN:
+            raise _eagain()
+        return sent - HEADER_LEN
+
+
+class Stream(mitogen.core.Stream):
+    """
+    :class:`mitogen.core.Stream` whose sides are :class:`Side` instances
+    reading from `rx_ring` and writing to `tx_ring`.
+    """
+    def __init__(self, rx_ring, tx_ring):
+        self.rx_ring = rx_ring
+        self.tx_ring = tx_ring
+
+    def accept(self, rfp, wfp):
+        self.receive_side = Side(self, rfp, self.rx_ring)
+        self.transmit_side = Side(self, wfp, self.tx_ring)
+
+    def __repr__(self):
+        return "<shm.Stream %s #%04x>" % (self.name, id(self) & 0xffff,)
+
+    def on_receive(self, broker):
+        """
+        Like :meth:`mitogen.core.Stream.on_receive`, but continue reading
+        while :attr:`Side.pending` indicates more data is available.
+        """
+        side = self.receive_side
+        while True:
+            rbuf = self.protocol.receive_buffer
+            if rbuf is not None:
+                n = side.readinto(rbuf.reserve(self.protocol.read_size))
+                if n == 0:
+                    return self._on_empty_read(broker)
+                if n:
+                    rbuf.commit(n)
+                    self.protocol.on_receive_buffer(broker)
+            else:
+                s = side.read(self.protocol.read_size)
+                if s is not None and not s:
+                    return self._on_empty_read(broker)
+                if s:
+                    self.protocol.on_receive(broker, s)
+            if side.closed or not side.pending:
+                return
+
+    def _on_empty_read(self, broker):
+        mitogen.core.LOG.debug('%r: empty read, disconnecting',
+                               self.receive_side)
+        self.on_disconnect(broker)
+
+
+class Channel(object):
+    """
+    The pair of rings used by a connection, created in the parent before the
+    child is forked.
+
+    :param int size:
+        Size in bytes of each ring.
+    """
+    #: Default size of each ring.
+    size = 1048576
+
+    def __init__(self, size=None):
+        self.parent_rx = Ring(size or self.size)
+        self.parent_tx = Ring(size or self.size)
+
+    def parent_stream(self):
+        """
+        Return an unconnected :class:`Stream` for the parent's end.
+        """
+        return Stream(self.parent_rx, self.parent_tx)
+
+    def child_stream(self):
+        """
+        Return an unconnected :class:`Stream` for the child's end.
+        """
+        return Stream(self.parent_tx, self.parent_rx)
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Per-handle and per-stream counters for a :class:`mitogen.core.Router`,
+collected while an instance of :class:`RouterStats` is assigned to its
+:attr:`mitogen.core.Router.stats` attribute::
+
+    router.stats = mitogen.stats.RouterStats()
+    ...
+    print(router.stats.get())
+"""
+
+import mitogen.core
+
+
+class RouterStats(object):
+    """
+    Count messages, bytes and drops per handle and per stream, and time spent
+    in each handler. Methods other than :meth:`get` are called by the router
+    on the broker thread.
+    """
+    def __init__(self):
+        #: handle -> [messages, bytes, drops, seconds in handler]. One-shot
+        #: and unknown handles are counted together under :data:`None`.
+        self._handles = {}
+        #: Stream -> [messages in, bytes in, messages out, bytes out, drops]
+        self._streams = {}
+
+    def _get_handle(self, key):
+        stats = self._handles.get(key)
+        if stats is None:
+            stats = self._handles[key] = [0, 0, 0, 0.0]
+        return stats
+
+    def invoke(self, router, msg, fn, key):
+        """
+        Call handler `fn` for `msg`, counting it and its duration against
+        `key`.
+        """
+        t0 = mitogen.core.now()
+        try:
+            fn(msg)
+        except Exception:
+            mitogen.core.LOG.exception('%r._invoke(%r): %r crashed',
+                                       router, msg, fn)
+        stats = self._get_handle(key)
+        stats[0] += 1
+        stats[1] += len(msg.payload)
+        stats[3] += mitogen.core.now() - t0
+
+    def count_drop(self, key):
+        """
+        Count a message for handle `key` that was refused or had no handler.
+        """
+        self._get_handle(key)[2] += 1
+
+    def count_stream(self, stream, i, msg):
+        """
+        Count `msg` received from (`i` is 0) or written to (`i` is 2)
+        `stream`, or when `i` is 4, a message from it that was dropped.
+        """
+        stats = self._streams.get(stream)
+        if stats is None:
+            stats = self._streams[stream] = [0, 0, 0, 0, 0]
+        stats[i] += 1
+        if msg is not None:
+            stats[i + 1] += len(msg.payload)
+
+    def forget_stream(self, stream):
+        """
+        Discard the counters of a disconnected stream.
+        """
+        self._streams.pop(stream, None)
+
+    def get(self):
+        """
+        Return the counters collected so far.
+
+        :returns:
+            Dict with keys:
+
+            * `handles`: dict mapping each persistent handle, or :data:`None`
+              for one-shot and unknown handles, to a dict with keys
+              `messages`, `bytes`, `drops` and `seconds`, the time spent in
+              its handler.
+            * `streams`: dict mapping the name of each connected stream to a
+              dict with keys `rx_messages`, `rx_bytes`, `tx_messages`,
+              `tx_bytes` and `drops`.
+        """
+        handles = {}
+        for key, (messages, nbytes, drops, seconds) in \
+                list(self._handles.items()):
+            handles[key] = {
+                'messages': messages,
+                'bytes': nbytes,
+                'drops': drops,
+                'seconds': seconds,
+            }
+        streams = {}
+        for stream, stats in list(self._streams.items()):
+            streams[stream.name] = {
+                'rx_messages': stats[0],
+                'rx_bytes': stats[1],
+                'tx_messages': stats[2],
+                'tx_bytes': stats[3],
+                'drops': stats[4],
+            }
+        return {'handles': handles, 'streams': streams}
@@ -0,0 +1,270 @@
+# SPDX-FileCopyrightText: 2026 Mitogen authors <https://github.com/mitogen-hq>
+# SPDX-License-Identifier: BSD-3-Clause
+# !mitogen: minify_safe
+
+"""
+Sampling of messages for latency tracing, collection of the events recorded
+for them, and their export as Chrome trace JSON, viewable using
+``chrome://tracing`` or https://ui.perfetto.dev/. A context records events
+once :func:`enable` has been called in it, installing a :class:`Tracer` as its
+:attr:`mitogen.core.Router.tracer`.
+"""
+
+import collections
+import itertools
+import time
+
+import mitogen.core
+import mitogen.select
+
+
+#: Events ending an interval shown as a span by :func:`to_chrome`, mapped to
+#: the event starting it and the name of the span.
+SPANS = {
+    'flush': ('enqueue', 'write'),
+    'call_end': ('call_start', 'call'),
+}
+
+
+class Tracer(object):
+    """
+    Sample messages passed to :meth:`mitogen.core.Router.route`, and record
+    events for sampled messages passing through the context, including those
+    sampled elsewhere. Methods may be called from any thread.
+
+    :param int interval:
+        When nonzero, one in every this many messages is sampled, by assigning
+        it a :attr:`mitogen.core.Message.trace_id`.
+    :param int max_events:
+        Maximum events retained, the oldest are discarded first.
+    """
+    def __init__(self, interval=0, max_events=10000):
+        self.interval = interval
+        self.max_events = max_events
+        #: Sequence numbering messages considered for sampling, used to
+        #: sample them and allocate trace IDs.
+        self._seq = itertools.count(1)
+        #: (trace ID, event, timestamp, detail) for sampled messages.
+        self.events = collections.deque()
+
+    def __repr__(self):
+        return 'Tracer(%r)' % (self.interval,)
+
+    def record(self, trace_id, event, detail=None):
+        """
+        Record `event` for the sampled message with `trace_id`.
+        """
+        events = self.events
+        events.append((trace_id, event, time.time(), detail))
+        if len(events) > self.max_events:
+            try:
+                events.popleft()
+            except IndexError:
+                pass
+
+    def sample(self, msg):
+        """
+        Sample `msg` if it is not already part of a trace and its turn has
+        come.
+        """
+        if self.interval and msg.trace_id is None:
+            seq = next(self._seq)
+            if seq % self.interval == 0:
+                msg.trace_id = ((mitogen.context_id or 0) << 32 |
+                                (seq & 0xffffffff))
+                self.record(msg.trace_id, 'send', msg.handle)
+
+
+@mitogen.core.takes_router
+def enable(interval=0, max_events=10000, router=None):
+    """
+    Begin recording events for sampled messages passing through the calling
+    context, or update the settings of its :class:`Tracer` if it already is.
+    Events are recorded only by contexts where this was called, for example
+    using ``context.call(mitogen.tracing.enable)``.
+
+    :param int interval:
+        When nonzero, one in every this many messages the calling context
+        passes to :meth:`mitogen.core.Router.route` is sampled.
+    :param int max_events:
+        Maximum events retained, the oldest are discarded first.
+    """
+    tracer = router.tracer
+    if tracer is None:
+        tracer = router.tracer = Tracer()
+    tracer.interval = interval
+    tracer.max_events = max_events
+
+
+@mitogen.core.takes_router
+def disable(router=None):
+    """
+    Stop sampling messages and recording events in the calling context,
+    discarding any events recorded so far.
+    """
+    router.tracer = None
+
+
+@mitogen.core.takes_router
+def get_events(clear=False, router=None):
+    """
+    Return the events recorded for sampled messages passing through the
+    calling context, or an empty list if :func:`enable` was not called in it.
+
+    :param bool clear:
+        If :data:`True`, forget the returned events.
+    :returns:
+        List of `(trace_id, event, timestamp, detail)` tuples, oldest first,
+        where `timestamp` is from :func:`time.time`, and `event` is one of:
+
+        * `send`: the message was passed to
+          :meth:`mitogen.core.Router.route` and sampled, `detail` is its
+          handle.
+        * `receive`: the message was received, `detail` is the name of the
+          stream.
+        * `route`: the message is about to be routed, `detail` is its
+          destination context ID.
+        * `enqueue`: the message was queued for writing, `detail` is the name
+          of the stream.
+        * `flush`: the message was completely written, `detail` is the name
+          of the stream.
+        * `call_start`, `call_end`: :class:`mitogen.core.Dispatcher` began and
+          finished the function call it describes.
+    """
+    if router.tracer is None:
+        return []
+    events = router.tracer.events
+    if not clear:
+        return list(events)
+    lst = []
+    try:
+        while True:
+            lst.append(events.popleft())
+    except IndexError:
+        pass
+    return lst
+
+
+def collect(router, contexts=None, clear=True, timeout=None):
+    """
+    Gather trace events from the master and each of `contexts`, which are
+    queried concurrently. Contexts that fail or do not reply in time are
+    skipped.
+
+    :param mitogen.core.Router router:
+        The master's router.
+    :param list contexts:
+        Contexts to query. If :data:`None`, every context known to `router`.
+    :param bool clear:
+        If :data:`True`, each context forgets the events it returned.
+    :param float timeout:
+        If not :data:`None`, seconds to wait for replies before returning
+        those received so far.
+    :returns:
+        List of `(context_id, trace_id, event, timestamp, detail)` tuples,
+        ordered by timestamp. Timestamps from different machines are only as
+        comparable as their clocks.
+    """
+    if contexts is None:
+        contexts = list(router._context_by_id.values())
+
+    events = [
+        (mitogen.context_id,) + tup
+        for tup in get_events(clear=clear, router=router)
+    ]
+    if timeout is not None:
+        deadline = mitogen.core.now() + timeout
+
+    select = mitogen.select.Select([
+        context.call_async(get_events, clear=clear)
+        for context in contexts
+    ])
+    try:
+        while select:
+            if timeout is not None:
+                timeout = max(0, deadline - mitogen.core.now())
+            try:
+                msg = select.get(timeout=timeout)
+                lst = msg.unpickle()
+            except mitogen.core.TimeoutError:
+                break
+            except mitogen.core.Error:
+                continue
+            events.extend((msg.src_id,) + tup for tup in lst)
+    finally:
+        select.close()
+
+    events.sort(key=lambda tup: tup[3])
+    return events
+
+
+def to_chrome(events, names=None):
+    """
+    Convert events returned by :func:`collect` to a dict in Chrome's Trace
+    Event Format. Each context appears as a process, having one row for
+    each trace. Events are shown as instants, and the time between a message
+    being queued and written, or a function call starting and finishing, as
+    spans.
+
+    :param dict names:
+        Optional mapping of context ID to the name shown for its process.
+    """
+    trace_events = []
+    for context_id, name in sorted((names or {}).items()):
+        trace_events.append({
+            'name': 'process_name',
+            'ph': 'M',
+            'pid': context_id,
+            'args': {'name': name},
+        })
+
+    starts = set(start for start, span in SPANS.values())
+    # Trace IDs are renumbered, as JSON readers may not preserve 64 bits.
+    tid_by_trace_id = {}
+    # (context_id, trace_id, start event) -> [start timestamps]
+    pending = {}
+    for context_id, trace_id, event, timestamp, detail in events:
+        tid = tid_by_trace_id.get(trace_id)
+        if tid is None:
+            tid = tid_by_trace_id[trace_id] = len(tid_by_trace_id) + 1
+        ts = timestamp * 1e6
+        args = {'trace_id': '%016x' % (trace_id,), 'detail': detail}
+        trace_events.append({
+            'name': event,
+            'ph': 'i',
+            's': 't',
+            'ts': ts,
+            'pid': context_id,
+            'tid': tid,
+            'args': args,
+        })
+        if event in starts:
+            pending.setdefault((context_id, trace_id, event), []).append(ts)
+        elif event in SPANS:
+            start_event, span = SPANS[event]
+            lst = pending.get((context_id, trace_id, start_event))
+            if lst:
+                start = lst.pop(0)
+                trace_events.append({
+                    'name': span,
+                    'ph': 'X',
+                    'ts': start,
+                    'dur': ts - start,
+                    'pid': context_id,
+                    'tid': tid,
+                    'args': args,
+                })
+
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+
+def dump_chrome(path, events, names=None):
+    """
+    Write the result of :func:`to_chrome` to the file `path` as JSON.
+    """
+    import json
+    fp = open(path, 'w')
+    try:
+        json.dump(to_chrome(events, names), fp)
+    finally:
+        fp.close()
@@ -0,0 +1,134 @@
+import unittest
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+import mitogen.aio
+import mitogen.core
+import mitogen.select
+
+import testlib
+
+
+def ping(x):
+    return x
+
+
+def func_raises():
+    raise ValueError('boom')
+
+
+class AioMixin(testlib.RouterMixin):
+    def setUp(self):
+        super(AioMixin, self).setUp()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+        super(AioMixin, self).tearDown()
+
+    def run_loop(self, awaitable):
+        return self.loop.run_until_complete(awaitable)
+
+
+class ReceiverTest(AioMixin, testlib.TestCase):
+    def test_await_buffered(self):
+        recv = mitogen.core.Receiver(self.router)
+        recv._on_receive(mitogen.core.Message.pickled(123))
+        self.assertEqual(123, self.run_loop(recv).unpickle())
+        self.assertEqual(None, recv.notify)
+
+    def test_await_call_async(self):
+        context = self.router.local()
+        recv = context.call_async(ping, 'x')
+        self.assertEqual('x', self.run_loop(recv).unpickle())
+
+    def test_dead(self):
+        recv = mitogen.core.Receiver(self.router)
+        recv.to_sender().close()
+        self.assertRaises(mitogen.core.ChannelError,
+                          lambda: self.run_loop(recv))
+
+    def test_select_member_refused(self):
+        recv = mitogen.core.Receiver(self.router)
+        select = mitogen.select.Select([recv])
+        self.assertRaises(mitogen.core.Error,
+                          lambda: self.run_loop(recv))
+        select.close()
+
+    def test_aiter(self):
+        recv = mitogen.core.Receiver(self.router)
+        sender = recv.to_sender()
+        for x in range(3):
+            sender.send(x)
+        sender.close()
+        it = recv.__aiter__()
+        for x in range(3):
+            self.assertEqual(x, self.run_loop(it.__anext__()).unpickle())
+        self.assertRaises(StopAsyncIteration,
+                          lambda: self.run_loop(it.__anext__()))
+
+
+class SelectTest(AioMixin, testlib.TestCase):
+    def test_aiter(self):
+        latch = mitogen.core.Latch()
+        recv = mitogen.core.Receiver(self.router)
+        select = mitogen.select.Select([latch, recv])
+        recv._on_receive(mitogen.core.Message.pickled(123))
+        latch.put(456)
+        it = select.__aiter__()
+        got = [self.run_loop(it.__anext__()), self.run_loop(it.__anext__())]
+        self.assertEqual(123, got[0].unpickle())
+        self.assertEqual(456, got[1])
+        self.assertRaises(StopAsyncIteration, it.__anext__)
+
+
+class CallTest(AioMixin, testlib.TestCase):
+    def test_gather(self):
+        context = self.router.local()
+        futs = [mitogen.aio.call(context, ping, x)
+                for x in range(50)]
+        self.assertEqual(list(range(50)),
+                         self.run_loop(asyncio.gather(*futs)))
+
+    def test_call_error(self):
+        context = self.router.local()
+        fut = mitogen.aio.call(context, func_raises)
+        e = self.assertRaises(mitogen.core.CallError,
+                              lambda: self.run_loop(fut))
+        self.assertIn('boom', str(e))
+
+
+class BridgeTest(AioMixin, testlib.TestCase):
+    def test_batched_wakeup(self):
+        wakeups = []
+        self.loop.call_soon_threadsafe = lambda func: wakeups.append(func)
+        bridge = mitogen.aio.get_bridge(self.loop)
+        recvs = [mitogen.core.Receiver(self.router) for x in range(10)]
+        futs = [bridge.wait(recv) for recv in recvs]
+        for recv in recvs:
+            recv._on_receive(mitogen.core.Message.pickled(recv.handle))
+        self.assertEqual(1, len(wakeups))
+        wakeups[0]()
+        for recv, fut in zip(recvs, futs):
+            self.assertEqual(recv.handle, fut.result().unpickle())
+
+    def test_cancelled(self):
+        recv = mitogen.core.Receiver(self.router)
+        bridge = mitogen.aio.get_bridge(self.loop)
+        fut1 = bridge.wait(recv)
+        fut2 = bridge.wait(recv)
+        fut1.cancel()
+        recv.to_sender().send(123)
+        self.assertEqual(123, self.run_loop(fut2).unpickle())
+
+
+if asyncio is None:
+    ReceiverTest = unittest.skip('asyncio unavailable')(ReceiverTest)
+    SelectTest = unittest.skip('asyncio unavailable')(SelectTest)
+    CallTest = unittest.skip('asyncio unavailable')(CallTest)
+    BridgeTest = unittest.skip('asyncio unavailable')(BridgeTest)
@@ -0,0 +1,72 @@
+'''
+Compare concurrent function calls to a local child issued from an asyncio
+coroutine, by running Context.call() in a thread pool executor, and by
+awaiting mitogen.aio.call().
+'''
+
+import asyncio
+import concurrent.futures
+
+import mitogen
+import mitogen.aio
+import mitogen.core
+
+
+def do_nothing():
+    pass
+
+
+def measure(name, opts, gather):
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(gather(1))
+        t0 = mitogen.core.now()
+        for x in mitogen.core.range(opts.rounds):
+            loop.run_until_complete(gather(opts.concurrency))
+        t1 = mitogen.core.now()
+    finally:
+        loop.close()
+    calls = opts.rounds * opts.concurrency
+    print('++ %-22s concurrency %4d: %7.1f usec/call' % (
+        name, opts.concurrency, 1e6 * (t1 - t0) / calls))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-c', '--concurrency', type=int, metavar='N', default=200,
+        help='Calls in flight per round (default %default)')
+    parser.add_option(
+        '-r', '--rounds', type=int, metavar='N', default=20,
+        help='Rounds to measure (default %default)')
+    parser.add_option(
+        '-t', '--threads', type=int, metavar='N', default=16,
+        help='Executor threads (default %default)')
+    opts, args = parser.parse_args()
+
+    context = router.local()
+    pool = concurrent.futures.ThreadPoolExecutor(opts.threads)
+
+    def executor(n):
+        loop = asyncio.get_event_loop()
+        return asyncio.gather(*[
+            loop.run_in_executor(pool, context.call, do_nothing)
+            for x in mitogen.core.range(n)
+        ])
+
+    def aio(n):
+        return asyncio.gather(*[
+            mitogen.aio.call(context, do_nothing)
+            for x in mitogen.core.range(n)
+        ])
+
+    def wrap(gather):
+        async def run(n):
+            return await gather(n)
+        return run
+
+    measure('executor(%d threads)' % (opts.threads,), opts, wrap(executor))
+    measure('mitogen.aio', opts, wrap(aio))
+    pool.shutdown()
@@ -0,0 +1,56 @@
+"""
+Compare running one call in many contexts behind a common intermediary, with
+a call per context, with mitogen.parent.GroupCallChain, and with its results
+summed by GroupCallChain.call_reduce(), for a range of argument sizes.
+"""
+
+import operator
+
+import mitogen.core
+import mitogen.parent
+
+
+def echo_len(s):
+    return len(s)
+
+
+def measure(router, contexts, opts, size):
+    arg = b'x' * size
+    for name in 'per-context', 'group', 'reduce':
+        t0 = mitogen.core.now()
+        for x in mitogen.core.range(opts.iterations):
+            if name == 'group':
+                mitogen.parent.GroupCallChain(contexts).call(echo_len, arg)
+            elif name == 'reduce':
+                mitogen.parent.GroupCallChain(contexts).call_reduce(
+                    operator.add, echo_len, arg)
+            else:
+                recvs = [c.call_async(echo_len, arg) for c in contexts]
+                [recv.get().unpickle() for recv in recvs]
+        t1 = mitogen.core.now()
+        print('++ %-11s %3d contexts, size %7d: %8.2f ms/call' % (
+            name, len(contexts), size,
+            1e3 * (t1 - t0) / opts.iterations))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-c', '--contexts', type=int, metavar='N', default=20,
+        help='Contexts behind the intermediary (default %default)')
+    parser.add_option(
+        '-i', '--iterations', type=int, metavar='N', default=50,
+        help='Calls per measurement (default %default)')
+    parser.add_option(
+        '-s', '--sizes', metavar='N,..', default='0,65536,1048576',
+        help='Comma-separated argument sizes (default %default)')
+    opts, args = parser.parse_args()
+
+    via = router.local()
+    contexts = [router.local(via=via)
+                for x in mitogen.core.range(opts.contexts)]
+    mitogen.parent.GroupCallChain(contexts).call(echo_len, b'')
+    for size in map(int, opts.sizes.split(',')):
+        measure(router, contexts, opts, size)
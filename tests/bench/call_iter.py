@@ -0,0 +1,50 @@
+"""
+Compare fetching a large result built as one list with call(), against
+streaming its items with call_iter(), reporting the delay until the first item
+is available and the total time.
+"""
+
+import mitogen.core
+
+
+def make_list(count, size):
+    return [b'x' * size for x in mitogen.core.range(count)]
+
+
+def make_iter(count, size):
+    for x in mitogen.core.range(count):
+        yield b'x' * size
+
+
+def measure(context, opts, name):
+    t0 = mitogen.core.now()
+    if name == 'call':
+        items = context.call(make_list, opts.count, opts.size)
+        t1 = mitogen.core.now()
+    else:
+        it = context.call_iter(make_iter, opts.count, opts.size)
+        items = [next(it)]
+        t1 = mitogen.core.now()
+        items.extend(it)
+    t2 = mitogen.core.now()
+    assert len(items) == opts.count
+    print('++ %-9s %6d x %6d bytes: first item %8.2f ms, all %8.2f ms' % (
+        name, opts.count, opts.size, 1e3 * (t1 - t0), 1e3 * (t2 - t0)))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-n', '--count', type=int, metavar='N', default=20000,
+        help='Items in the result (default %default)')
+    parser.add_option(
+        '-s', '--size', type=int, metavar='N', default=1024,
+        help='Size of each item (default %default)')
+    opts, args = parser.parse_args()
+
+    context = router.local()
+    context.call(make_list, 1, 1)
+    for name in 'call', 'call_iter':
+        measure(context, opts, name)
@@ -0,0 +1,47 @@
+"""
+Compare issuing many small calls to one context one at a time, pipelined
+with call_async(), and batched with CallChain.call_many().
+"""
+
+import os
+
+import mitogen.core
+import mitogen.parent
+
+
+def measure(context, opts, name):
+    chain = mitogen.parent.CallChain(context)
+    calls = [(os.path.exists, ('/tmp/%d' % (x,),), {})
+             for x in mitogen.core.range(opts.batch)]
+    t0 = mitogen.core.now()
+    for x in mitogen.core.range(opts.iterations):
+        if name == 'call':
+            for fn, args, kwargs in calls:
+                chain.call(fn, *args, **kwargs)
+        elif name == 'call_async':
+            recvs = [chain.call_async(fn, *args, **kwargs)
+                     for fn, args, kwargs in calls]
+            [recv.get().unpickle() for recv in recvs]
+        else:
+            chain.call_many(calls)
+    t1 = mitogen.core.now()
+    print('++ %-10s batch %4d: %8.2f usec/call' % (
+        name, opts.batch, 1e6 * (t1 - t0) / opts.iterations / opts.batch))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-b', '--batch', type=int, metavar='N', default=200,
+        help='Calls per batch (default %default)')
+    parser.add_option(
+        '-i', '--iterations', type=int, metavar='N', default=50,
+        help='Batches per measurement (default %default)')
+    opts, args = parser.parse_args()
+
+    context = router.local()
+    context.call(os.getpid)
+    for name in 'call', 'call_async', 'call_many':
+        measure(context, opts, name)
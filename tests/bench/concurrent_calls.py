@@ -0,0 +1,43 @@
+"""
+Measure how long one quick call to a context waits behind a batch of slow
+calls made to it, with and without the max_concurrent_calls option.
+"""
+
+import os
+import time
+
+import mitogen.core
+
+
+def measure(router, opts, max_concurrent_calls):
+    context = router.local(max_concurrent_calls=max_concurrent_calls)
+    try:
+        context.call(os.getpid)
+        recvs = [context.call_async(time.sleep, opts.delay)
+                 for x in mitogen.core.range(opts.slow)]
+        t0 = mitogen.core.now()
+        context.call(os.getpid)
+        t1 = mitogen.core.now()
+        [recv.get().unpickle() for recv in recvs]
+        t2 = mitogen.core.now()
+    finally:
+        context.shutdown(wait=True)
+
+    print('++ max_concurrent_calls %-4s quick call %8.2f ms, all %8.2f ms' % (
+        max_concurrent_calls, 1e3 * (t1 - t0), 1e3 * (t2 - t0)))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-n', '--slow', type=int, metavar='N', default=4,
+        help='Slow calls made first (default %default)')
+    parser.add_option(
+        '-d', '--delay', type=float, metavar='SECS', default=0.25,
+        help='Duration of each slow call (default %default)')
+    opts, args = parser.parse_args()
+
+    for max_concurrent_calls in None, opts.slow + 1:
+        measure(router, opts, max_concurrent_calls)
@@ -1,5 +1,6 @@
 """
-Measure latency of local RPC.
+Measure latency of local RPC, with and without the shared memory transport,
+for a range of argument and return value sizes.
 """
 
 import mitogen.core
@@ -13,22 +14,46 @@ ansible_mitogen.affinity.policy.assign_worker()
 def do_nothing():
     pass
 
+
+def echo(s):
+    return s
+
+
+def measure(router, opts, shared_memory, size):
+    f = router.fork(debug=opts.debug, shared_memory=shared_memory)
+    try:
+        if size:
+            func, args = echo, (b'x' * size,)
+        else:
+            func, args = do_nothing, ()
+        iterations = max(10, opts.iterations * 1024 // max(1024, size))
+        f.call(func, *args)
+        t0 = mitogen.core.now()
+        for x in mitogen.core.range(iterations):
+            f.call(func, *args)
+        t1 = mitogen.core.now()
+    finally:
+        f.shutdown(wait=True)
+
+    mean = (t1 - t0) / iterations
+    print('++ %-10s size %8d, iterations %6d, mean %10.03f us, %7.1f MiB/s' % (
+        shared_memory and 'shm' or 'socketpair', size, iterations,
+        1e6 * mean, 2 * size / mean / 1048576))
+
+
 @mitogen.main()
 def main(router):
     import optparse
     parser = optparse.OptionParser(description=__doc__)
     parser.add_option(
         '-i', '--iterations', type=int, metavar='N', default=20000,
-        help='Number of iterations (default %default)')
+        help='Number of iterations for small sizes (default %default)')
+    parser.add_option(
+        '-s', '--sizes', metavar='N,..', default='0,1024,16384,262144,4194304',
+        help='Comma-separated argument sizes (default %default)')
     parser.add_option('--debug', action='store_true')
     opts, args = parser.parse_args()
 
-    f = router.fork(debug=opts.debug)
-    f.call(do_nothing)
-    t0 = mitogen.core.now()
-    for x in mitogen.core.range(opts.iterations):
-        f.call(do_nothing)
-
-    t1 = mitogen.core.now()
-    mean = (t1 - t0) / opts.iterations
-    print('++ iterations %d, mean %.03f us' % (opts.iterations, 1e6 * mean))
+    for size in map(int, opts.sizes.split(',')):
+        for shared_memory in False, True:
+            measure(router, opts, shared_memory, size)
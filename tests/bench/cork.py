@@ -0,0 +1,60 @@
+'''
+Measure the effect of Router.cork_bytes on a burst of small messages sent by
+a child, reporting write system calls per message and messages per second.
+'''
+
+import mitogen
+import mitogen.core
+
+
+@mitogen.core.takes_router
+def burst(sender, count, cork_bytes, router):
+    router.cork_bytes = cork_bytes
+    calls = [0]
+    writev = mitogen.core.Side.writev
+
+    def counting_writev(self, bufs):
+        calls[0] += 1
+        return writev(self, bufs)
+
+    mitogen.core.Side.writev = counting_writev
+    try:
+        for x in mitogen.core.range(count):
+            sender.send(x)
+        # Runs on the broker after every send above was written or queued.
+        return router.broker.defer_sync(lambda: calls[0])
+    finally:
+        mitogen.core.Side.writev = writev
+
+
+def run(router, opts, cork_bytes):
+    c = router.fork(debug=opts.debug)
+    recv = mitogen.core.Receiver(router)
+    t0 = mitogen.core.now()
+    call_recv = c.call_async(burst, recv.to_sender(), opts.messages,
+                             cork_bytes)
+    for x in mitogen.core.range(opts.messages):
+        recv.get()
+    t1 = mitogen.core.now()
+    writes = call_recv.get().unpickle()
+    c.shutdown(wait=True)
+    print('++ cork_bytes %d, messages %d, writes/msg %.03f, %.0f msg/s' % (
+        cork_bytes, opts.messages, float(writes) / opts.messages,
+        opts.messages / (t1 - t0)))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-n', '--messages', type=int, metavar='N', default=100000,
+        help='Number of messages (default %default)')
+    parser.add_option(
+        '--cork-bytes', type=int, metavar='N', default=65536,
+        help='Router.cork_bytes when corking (default %default)')
+    parser.add_option('--debug', action='store_true')
+    opts, args = parser.parse_args()
+
+    run(router, opts, 0)
+    run(router, opts, opts.cork_bytes)
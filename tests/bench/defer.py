@@ -0,0 +1,68 @@
+'''
+Measure Broker.defer() and Broker.defer_many() throughput with several
+producer threads enqueueing calls concurrently, reporting waker pipe writes
+per call.
+'''
+
+import threading
+
+import mitogen.core
+
+
+def run(opts, threads, batch):
+    broker = mitogen.core.Broker()
+    waker = broker._waker.protocol
+    wake = waker._wake
+    writes = [0]
+
+    def counting_wake():
+        writes[0] += 1
+        wake()
+
+    waker._wake = counting_wake
+    done = mitogen.core.Latch()
+    per_thread = opts.calls // threads
+
+    def produce():
+        if batch:
+            calls = [(int, (), {})] * batch
+            for x in mitogen.core.range(per_thread // batch):
+                broker.defer_many(calls)
+        else:
+            for x in mitogen.core.range(per_thread):
+                broker.defer(int)
+        broker.defer(done.put, None)
+
+    ths = [threading.Thread(target=produce) for x in range(threads)]
+    t0 = mitogen.core.now()
+    for th in ths:
+        th.start()
+    for th in ths:
+        done.get()
+    t1 = mitogen.core.now()
+    for th in ths:
+        th.join()
+    broker.shutdown()
+    broker.join()
+
+    total = per_thread * threads
+    print('++ threads %2d, %-14s %8.0f calls/s, %.4f writes/call' % (
+        threads, batch and 'defer_many(%d)' % (batch,) or 'defer',
+        total / (t1 - t0), float(writes[0]) / total))
+
+
+def main():
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-n', '--calls', type=int, metavar='N', default=200000,
+        help='Total calls per measurement (default %default)')
+    opts, args = parser.parse_args()
+
+    for threads in 1, 4, 32:
+        run(opts, threads, 0)
+        run(opts, threads, 16)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+'''
+Measure mitogen.executor.Executor throughput for short function calls across
+several local children, with and without map() chunking.
+'''
+
+import mitogen
+import mitogen.core
+import mitogen.executor
+
+
+def square(x):
+    return x * x
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-n', '--calls', type=int, metavar='N', default=20000,
+        help='Calls per measurement (default %default)')
+    parser.add_option(
+        '-c', '--contexts', type=int, metavar='N', default=4,
+        help='Local children (default %default)')
+    opts, args = parser.parse_args()
+
+    contexts = [router.local() for x in range(opts.contexts)]
+    for max_inflight in 1, 16, 64:
+        executor = mitogen.executor.Executor(contexts, max_inflight)
+        for chunksize in 1, 100:
+            t0 = mitogen.core.now()
+            for _ in executor.map(square, range(opts.calls),
+                                  chunksize=chunksize):
+                pass
+            t1 = mitogen.core.now()
+            print('++ max_inflight %2d, chunksize %3d: %9.0f calls/s' % (
+                max_inflight, chunksize, opts.calls / (t1 - t0)))
+        executor.shutdown()
@@ -1,32 +1,83 @@
-'Measure throughput of messages.'
+'''
+Measure throughput of messages.
+
+With --receive=both, runs once using mitogen.recvbuf.ReceiveBuffer and once
+using the legacy path that joins separately allocated reads for each frame.
+With --enc=bin, frames are raw bytes the child only measures the length of,
+so the cost of receiving them is not hidden by unpickling.
+With --via, frames also cross an intermediate child that only forwards them.
+'''
 
 import mitogen
 import mitogen.core
+import mitogen.recvbuf
 
 
-@mitogen.main()
-def main(router):
-    import optparse
-    parser = optparse.OptionParser(description=__doc__)
-    parser.add_option(
-        '-i', '--iterations', type=int, metavar='N', default=10,
-        help='Number of iterations (default %default)')
-    parser.add_option('--debug', action='store_true')
-    opts, args = parser.parse_args()
+@mitogen.core.takes_router
+def sink(sender, count, router):
+    recv = mitogen.core.Receiver(router)
+    sender.send(recv.to_sender())
+    total = 0
+    for x in mitogen.core.range(count):
+        total += len(recv.get().payload)
+    recv.close()
+    return total
 
+
+def run(router, opts, receive_buffer_class):
+    mitogen.core.MitogenProtocol.receive_buffer_class = receive_buffer_class
     c = router.fork(debug=opts.debug)
+    if opts.via:
+        # Messages are forwarded by the first child without being decoded.
+        c = router.fork(via=c, debug=opts.debug)
 
     n = 1048576 * 127
     s = ' ' * n
 
     t0 = mitogen.core.now()
-    for x in mitogen.core.range(opts.iterations):
-        tt0 = mitogen.core.now()
-        assert n == c.call(len, s)
+    if opts.enc == 'bin':
+        s = s.encode()
+        recv = mitogen.core.Receiver(router)
+        call_recv = c.call_async(sink, recv.to_sender(), opts.iterations)
+        sender = recv.get().unpickle()
+        for x in mitogen.core.range(opts.iterations):
+            sender.send(s, enc=mitogen.core.Message.ENC_BIN)
+        assert n * opts.iterations == call_recv.get().unpickle()
+    else:
+        for x in mitogen.core.range(opts.iterations):
+            assert n == c.call(len, s)
 
     t1 = mitogen.core.now()
+    c.shutdown(wait=True)
     mean = (t1 - t0) / opts.iterations
     transferred_size = n * opts.iterations
     transfer_rate = transferred_size / (t1 - t0)
-    print('++ iterations %d, mean %.03f ms, rate %.03f MiB/s'
-          % (opts.iterations, 1e3 * mean, transfer_rate / 2**20))
+    print('++ receive %s, enc %s, iterations %d, mean %.03f ms, '
+          'rate %.03f MiB/s' % (
+              receive_buffer_class and 'buffer' or 'legacy', opts.enc,
+              opts.iterations, 1e3 * mean, transfer_rate / 2**20))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-i', '--iterations', type=int, metavar='N', default=10,
+        help='Number of iterations (default %default)')
+    parser.add_option(
+        '--receive', choices=('buffer', 'legacy', 'both'), default='buffer',
+        help='Receive path to measure (default %default)')
+    parser.add_option(
+        '--enc', choices=('pkl', 'bin'), default='pkl',
+        help='Payload encoding (default %default)')
+    parser.add_option(
+        '--via', action='store_true',
+        help='Route via an intermediate child')
+    parser.add_option('--debug', action='store_true')
+    opts, args = parser.parse_args()
+
+    if opts.receive in ('buffer', 'both'):
+        run(router, opts, mitogen.recvbuf.ReceiveBuffer)
+    if opts.receive in ('legacy', 'both'):
+        run(router, opts, None)
@@ -1,7 +1,11 @@
 """
 Measure latency of IPC between two local threads.
+
+With --socket, sleeping threads are woken via their socketpair rather than a
+lock, as on Python 2.
 """
 
+import sys
 import threading
 
 import mitogen.core
@@ -13,6 +17,9 @@ ansible_mitogen.affinity.policy.assign_worker()
 
 X = 20000
 
+if '--socket' in sys.argv:
+    mitogen.core.Latch.sleep_on_lock = False
+
 def flip_flop(ready, inp, out):
     ready.put(None)
     for x in mitogen.core.range(X):
@@ -36,4 +43,5 @@ t0 = mitogen.core.now()
 l1.put(None)
 t1.join()
 t2.join()
-print('++', int(1e6 * ((mitogen.core.now() - t0) / (1.0+X))), 'usec')
+print('++', int(1e6 * ((mitogen.core.now() - t0) / (1.0+X))), 'usec',
+      mitogen.core.Latch.sleep_on_lock and 'lock' or 'socket')
@@ -0,0 +1,52 @@
+'''
+Measure mitogen.parent.EpollPoller with level- and edge-triggered write
+interest, for many streams that each toggle transmit interest on every loop
+iteration, as a stream that repeatedly queues and then flushes a message does.
+'''
+
+import socket
+import timeit
+
+import mitogen.core
+import mitogen.parent
+
+
+def run(streams, edge_triggered, opts):
+    p = mitogen.parent.EpollPoller(edge_triggered=edge_triggered)
+    pairs = [socket.socketpair() for x in mitogen.core.range(streams)]
+    fds = [a.fileno() for a, b in pairs]
+    for fd in fds:
+        p.start_receive(fd)
+
+    def cycle():
+        for fd in fds:
+            p.start_transmit(fd)
+        for fd in p.poll(0):
+            p.stop_transmit(fd)
+
+    try:
+        t = min(timeit.repeat(cycle, number=opts.number, repeat=5))
+    finally:
+        p.close()
+        for a, b in pairs:
+            a.close()
+            b.close()
+    print('++ streams %4d, %s: %7.2f usec/iteration' % (
+        streams, edge_triggered and 'ET' or 'LT', 1e6 * t / opts.number))
+
+
+def main():
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-n', '--number', type=int, metavar='N', default=200,
+        help='Loop iterations per measurement (default %default)')
+    opts, args = parser.parse_args()
+
+    for streams in 10, 100, 1000:
+        run(streams, False, opts)
+        run(streams, True, opts)
+
+
+if __name__ == '__main__':
+    main()
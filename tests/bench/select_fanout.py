@@ -0,0 +1,61 @@
+'''
+Measure mitogen.select.Select with many one-shot receivers, first using
+local receivers that already hold a message, isolating the cost of the
+select itself, then collecting the results of simultaneous call_async()
+calls to a child.
+'''
+
+import mitogen
+import mitogen.core
+import mitogen.select
+
+
+def local(router, opts):
+    recvs = [mitogen.core.Receiver(router, persist=False)
+             for x in mitogen.core.range(opts.receivers)]
+
+    t0 = mitogen.core.now()
+    select = mitogen.select.Select(recvs)
+    t1 = mitogen.core.now()
+    # Results from many hosts arrive in no particular order.
+    for recv in reversed(recvs):
+        recv._on_receive(mitogen.core.Message.pickled(None))
+    t2 = mitogen.core.now()
+    n = 0
+    for msg in select:
+        n += 1
+    t3 = mitogen.core.now()
+    assert n == opts.receivers
+    print('++ local %d receivers: add %.1f ms, iterate %.1f ms' % (
+        opts.receivers, 1e3 * (t1 - t0), 1e3 * (t3 - t2)))
+
+
+def remote(router, opts):
+    c = router.fork(debug=opts.debug)
+    try:
+        c.call(str)
+        t0 = mitogen.core.now()
+        recvs = [c.call_async(int, x)
+                 for x in mitogen.core.range(opts.receivers)]
+        t1 = mitogen.core.now()
+        total = sum(mitogen.select.Select.all(recvs))
+        t2 = mitogen.core.now()
+        assert total == sum(mitogen.core.range(opts.receivers))
+    finally:
+        c.shutdown(wait=True)
+    print('++ call_async %d receivers: send %.1f ms, collect %.1f ms' % (
+        opts.receivers, 1e3 * (t1 - t0), 1e3 * (t2 - t1)))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-n', '--receivers', type=int, metavar='N', default=10000,
+        help='Number of receivers (default %default)')
+    parser.add_option('--debug', action='store_true')
+    opts, args = parser.parse_args()
+
+    local(router, opts)
+    remote(router, opts)
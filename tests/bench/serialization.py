@@ -0,0 +1,72 @@
+'''
+Compare the cost of mitogen.core.Message.ENC_PRM against pickle, first for
+encoding and decoding representative payloads, then for a function call
+round-trip to a forked child.
+'''
+
+import timeit
+
+import mitogen
+import mitogen.core
+
+
+PAYLOADS = [
+    ('none', None),
+    ('int', 123),
+    ('text', u'x' * 50),
+    ('tuple', (1, u'a', None)),
+    ('call', (None, u'os', None, u'getpid', (), mitogen.core.Kwargs({}))),
+    ('dict12', dict((u'k%d' % i, u'v%d' % i) for i in range(12))),
+    ('bytes', b'x' * 1048576),
+]
+
+
+def per_call(func, number):
+    return 1e6 * min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def measure(name, obj, number):
+    klass = mitogen.core.Message
+    row = []
+    for encode in klass.primitive, klass.pickled:
+        msg = encode(obj)
+        row.append(per_call(lambda: encode(obj), number))
+        row.append(per_call(msg.unpickle, number))
+    print('++ %-8s prm enc %7.2f dec %7.2f usec, '
+          'pkl enc %7.2f dec %7.2f usec' % ((name,) + tuple(row)))
+
+
+def roundtrip(router, opts, name, serialized):
+    mitogen.core.Message.serialized = serialized
+    c = router.fork(debug=opts.debug)
+    try:
+        c.call(str)
+        t0 = mitogen.core.now()
+        for x in mitogen.core.range(opts.calls):
+            c.call(abs, x)
+        t1 = mitogen.core.now()
+    finally:
+        c.shutdown(wait=True)
+    print('++ roundtrip %s: %.1f usec/call' % (
+        name, 1e6 * (t1 - t0) / opts.calls))
+
+
+@mitogen.main()
+def main(router):
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-n', '--number', type=int, metavar='N', default=2000,
+        help='Encode/decode repetitions per payload (default %default)')
+    parser.add_option(
+        '-c', '--calls', type=int, metavar='N', default=5000,
+        help='Function calls per round-trip test (default %default)')
+    parser.add_option('--debug', action='store_true')
+    opts, args = parser.parse_args()
+
+    for name, obj in PAYLOADS:
+        measure(name, obj, opts.number)
+
+    serialized = mitogen.core.Message.serialized
+    roundtrip(router, opts, 'pickle', mitogen.core.Message.pickled)
+    roundtrip(router, opts, 'serialized', serialized)
@@ -0,0 +1,54 @@
+'''
+Compare mitogen.parent.TimerList with mitogen.parent.TimerWheel while many
+timers are outstanding, as with per-connection and per-call timeouts that
+are usually cancelled before they expire.
+'''
+
+import random
+import timeit
+
+import mitogen.core
+import mitogen.parent
+
+
+def measure(klass, opts):
+    lst = klass()
+    now = mitogen.core.now()
+    rand = random.Random(1)
+    timers = [lst.schedule(now + rand.uniform(1, 60), lambda: None)
+              for x in mitogen.core.range(opts.timers)]
+
+    def churn():
+        # Replace a random timer, as a completed call cancels its deadline and
+        # a new call schedules another, then run one broker loop iteration.
+        i = rand.randrange(len(timers))
+        timers[i].cancel()
+        timers[i] = lst.schedule(mitogen.core.now() + rand.uniform(1, 60),
+                                 lambda: None)
+        lst.get_timeout()
+        lst.expire()
+
+    t = min(timeit.repeat(churn, number=opts.number, repeat=5))
+    # TimerList keeps cancelled timers until they reach the head of its heap.
+    retained = len(getattr(lst, '_lst', lst))
+    print('++ %-10s %d timers: %.2f usec/iteration, %d retained' % (
+        klass.__name__, opts.timers, 1e6 * t / opts.number, retained))
+
+
+def main():
+    import optparse
+    parser = optparse.OptionParser(description=__doc__)
+    parser.add_option(
+        '-t', '--timers', type=int, metavar='N', default=10000,
+        help='Outstanding timers (default %default)')
+    parser.add_option(
+        '-n', '--number', type=int, metavar='N', default=20000,
+        help='Iterations per measurement (default %default)')
+    opts, args = parser.parse_args()
+
+    measure(mitogen.parent.TimerList, opts)
+    measure(mitogen.parent.TimerWheel, opts)
+
+
+if __name__ == '__main__':
+    main()
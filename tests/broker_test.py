@@ -45,6 +45,67 @@ class DeferTest(testlib.TestCase):
         self.assertEqual(e.args[0], mitogen.core.Waker.broker_shutdown_msg)
 
 
+class DeferManyTest(testlib.TestCase):
+    klass = mitogen.core.Broker
+
+    def test_in_order(self):
+        latch = mitogen.core.Latch()
+        broker = self.klass()
+        try:
+            broker.defer_many([(latch.put, (x,), {}) for x in range(100)])
+            self.assertEqual(list(range(100)),
+                             [latch.get() for x in range(100)])
+        finally:
+            broker.shutdown()
+            broker.join()
+
+    def test_on_broker_thread(self):
+        latch = mitogen.core.Latch()
+        broker = self.klass()
+        try:
+            broker.defer_sync(lambda: broker.defer_many([
+                (latch.put, (1,), {}),
+                (latch.put, (), {'obj': 2}),
+            ]))
+            # Run immediately, before defer_sync() returned.
+            self.assertEqual(2, latch.size())
+        finally:
+            broker.shutdown()
+            broker.join()
+
+    def test_defer_many_after_shutdown(self):
+        broker = self.klass()
+        broker.shutdown()
+        broker.join()
+        e = self.assertRaises(mitogen.core.Error,
+            lambda: broker.defer_many([(int, (), {})]))
+        self.assertEqual(e.args[0], mitogen.core.Waker.broker_shutdown_msg)
+
+
+class WakeCoalesceTest(testlib.TestCase):
+    klass = mitogen.core.Broker
+
+    def test_one_wake(self):
+        broker = self.klass()
+        started = mitogen.core.Latch()
+        release = mitogen.core.Latch()
+        waker = broker._waker.protocol
+        try:
+            # Stall the broker, so the calls below queue up behind it.
+            broker.defer(lambda: (started.put(None), release.get()))
+            started.get()
+            waker._wake = mock.Mock(wraps=waker._wake)
+            for x in range(10):
+                broker.defer(started.put, x)
+            self.assertEqual(1, len(waker._wake.mock_calls))
+            release.put(None)
+            self.assertEqual(list(range(10)),
+                             [started.get() for x in range(10)])
+        finally:
+            broker.shutdown()
+            broker.join()
+
+
 class DeferSyncTest(testlib.TestCase):
     klass = mitogen.core.Broker
 
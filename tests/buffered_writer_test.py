@@ -0,0 +1,180 @@
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+import mitogen.core
+import mitogen.parent
+
+import testlib
+
+
+class FakeSide(object):
+    def __init__(self, limit):
+        self.limit = limit
+        self.calls = []
+        self.written = mitogen.core.b('')
+
+    def writev(self, bufs):
+        s = mitogen.core.b('').join(bytes(buf) for buf in bufs)
+        self.calls.append(len(bufs))
+        n = min(self.limit, len(s))
+        self.written += s[:n]
+        return n
+
+
+class WriteTest(testlib.TestCase):
+    klass = mitogen.core.BufferedWriter
+
+    def setUp(self):
+        super(WriteTest, self).setUp()
+        self.broker = mock.Mock()
+        self.protocol = mock.Mock()
+        self.side = FakeSide(limit=0)
+        self.protocol.stream.transmit_side = self.side
+        self.writer = self.klass(self.broker, self.protocol)
+
+    def test_immediate(self):
+        self.side.limit = 100
+        self.writer.writev([mitogen.core.b('ab'), mitogen.core.b('cd')])
+        self.assertEqual(mitogen.core.b('abcd'), self.side.written)
+        self.assertEqual(0, self.writer._len)
+        self.assertEqual(0, self.broker._start_transmit.call_count)
+
+    def test_partial_then_coalesced(self):
+        self.side.limit = 3
+        self.writer.writev([mitogen.core.b('ab'), mitogen.core.b('cd')])
+        self.assertEqual(1, self.broker._start_transmit.call_count)
+        self.assertEqual(1, self.writer._len)
+
+        for x in range(10):
+            self.writer.write(mitogen.core.b('%d' % (x,)))
+        self.assertEqual(11, self.writer._len)
+
+        self.side.limit = 100
+        self.writer.on_transmit(self.broker)
+        self.assertEqual([2, 11], self.side.calls)
+        self.assertEqual(mitogen.core.b('abcd0123456789'), self.side.written)
+        self.assertEqual(0, self.writer._len)
+        self.assertEqual(1, self.broker._stop_transmit.call_count)
+
+    def test_on_flush_immediate(self):
+        flushed = []
+        self.side.limit = 100
+        self.writer.writev([mitogen.core.b('ab')],
+                           on_flush=lambda: flushed.append(1))
+        self.assertEqual([1], flushed)
+
+    def test_on_flush_partial_and_queued(self):
+        flushed = []
+        self.side.limit = 3
+        self.writer.writev([mitogen.core.b('ab'), mitogen.core.b('cd')],
+                           on_flush=lambda: flushed.append('a'))
+        self.writer.writev([mitogen.core.b('ef')],
+                           on_flush=lambda: flushed.append('b'))
+        self.assertEqual([], flushed)
+
+        self.side.limit = 2
+        self.writer.on_transmit(self.broker)
+        self.assertEqual(['a'], flushed)
+        self.writer.on_transmit(self.broker)
+        self.assertEqual(['a', 'b'], flushed)
+        self.assertEqual({}, self.writer._on_flush)
+
+    def test_max_iovecs(self):
+        self.writer.max_iovecs = 4
+        for x in range(10):
+            self.writer.write(mitogen.core.b('%d' % (x,)))
+
+        self.side.limit = 100
+        self.writer.on_transmit(self.broker)
+        self.assertEqual(4, self.side.calls[-1])
+        self.assertEqual(6, self.writer._len)
+        self.assertEqual(0, self.broker._stop_transmit.call_count)
+
+
+class CorkTest(testlib.TestCase):
+    klass = mitogen.core.BufferedWriter
+
+    def setUp(self):
+        super(CorkTest, self).setUp()
+        self.broker = mock.Mock()
+        self.protocol = mock.Mock()
+        self.protocol.stream.transmit_side = self.side = FakeSide(limit=100)
+        self.protocol.stream.transmit_side.closed = False
+        self.writer = self.klass(self.broker, self.protocol)
+
+    def test_held_until_uncork(self):
+        for x in range(10):
+            self.writer.cork([mitogen.core.b('%d' % (x,))], 100, 60.0)
+        self.assertEqual([], self.side.calls)
+        self.assertEqual(1, self.broker._cork.call_count)
+
+        self.writer.uncork(self.broker)
+        self.assertEqual([10], self.side.calls)
+        self.assertEqual(mitogen.core.b('0123456789'), self.side.written)
+        self.assertEqual(0, self.broker._start_transmit.call_count)
+
+        # Redundant uncork from the broker is harmless.
+        self.writer.uncork(self.broker)
+        self.assertEqual([10], self.side.calls)
+
+    def test_max_bytes(self):
+        for x in range(10):
+            self.writer.cork([mitogen.core.b('%d' % (x,))], 4, 60.0)
+        self.assertEqual([4, 4], self.side.calls)
+        self.assertEqual(2, self.writer._len)
+
+    def test_max_delay(self):
+        self.writer.cork([mitogen.core.b('a')], 100, 0.0)
+        self.writer.cork([mitogen.core.b('b')], 100, 0.0)
+        self.assertEqual([2], self.side.calls)
+
+    def test_partial(self):
+        self.side.limit = 3
+        self.writer.cork([mitogen.core.b('abcd')], 100, 60.0)
+        self.writer.uncork(self.broker)
+        self.assertEqual(1, self.broker._start_transmit.call_count)
+        self.assertEqual(1, self.writer._len)
+
+
+class PriorityTest(testlib.TestCase):
+    klass = mitogen.parent.PriorityWriter
+
+    def setUp(self):
+        super(PriorityTest, self).setUp()
+        self.broker = mock.Mock()
+        self.protocol = mock.Mock()
+        self.protocol.stream.transmit_side = self.side = FakeSide(limit=0)
+        self.writer = self.klass(self.broker, self.protocol)
+
+    def write(self, bufs, priority):
+        self.writer.priority = priority
+        self.writer.writev(bufs)
+
+    def test_lanes(self):
+        b = mitogen.core.b
+        self.write([b('b1')], mitogen.core.Message.PRIO_BULK)
+        self.write([b('n1')], mitogen.core.Message.PRIO_NORMAL)
+        self.write([b('c1')], mitogen.core.Message.PRIO_CONTROL)
+        self.write([b('b2')], mitogen.core.Message.PRIO_BULK)
+        self.write([b('c2')], mitogen.core.Message.PRIO_CONTROL)
+
+        self.side.limit = 100
+        self.writer.on_transmit(self.broker)
+        self.assertEqual(b('c1c2n1b1b2'), self.side.written)
+
+    def test_partial_frame_completes_first(self):
+        b = mitogen.core.b
+        self.side.limit = 2
+        self.write([b('bu'), b('lk')], mitogen.core.Message.PRIO_BULK)
+        self.side.limit = 0
+        self.write([b('c1')], mitogen.core.Message.PRIO_CONTROL)
+
+        self.side.limit = 1
+        self.writer.on_transmit(self.broker)
+        self.write([b('c2')], mitogen.core.Message.PRIO_CONTROL)
+        self.side.limit = 100
+        self.writer.on_transmit(self.broker)
+        self.assertEqual(b('bulkc1c2'), self.side.written)
+        self.assertEqual(0, self.writer._len)
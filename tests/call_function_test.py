@@ -1,3 +1,6 @@
+import gc
+import operator
+import threading
 import time
 
 import mitogen.core
@@ -52,6 +55,13 @@ class CallFunctionTest(testlib.RouterMixin, testlib.TestCase):
     def test_succeeds(self):
         self.assertEqual(3, self.local.call(function_that_adds_numbers, 1, 2))
 
+    def test_reply_encoded_like_call(self):
+        # A stdlib function, so the child imports no module of this test.
+        recv = self.local.call_async(time.time)
+        msg = recv.get()
+        self.assertEqual(mitogen.core.Message.ENC_PRM, msg.enc)
+        self.assertTrue(isinstance(msg.unpickle(), float))
+
     def test_succeeds_class_method(self):
         self.assertEqual(
             self.local.call(TargetClass.add_numbers_with_offset, 1, 2),
@@ -152,6 +162,324 @@ class CallChainTest(testlib.RouterMixin, testlib.TestCase):
         c1.reset()
         self.assertEqual('x3', c1.call(func_returns_arg, 'x3'))
 
+    def test_call_many(self):
+        chain = self.klass(self.local)
+        results = chain.call_many([
+            (function_that_adds_numbers, (1, 2), {}),
+            (function_that_fails, ('x1',), {}),
+            (TargetClass.add_numbers_with_offset, (), {'x': 1, 'y': 2}),
+        ])
+        self.assertEqual(3, len(results))
+        self.assertEqual(3, results[0])
+        self.assertIsInstance(results[1], mitogen.core.CallError)
+        self.assertIn('exception textx1', str(results[1]))
+        self.assertEqual(103, results[2])
+
+    def test_call_many_keeps_chain_id(self):
+        chain = self.klass(self.local, pipelined=True)
+        chain_id = chain.chain_id
+        msg = chain.make_many_msg([(func_returns_arg, ('x1',), {})])
+        self.assertEqual(chain_id, chain.chain_id)
+        outer_chain_id, _, _, _, args, _ = msg.unpickle(throw=False)
+        self.assertEqual(None, outer_chain_id)
+        self.assertEqual(chain_id, args[0])
+
+    def test_call_many_pipelined(self):
+        chain = self.klass(self.local, pipelined=True)
+        results = chain.call_many([
+            (func_returns_arg, ('x1',), {}),
+            (function_that_fails, ('x2',), {}),
+            (func_returns_arg, ('x3',), {}),
+        ])
+        self.assertEqual('x1', results[0])
+        self.assertIsInstance(results[1], mitogen.core.CallError)
+        self.assertEqual(str(results[1]), str(results[2]))
+        e = self.assertRaises(mitogen.core.CallError,
+            lambda: chain.call(func_returns_arg, 'x4'))
+        self.assertEqual(str(results[1]), str(e))
+        self.assertEqual(str(e), str(chain.call_many([
+            (func_returns_arg, ('x5',), {}),
+        ])[0]))
+        chain.reset()
+        self.assertEqual(['x6'], chain.call_many([
+            (func_returns_arg, ('x6',), {}),
+        ]))
+
+
+def func_returns_context_id():
+    return mitogen.context_id
+
+
+def func_fails_in(context_id):
+    if mitogen.context_id == context_id:
+        raise ValueError('failed in %d' % (context_id,))
+    return mitogen.context_id
+
+
+class GroupCallChainTest(testlib.RouterMixin, testlib.TestCase):
+    klass = mitogen.parent.GroupCallChain
+
+    def setUp(self):
+        super(GroupCallChainTest, self).setUp()
+        self.bastion = self.router.local(name='bastion')
+        self.behind = [self.router.local(via=self.bastion) for x in range(3)]
+        self.direct = self.router.local()
+        self.contexts = self.behind + [self.bastion, self.direct]
+
+    def spy_routes(self):
+        routed = []
+        real = self.router._async_route
+        def _async_route(msg, in_stream=None):
+            if in_stream is None and msg.handle in (mitogen.core.BROADCAST,
+                                                    mitogen.core.CALL_FUNCTION):
+                routed.append((msg.dst_id, msg.handle))
+            return real(msg, in_stream)
+        self.router._async_route = _async_route
+        return routed
+
+    def test_call(self):
+        chain = self.klass(self.contexts)
+        self.assertEqual([c.context_id for c in self.contexts],
+                         chain.call(func_returns_context_id))
+
+    def test_one_copy_per_hop(self):
+        routed = self.spy_routes()
+        self.klass(self.contexts).call(func_returns_context_id)
+        self.assertEqual(sorted(routed), sorted([
+            (self.bastion.context_id, mitogen.core.BROADCAST),
+            (self.direct.context_id, mitogen.core.CALL_FUNCTION),
+        ]))
+
+    def test_error_raised_after_all_replies(self):
+        chain = self.klass(self.contexts)
+        failing = self.behind[1].context_id
+        e = self.assertRaises(mitogen.core.CallError,
+            lambda: chain.call(func_fails_in, failing))
+        self.assertIn('failed in %d' % (failing,), str(e))
+
+        recvs = chain.call_async(func_fails_in, failing)
+        for context, recv in zip(self.contexts, recvs):
+            msg = recv.get()
+            if context.context_id == failing:
+                self.assertRaises(mitogen.core.CallError, msg.unpickle)
+            else:
+                self.assertEqual(context.context_id, msg.unpickle())
+
+    def test_dead_context(self):
+        dead = self.behind[2]
+        dead.shutdown(wait=True)
+        recvs = self.klass(self.contexts).call_async(func_returns_context_id)
+        for context, recv in zip(self.contexts, recvs):
+            if context is dead:
+                self.assertRaises(mitogen.core.ChannelError, recv.get)
+            else:
+                self.assertEqual(context.context_id, recv.get().unpickle())
+
+    def test_pipelined(self):
+        chain = self.klass(self.contexts, pipelined=True)
+        failing = self.behind[0].context_id
+        chain.call_no_reply(func_fails_in, failing)
+        recvs = chain.call_async(func_returns_context_id)
+        for context, recv in zip(self.contexts, recvs):
+            msg = recv.get()
+            if context.context_id == failing:
+                self.assertRaises(mitogen.core.CallError, msg.unpickle)
+            else:
+                self.assertEqual(context.context_id, msg.unpickle())
+        chain.reset()
+        self.assertEqual([c.context_id for c in self.contexts],
+                         chain.call(func_returns_context_id))
+
+    def test_call_many(self):
+        chain = self.klass(self.contexts)
+        self.assertEqual(
+            [[c.context_id, 3] for c in self.contexts],
+            chain.call_many([
+                (func_returns_context_id, (), {}),
+                (function_that_adds_numbers, (1, 2), {}),
+            ])
+        )
+
+    def test_call_reduce(self):
+        routed = self.spy_routes()
+        chain = self.klass(self.contexts)
+        result, failures = chain.call_reduce(operator.add,
+                                             func_returns_context_id)
+        self.assertEqual(sum(c.context_id for c in self.contexts), result)
+        self.assertEqual({}, failures)
+        # One call per hop, reduced by the bastion for its subtree.
+        self.assertEqual(sorted(routed), sorted([
+            (self.bastion.context_id, mitogen.core.CALL_FUNCTION),
+            (self.direct.context_id, mitogen.core.CALL_FUNCTION),
+        ]))
+
+    def test_call_reduce_failures(self):
+        failing = self.behind[1].context_id
+        dead = self.behind[2]
+        dead.shutdown(wait=True)
+        chain = self.klass(self.contexts)
+        result, failures = chain.call_reduce(max, func_fails_in, failing)
+        self.assertEqual(self.direct.context_id, result)
+        self.assertEqual(sorted([failing, dead.context_id]),
+                         sorted(failures))
+        self.assertIn('failed in %d' % (failing,), str(failures[failing]))
+        self.assertIsInstance(failures[dead.context_id],
+                              mitogen.core.CallError)
+
+    def test_call_reduce_subtree_no_route(self):
+        chain = self.klass(self.contexts)
+        member = self.behind[0].context_id
+        result, count, failures = self.bastion.call(
+            mitogen.parent._reduce_subtree, chain.make_spec(max),
+            chain.make_spec(func_returns_context_id), (), {},
+            [member, self.direct.context_id],
+        )
+        self.assertEqual((member, 1), (result, count))
+        self.assertEqual([self.direct.context_id], list(failures))
+        self.assertIn('no route to %r' % (self.direct.context_id,),
+                      str(failures[self.direct.context_id]))
+
+    def test_call_reduce_all_failed(self):
+        chain = self.klass([self.behind[0]])
+        result, failures = chain.call_reduce(
+            max, func_fails_in, self.behind[0].context_id)
+        self.assertEqual(None, result)
+        self.assertEqual([self.behind[0].context_id], list(failures))
+
+
+_event = threading.Event()
+_order = []
+
+
+def wait_event():
+    return _event.wait(10)
+
+
+def set_event():
+    _event.set()
+
+
+def append_order(s, delay=0):
+    time.sleep(delay)
+    _order.append(s)
+
+
+def get_order():
+    return _order
+
+
+def get_thread_name():
+    return threading.current_thread().name
+
+
+class ConcurrentDispatchTest(testlib.RouterMixin, testlib.TestCase):
+    def setUp(self):
+        super(ConcurrentDispatchTest, self).setUp()
+        self.local = self.router.local(max_concurrent_calls=4)
+
+    def test_calls_overlap(self):
+        recv = self.local.call_async(wait_event)
+        self.local.call(set_event)
+        self.assertTrue(recv.get(timeout=10).unpickle())
+
+    def test_runs_on_pool(self):
+        self.assertTrue(self.local.call(get_thread_name).startswith(
+            'mitogen.dispatcher.'))
+
+    def test_chain_ordered(self):
+        chain = mitogen.parent.CallChain(self.local, pipelined=True)
+        chain.call_no_reply(append_order, 'a', 0.2)
+        chain.call_no_reply(append_order, 'b')
+        chain.call_many([(append_order, ('c',), {})])
+        self.assertEqual(['a', 'b', 'c'], chain.call(get_order))
+
+    def test_chain_failure(self):
+        chain = mitogen.parent.CallChain(self.local, pipelined=True)
+        chain.call_no_reply(function_that_fails, 'x1')
+        e = self.assertRaises(mitogen.core.CallError,
+            lambda: chain.call(func_returns_arg, 'x2'))
+        self.assertIn('exception textx1', str(e))
+        chain.reset()
+        self.assertEqual('x3', chain.call(func_returns_arg, 'x3'))
+
+
+_produced = []
+_generator_closed = []
+
+
+def produce(n, fail_at=None):
+    try:
+        for x in range(n):
+            if x == fail_at:
+                raise ValueError('failed at %d' % (x,))
+            _produced.append(x)
+            yield x
+    finally:
+        _generator_closed.append(True)
+
+
+def get_produced():
+    return len(_produced), len(_generator_closed)
+
+
+class CallIterTest(testlib.RouterMixin, testlib.TestCase):
+    def setUp(self):
+        super(CallIterTest, self).setUp()
+        self.local = self.router.local(max_concurrent_calls=2)
+
+    def test_items(self):
+        self.assertEqual(list(range(300)),
+                         list(self.local.call_iter(produce, 300)))
+        self.assertEqual((300, 1), self.local.call(get_produced))
+
+    def test_error(self):
+        it = self.local.call_iter(produce, 10, fail_at=3)
+        self.assertEqual([0, 1, 2], [next(it) for x in range(3)])
+        e = self.assertRaises(mitogen.core.CallError, lambda: next(it))
+        self.assertIn('failed at 3', str(e))
+        self.assertRaises(StopIteration, lambda: next(it))
+
+    def test_not_iterable(self):
+        it = self.local.call_iter(func_returns_arg, 123)
+        self.assertRaises(mitogen.core.CallError, lambda: next(it))
+
+    def test_flow_control(self):
+        chain = mitogen.parent.CallChain(self.local)
+        chain.iter_window = 4
+        it = chain.call_iter(produce, 1000)
+        self.assertEqual(0, next(it))
+        time.sleep(0.2)
+        produced, closed = self.local.call(get_produced)
+        self.assertTrue(produced <= 2 * chain.iter_window)
+        self.assertEqual(0, closed)
+
+        it.close()
+        for x in range(50):
+            produced, closed = self.local.call(get_produced)
+            if closed:
+                break
+            time.sleep(0.1)
+        self.assertEqual(1, closed)
+
+    def test_abandoned_unblocks_serial_context(self):
+        local = self.router.local()
+        it = local.call_iter(produce, 1000)
+        self.assertEqual(0, next(it))
+        del it
+        gc.collect()
+        recv = local.call_async(get_produced)
+        produced, closed = recv.get(timeout=10).unpickle()
+        self.assertEqual(1, closed)
+
+    def test_close_unblocks_serial_context(self):
+        local = self.router.local()
+        it = local.call_iter(produce, 1000)
+        self.assertEqual(0, next(it))
+        it.close()
+        produced, closed = local.call(get_produced)
+        self.assertEqual(1, closed)
+        self.assertTrue(produced < 1000)
+
 
 class UnsupportedCallablesTest(testlib.RouterMixin, testlib.TestCase):
     # Verify mitogen_chain functionality.
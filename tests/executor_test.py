@@ -0,0 +1,130 @@
+import os
+import time
+import unittest
+
+try:
+    import concurrent.futures
+except ImportError:
+    concurrent = None
+
+import mitogen.core
+import mitogen.executor
+
+import testlib
+
+
+def square(x):
+    return x * x
+
+
+def func_raises(x):
+    raise ValueError(x)
+
+
+def sleep_getpid(secs):
+    time.sleep(secs)
+    return os.getpid()
+
+
+def exit_now():
+    os._exit(1)
+
+
+class ExecutorMixin(testlib.RouterMixin):
+    klass = mitogen.executor.Executor
+
+    def tearDown(self):
+        self.executor.shutdown()
+        super(ExecutorMixin, self).tearDown()
+
+    def start(self, contexts, **kwargs):
+        self.executor = self.klass(contexts, **kwargs)
+        return self.executor
+
+
+class SubmitTest(ExecutorMixin, testlib.TestCase):
+    def test_result(self):
+        executor = self.start([self.router.local()])
+        self.assertEqual(9, executor.submit(square, 3).result())
+
+    def test_call_error(self):
+        executor = self.start([self.router.local()])
+        e = executor.submit(func_raises, 'boom').exception()
+        self.assertTrue(isinstance(e, mitogen.core.CallError))
+        self.assertIn('boom', str(e))
+
+    def test_least_loaded(self):
+        contexts = [self.router.local(), self.router.local()]
+        executor = self.start(contexts, max_inflight=1)
+        futures = [executor.submit(sleep_getpid, 0.2) for x in range(2)]
+        pids = set(future.result() for future in futures)
+        self.assertEqual(2, len(pids))
+
+    def test_after_shutdown(self):
+        executor = self.start([self.router.local()])
+        executor.shutdown()
+        self.assertRaises(RuntimeError,
+                          lambda: executor.submit(square, 1))
+
+    def test_cancel_futures(self):
+        executor = self.start([self.router.local()], max_inflight=1)
+        futures = [executor.submit(sleep_getpid, 0.1) for x in range(3)]
+        executor.shutdown(cancel_futures=True)
+        self.assertFalse(futures[0].cancelled())
+        self.assertTrue(futures[2].cancelled())
+
+
+class MapTest(ExecutorMixin, testlib.TestCase):
+    def test_map(self):
+        executor = self.start([self.router.local(), self.router.local()])
+        self.assertEqual([x * x for x in range(100)],
+                         list(executor.map(square, range(100))))
+
+    def test_chunksize(self):
+        executor = self.start([self.router.local(), self.router.local()])
+        self.assertEqual([x * x for x in range(1000)],
+                         list(executor.map(square, range(1000),
+                                           chunksize=64)))
+
+
+class DisconnectTest(ExecutorMixin, testlib.TestCase):
+    def test_resubmitted(self):
+        doomed = self.router.local()
+        survivor = self.router.local()
+        executor = self.start([doomed, survivor], max_inflight=4)
+        doomed.call_no_reply(exit_now)
+        futures = [executor.submit(sleep_getpid, 0.01) for x in range(8)]
+        pid = survivor.call(os.getpid)
+        self.assertEqual([pid] * 8, [f.result() for f in futures])
+
+    def test_oversized_reply(self):
+        self.router.max_message_size = 64 * 1024
+        c1 = self.router.local()
+        c2 = self.router.local()
+        executor = self.start([c1, c2])
+        future = executor.submit(os.urandom, 200 * 1024)
+        e = future.exception()
+        self.assertTrue(isinstance(e, mitogen.core.ChannelError))
+        self.assertIn('message too large', str(e))
+
+        # Both contexts remain usable.
+        futures = [executor.submit(sleep_getpid, 0) for x in range(4)]
+        self.assertEqual(
+            set([c1.call(os.getpid), c2.call(os.getpid)]),
+            set(f.result() for f in futures),
+        )
+
+    def test_all_lost(self):
+        doomed = self.router.local()
+        executor = self.start([doomed])
+        doomed.call_no_reply(exit_now)
+        future = executor.submit(square, 2)
+        self.assertTrue(isinstance(future.exception(),
+                                   mitogen.core.ChannelError))
+
+
+if concurrent is None:
+    SubmitTest = unittest.skip('concurrent.futures unavailable')(SubmitTest)
+    MapTest = unittest.skip('concurrent.futures unavailable')(MapTest)
+    DisconnectTest = unittest.skip('concurrent.futures unavailable')(
+        DisconnectTest)
@@ -1,5 +1,7 @@
+import signal
 import sys
 import threading
+import time
 
 import mitogen.core
 
@@ -59,6 +61,79 @@ class GetTest(testlib.TestCase):
         self.assertEqual(obj, latch.get(timeout=0))
 
 
+class GetManyTest(testlib.TestCase):
+    klass = mitogen.core.Latch
+
+    def test_empty_noblock(self):
+        latch = self.klass()
+        self.assertRaises(mitogen.core.TimeoutError,
+            lambda: latch.get_many(block=False))
+
+    def test_empty_zero_timeout(self):
+        latch = self.klass()
+        self.assertRaises(mitogen.core.TimeoutError,
+            lambda: latch.get_many(timeout=0))
+
+    def test_all(self):
+        latch = self.klass()
+        for x in range(5):
+            latch.put(x)
+        self.assertEqual(list(range(5)), latch.get_many())
+        self.assertEqual(0, latch.size())
+
+    def test_max_items(self):
+        latch = self.klass()
+        for x in range(5):
+            latch.put(x)
+        self.assertEqual([0, 1, 2], latch.get_many(max_items=3))
+        self.assertEqual([3, 4], latch.get_many(max_items=3))
+
+    def test_closed(self):
+        latch = self.klass()
+        latch.put(1)
+        latch.close()
+        self.assertRaises(mitogen.core.LatchError, latch.get_many)
+
+    def test_requeue(self):
+        latch = self.klass()
+        notified = []
+        latch.notify = notified.append
+        for x in range(5):
+            latch.put(x)
+        items = latch.get_many(max_items=3)
+        latch.put(5)
+        latch._requeue(items[1:])
+        self.assertEqual(6, len(notified))
+        self.assertEqual([1, 2, 3, 4, 5], latch.get_many())
+
+    def test_requeue_wakes_sleeper(self):
+        latch = self.klass()
+        latch.put(1)
+        items = latch.get_many()
+        got = []
+        thread = threading.Thread(target=lambda: got.append(latch.get()))
+        thread.start()
+        try:
+            while not latch._sleeping:
+                time.sleep(0.01)
+            latch._requeue(items)
+        finally:
+            thread.join()
+        self.assertEqual([1], got)
+
+    def test_sleeps(self):
+        latch = self.klass()
+        def put():
+            time.sleep(0.05)
+            latch.put(1)
+        thread = threading.Thread(target=put)
+        thread.start()
+        try:
+            self.assertEqual([1], latch.get_many(timeout=3.0))
+        finally:
+            thread.join()
+
+
 class ThreadedGetTest(testlib.TestCase):
     klass = mitogen.core.Latch
 
@@ -103,6 +178,60 @@ class ThreadedGetTest(testlib.TestCase):
         self.assertEqual(sorted(self.results), list(range(5)))
         self.assertEqual(self.excs, [])
 
+    def test_timeout(self):
+        latch = self.klass()
+        self.start_one(lambda: latch.get(timeout=0.05))
+        self.join()
+        self.assertEqual(self.results, [None])
+        self.assertIsInstance(self.excs[0], mitogen.core.TimeoutError)
+        self.start_one(lambda: latch.get(timeout=3.0))
+        latch.put('test')
+        self.join()
+        self.assertEqual(self.results, [None, 'test'])
+
+    def test_lock_reused(self):
+        if not self.klass.sleep_on_lock:
+            self.skipTest('threads sleep on a socketpair')
+        latch = self.klass()
+        self.start_one(lambda: latch.get(timeout=3.0))
+        while not latch._sleeping:
+            time.sleep(0.01)
+        lock, cookie = latch._sleeping[0]
+        self.assertEqual(None, cookie)
+        latch.put('test')
+        self.join()
+        self.assertEqual(self.results, ['test'])
+        self.assertIn(lock, self.klass._cls_idle_locks)
+        self.assertTrue(lock.locked())
+
+    def test_signal_handler_raises(self):
+        if not self.klass.sleep_on_lock:
+            self.skipTest('threads sleep on a socketpair')
+        class Interrupted(Exception):
+            pass
+
+        def handler(signum, frame):
+            raise Interrupted()
+
+        latch = self.klass()
+        old = signal.signal(signal.SIGALRM, handler)
+        try:
+            signal.setitimer(signal.ITIMER_REAL, 0.05)
+            self.assertRaises(Interrupted, lambda: latch.get(timeout=3.0))
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, old)
+        self.assertEqual([], latch._sleeping)
+        latch.put('test')
+        self.assertEqual('test', latch.get(timeout=3.0))
+
+
+class SocketLatch(mitogen.core.Latch):
+    sleep_on_lock = False
+
+
+class SocketThreadedGetTest(ThreadedGetTest):
+    klass = SocketLatch
 
 
 class PutTest(testlib.TestCase):
@@ -209,3 +338,7 @@ class ThreadedCloseTest(testlib.TestCase):
         self.assertEqual(self.results, [None]*5)
         for exc in self.excs:
             self.assertIsInstance(exc, mitogen.core.LatchError)
+
+
+class SocketThreadedCloseTest(ThreadedCloseTest):
+    klass = SocketLatch
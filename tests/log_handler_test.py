@@ -1,6 +1,8 @@
 import logging
+import struct
 import sys
 import unittest
+import zlib
 
 try:
     from unittest import mock
@@ -9,6 +11,7 @@ except ImportError:
 
 import testlib
 import mitogen.core
+import mitogen.ratelimit
 from mitogen.core import b
 
 PY2 = sys.version_info[0] == 2
@@ -33,6 +36,12 @@ def log_test():
     logging.getLogger(__name__).info("This is a test")
 
 
+def log_many(n):
+    logger = logging.getLogger(__name__)
+    for x in range(n):
+        logger.info("record %d", x)
+
+
 class BufferingTest(testlib.TestCase):
     klass = mitogen.core.LogHandler
 
@@ -74,6 +83,144 @@ class BufferingTest(testlib.TestCase):
         self.assertEqual(b('name\x0099\x00msg'), msg.data)
 
 
+class BatchTest(testlib.TestCase):
+    klass = mitogen.core.LogHandler
+    record = BufferingTest.__dict__['record']
+
+    def build(self, **kwargs):
+        context = mock.Mock()
+        handler = self.klass(context, **kwargs)
+        handler.uncork()
+        return context, handler
+
+    def records(self, msg):
+        self.assertEqual(mitogen.core.Message.ENC_BIN, msg.enc)
+        data = zlib.decompress(msg.data)
+        lst = []
+        while data:
+            size, = struct.unpack('>L', data[:4])
+            lst.append(data[4:4+size])
+            data = data[4+size:]
+        return lst
+
+    def test_single_record_uncompressed(self):
+        context, handler = self.build()
+        handler.emit(self.record())
+        self.assertEqual(0, context.send.call_count)
+        self.assertEqual(1, context.router.broker.defer.call_count)
+
+        handler._flush()
+        msg, = context.send.call_args[0]
+        self.assertEqual(mitogen.core.Message.ENC_MGC, msg.enc)
+        self.assertEqual(b('name\x0099\x00msg'), msg.data)
+
+    def test_batched(self):
+        context, handler = self.build()
+        for x in range(3):
+            handler.emit(self.record())
+        self.assertEqual(1, context.router.broker.defer.call_count)
+
+        handler._flush()
+        msg, = context.send.call_args[0]
+        self.assertEqual([b('name\x0099\x00msg')] * 3, self.records(msg))
+
+    def test_max_batch(self):
+        context, handler = self.build()
+        handler.max_batch = 2
+        for x in range(5):
+            handler.emit(self.record())
+        handler._flush()
+        self.assertEqual(3, context.send.call_count)
+        msgs = [args[0] for args, kwargs in context.send.call_args_list]
+        self.assertEqual(2, len(self.records(msgs[0])))
+        self.assertEqual(2, len(self.records(msgs[1])))
+        self.assertEqual(b('name\x0099\x00msg'), msgs[2].data)
+
+
+
+class RateLimitTest(testlib.TestCase):
+    record = BufferingTest.__dict__['record']
+    records = BatchTest.__dict__['records']
+
+    def build(self, rate):
+        context = mock.Mock()
+        handler = mitogen.core.LogHandler(context)
+        handler.uncork()
+        handler.limiter = mitogen.ratelimit.LogRateLimiter(handler, rate)
+        return context, handler
+
+    def dropped(self, handler, n):
+        return (b('mitogen\x00%d\x00' % (logging.WARNING,)) +
+                b(handler.limiter.dropped_msg % (n,)))
+
+    def test_rate_limit(self):
+        context, handler = self.build(2)
+        for x in range(5):
+            handler.emit(self.record())
+        handler.limiter._report()
+        handler._flush()
+        msg, = context.send.call_args[0]
+        lst = self.records(msg)
+        self.assertEqual(3, len(lst))
+        self.assertEqual(self.dropped(handler, 3), lst[2])
+
+    def test_drop_reported_without_further_records(self):
+        context, handler = self.build(1)
+        handler.emit(self.record())
+        handler._flush()
+        handler.emit(self.record())
+        self.assertEqual(2, context.router.broker.defer.call_count)
+        handler.limiter._report()
+        handler._flush()
+        msg, = context.send.call_args[0]
+        self.assertEqual(self.dropped(handler, 1), msg.data)
+
+
+class ForwardTest(testlib.RouterMixin, testlib.TestCase):
+    def test_batches_delivered(self):
+        log = testlib.LogCapturer()
+        log.start()
+        c1 = self.router.local(name='c1')
+        c1.call(log_many, 250)
+        c1.call(ping)
+        logs = log.stop()
+        for x in 0, 99, 100, 249:
+            self.assertIn('record %d\n' % (x,), logs)
+
+    def test_rate_limit(self):
+        log = testlib.LogCapturer()
+        log.start()
+        c1 = self.router.local(name='c1', log_rate_limit=10)
+        c1.call(log_many, 100)
+        c1.call(ping)
+        logs = log.stop()
+        self.assertIn('log records dropped by rate limit', logs)
+        self.assertNotIn('record 99\n', logs)
+
+    def forward_batch(self, data):
+        c1 = self.router.local(name='c1')
+        msg = mitogen.core.Message(data=zlib.compress(data),
+                                   enc=mitogen.core.Message.ENC_BIN,
+                                   src_id=c1.context_id)
+        log = testlib.LogCapturer()
+        log.start()
+        self.router.log_forwarder._on_forward_log(msg)
+        return log.stop()
+
+    def test_truncated_batch_dropped(self):
+        record = b('name\x0020\x00forwarded body')
+        for data in (struct.pack('>L', len(record)) + record[:-1],
+                     struct.pack('>L', len(record)) + record + b('\x00')):
+            logs = self.forward_batch(data)
+            self.assertIn('dropping truncated log batch', logs)
+            self.assertNotIn('forwarded body', logs)
+
+    def test_oversized_batch_dropped(self):
+        self.router.max_message_size = 64
+        logs = self.forward_batch(b('x') * 128)
+        self.assertIn('dropping oversized log batch', logs)
+
+
 class StartupTest(testlib.RouterMixin, testlib.TestCase):
     def test_earliest_messages_logged(self):
         log = testlib.LogCapturer()
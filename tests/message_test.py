@@ -9,6 +9,7 @@ except ImportError:
 
 import mitogen.core
 import mitogen.master
+import mitogen.primitive
 import testlib
 
 from mitogen.core import b
@@ -174,6 +175,14 @@ class EncodedTest(testlib.TestCase):
         self.assertEqual(b'abc', msg.data)
         self.assertEqual(self.klass.ENC_BIN, msg.enc)
 
+    def test_auto(self):
+        msg = self.klass.encoded(42, None)
+        self.assertEqual(self.klass.ENC_PRM, msg.enc)
+        self.assertEqual(42, msg.decode())
+
+        msg = self.klass.encoded(1j, None)
+        self.assertEqual(self.klass.ENC_PKL, msg.enc)
+
     def test_invalid_args(self):
         self.assertRaises(ValueError, lambda: self.klass.encoded(42, enc=self.klass.ENC_MGC))
         self.assertRaises(ValueError, lambda: self.klass.encoded(b('abc'), enc=self.klass.ENC_MGC))
@@ -318,6 +327,132 @@ class PickledTest(testlib.TestCase):
         )
 
 
+class PrimitiveTest(testlib.TestCase):
+    klass = mitogen.core.Message
+
+    def roundtrip(self, v, router=None):
+        msg = self.klass.primitive(v)
+        self.assertEqual(self.klass.ENC_PRM, msg.enc)
+        msg2 = self.klass(data=msg.data, enc=msg.enc)
+        msg2.router = router
+        return msg2.unpickle()
+
+    def assertRoundtrip(self, v):
+        roundtrip = self.roundtrip(v)
+        self.assertEqual(v, roundtrip)
+        self.assertIsInstance(roundtrip, type(v))
+        return roundtrip
+
+    def test_scalars(self):
+        for v in (None, True, False, 0, -1, 2**63-1, -2**63, 1.5,
+                  b(''), b('abc'), u'', u'\u00e9t\u00e9'):
+            self.assertRoundtrip(v)
+
+    def test_long(self):
+        for v in (2**63, -2**63-1, 2**200):
+            self.assertEqual(v, self.roundtrip(v))
+
+    def test_containers(self):
+        v = self.assertRoundtrip({
+            u'a': [1, (2, b('c'))],
+            b('d'): {},
+            3: (),
+            4: [],
+        })
+        self.assertIsInstance(v[u'a'][1], tuple)
+
+    def test_custom_types(self):
+        self.assertIsInstance(self.roundtrip(mitogen.core.Blob(b('x'))),
+                              mitogen.core.Blob)
+        self.assertIsInstance(self.roundtrip(mitogen.core.Secret(u'x')),
+                              mitogen.core.Secret)
+        kwargs = self.assertRoundtrip(mitogen.core.Kwargs({u'a': 1}))
+        self.assertEqual({u'a': 1}, kwargs)
+
+    def test_context_sender(self):
+        router = mitogen.master.Router()
+        try:
+            recv = mitogen.core.Receiver(router)
+            context = router.context_by_id(1234)
+            context2, sender = self.roundtrip((context, recv.to_sender()),
+                                              router=router)
+            self.assertIs(context, context2)
+            self.assertEqual(recv.handle, sender.dst_handle)
+            self.assertEqual(mitogen.context_id, sender.context.context_id)
+        finally:
+            router.broker.shutdown()
+            router.broker.join()
+
+    def test_find_class_denies_context_sender(self):
+        router = mitogen.master.Router()
+        try:
+            recv = mitogen.core.Receiver(router)
+            for v in (router.context_by_id(1234), [recv.to_sender()]):
+                msg = self.klass.primitive(v)
+                msg.router = router
+                self.assertRaises(mitogen.core.UnpicklingError,
+                    lambda: msg.unpickle(find_class=mitogen.core.find_deny))
+                self.assertRaises(mitogen.core.UnpicklingError,
+                                  next, msg.unpickle_iter())
+        finally:
+            router.broker.shutdown()
+            router.broker.join()
+
+    def test_find_class_plain_values(self):
+        msg = self.klass.primitive((1, u'a'))
+        self.assertEqual((1, u'a'),
+                         msg.unpickle(find_class=mitogen.core.find_deny))
+
+    def test_unsupported(self):
+        for v in (1j, EvilObject(), [set()], bytearray(b('x'))):
+            self.assertRaises(TypeError, lambda: self.klass.primitive(v))
+
+    def test_recursive(self):
+        l = []
+        l.append(l)
+        self.assertRaises(TypeError, lambda: self.klass.primitive(l))
+
+    def test_invalid(self):
+        data = self.klass.primitive((u'abc', [1, 2])).data
+        for bad in data[:-1], data[:3], b('Z'):
+            msg = self.klass(data=bad, enc=self.klass.ENC_PRM)
+            self.assertRaises(mitogen.core.StreamError, msg.unpickle)
+
+        msg = self.klass(data=b('d\x00\x00\x00\x01l\x00\x00\x00\x00N'),
+                         enc=self.klass.ENC_PRM)
+        self.assertRaises(mitogen.core.StreamError, msg.unpickle)
+
+    def test_throw_dead(self):
+        msg = self.klass.primitive(u'derp', reply_to=mitogen.core.IS_DEAD)
+        self.assertRaises(mitogen.core.ChannelError, msg.unpickle)
+        self.assertEqual(u'derp', msg.unpickle(throw_dead=False))
+
+    def test_serialized(self):
+        msg = self.klass.serialized((1, u'a'))
+        self.assertEqual(self.klass.ENC_PRM, msg.enc)
+        self.assertEqual((1, u'a'), msg.unpickle())
+
+        self.assertEqual(self.klass.ENC_PKL, self.klass.serialized(1j).enc)
+
+        v = list(range(100))
+        msg = self.klass.serialized(v)
+        self.assertEqual(self.klass.ENC_PKL, msg.enc)
+        self.assertEqual(v, msg.unpickle())
+
+    def test_decode_imports_decoder(self):
+        data = self.klass.primitive((1, u'a')).data
+        saved = sys.modules.pop('mitogen.primitive')
+        mitogen.core._load_primitive = None
+        try:
+            msg = self.klass(data=data, enc=self.klass.ENC_PRM)
+            self.assertEqual((1, u'a'), msg.unpickle())
+            self.assertIn('mitogen.primitive', sys.modules)
+        finally:
+            sys.modules['mitogen.primitive'] = mitogen.primitive = saved
+            mitogen.core._dump_primitive = saved.dump
+            mitogen.core._load_primitive = saved.load
+
+
 class UnpickleIterTest(testlib.TestCase):
     def roundtrip(self, *args, **kwargs):
         msg1 = mitogen.core.Message.pickled(*args, **kwargs)
@@ -417,6 +552,41 @@ class UnpickleTest(testlib.TestCase):
         self.assertRaises(ValueError, msg.unpickle)
 
 
+class UnpickleRouterTest(testlib.RouterMixin, testlib.TestCase):
+    klass = mitogen.core.Message
+
+    def roundtrip(self, v):
+        msg = self.klass(data=self.klass.pickled(v).data)
+        msg.router = self.router
+        return msg.unpickle()
+
+    def test_sender_interned(self):
+        recv = mitogen.core.Receiver(self.router)
+        sender = recv.to_sender()
+        s1, s2 = self.roundtrip((sender, sender))
+        self.assertIs(s1, s2)
+        self.assertIs(s1, self.roundtrip(sender))
+        self.assertIs(self.router.context_by_id(mitogen.context_id),
+                      s1.context)
+
+    def test_sender_released(self):
+        recv = mitogen.core.Receiver(self.router)
+        sender = self.roundtrip(recv.to_sender())
+        key = mitogen.context_id, recv.handle
+        self.assertIn(key, self.router._sender_by_key)
+        del sender
+        import gc; gc.collect()
+        self.assertNotIn(key, self.router._sender_by_key)
+
+    def test_context_interned(self):
+        context = self.router.context_by_id(1234)
+        self.assertIs(context, self.roundtrip(context))
+
+    def test_denied(self):
+        self.assertRaises(mitogen.core.StreamError,
+            lambda: self.roundtrip(EvilObject()))
+
+
 class UnpickleCompatTest(testlib.TestCase):
     # try weird variations of pickles from different Python versions.
     klass = mitogen.core.Message
@@ -1,13 +1,23 @@
+import os
+
 try:
     from unittest import mock
 except ImportError:
     import mock
 
+import mitogen.compress
 import mitogen.core
+import mitogen.parent
+import mitogen.recvbuf
 
 import testlib
 
 
+def send_bulk(sender, data):
+    sender.send(data, priority=mitogen.core.Message.PRIO_BULK)
+    sender.close()
+
+
 class ReceiveOneTest(testlib.TestCase):
     klass = mitogen.core.MitogenProtocol
 
@@ -29,3 +39,333 @@ class ReceiveOneTest(testlib.TestCase):
         self.assertEqual(1, stream.on_disconnect.call_count)
         expect = self.klass.corrupt_msg % (stream.name, junk)
         self.assertIn(expect, capture.raw())
+
+
+class ReceiveBufferedTest(testlib.TestCase):
+    klass = mitogen.core.MitogenProtocol
+
+    def setUp(self):
+        super(ReceiveBufferedTest, self).setUp()
+        if not mitogen.recvbuf.ReceiveBuffer.SUPPORTED:
+            self.skipTest('ReceiveBuffer requires Python 2.7')
+        self.router = mock.Mock()
+        self.router.max_message_size = 1 << 30
+        self.protocol = self.klass(self.router, 1)
+        self.protocol.stream = mock.Mock()
+
+    def pack(self, data):
+        return mitogen.core.Message(data=data, dst_id=0, src_id=1,
+                                    handle=100).pack()
+
+    def routed(self):
+        return [
+            args[0]
+            for args, kwargs in self.router._async_route.call_args_list
+        ]
+
+    def test_split_frames(self):
+        small = self.pack(mitogen.core.b('x') * 10)
+        large = self.pack(mitogen.core.b('y') * 65536)
+        data = small + large + small
+        for i in range(0, len(data), 1000):
+            self.protocol.on_receive(mock.Mock(), data[i:i+1000])
+
+        msgs = self.routed()
+        self.assertEqual(3, len(msgs))
+        self.assertEqual(mitogen.core.b('x') * 10, msgs[0].data)
+        self.assertIsInstance(msgs[1].payload, memoryview)
+        self.assertEqual(65536, len(msgs[1].payload))
+        self.assertEqual(mitogen.core.b('y') * 65536, msgs[1].data)
+        self.assertEqual(mitogen.core.b('x') * 10, msgs[2].data)
+        self.assertEqual(0, len(self.protocol.receive_buffer))
+
+    def test_payload_survives_reuse(self):
+        first = self.pack(mitogen.core.b('a') * 65536)
+        second = self.pack(mitogen.core.b('b') * 65536)
+        self.protocol.on_receive(mock.Mock(), first)
+        self.protocol.on_receive(mock.Mock(), second)
+        msgs = self.routed()
+        self.assertEqual(mitogen.core.b('a') * 65536, msgs[0].data)
+        self.assertEqual(mitogen.core.b('b') * 65536, msgs[1].data)
+
+    def test_install(self):
+        legacy = self.klass(self.router, 1)
+        legacy.receive_buffer = None
+        legacy.stream = mock.Mock()
+        frame = self.pack(mitogen.core.b('x') * 65536)
+        legacy.on_receive(mock.Mock(), frame[:1000])
+        mitogen.recvbuf.install(legacy)
+        self.assertEqual(1000, len(legacy.receive_buffer))
+        legacy.on_receive(mock.Mock(), frame[1000:])
+        msg, = self.routed()
+        self.assertEqual(mitogen.core.b('x') * 65536, msg.data)
+        self.assertEqual(0, len(legacy.receive_buffer))
+
+
+@mitogen.core.takes_econtext
+def get_upstream_receive_buffer(econtext):
+    # Runs after the install() the child deferred to the broker at startup.
+    rbuf = econtext.broker.defer_sync(
+        lambda: econtext.stream.protocol.receive_buffer
+    )
+    return rbuf is not None
+
+
+class ReceiveBufferConnectionTest(testlib.RouterMixin, testlib.TestCase):
+    def test_installed_upstream(self):
+        if not mitogen.recvbuf.ReceiveBuffer.SUPPORTED:
+            self.skipTest('ReceiveBuffer requires Python 2.7')
+        c = self.router.local()
+        self.assertTrue(c.call(get_upstream_receive_buffer))
+
+class CompressionTest(testlib.TestCase):
+    klass = mitogen.core.MitogenProtocol
+
+    def make_protocol(self, compression=None):
+        router = mock.Mock()
+        router.max_message_size = 1 << 20
+        router.cork_bytes = 0
+        compressor = None
+        if compression:
+            compressor = mitogen.compress.Compressor(compression)
+        protocol = self.klass(router, 1, compressor=compressor)
+        protocol.stream = mock.Mock()
+        protocol._writer = mock.Mock()
+        return protocol
+
+    def send(self, sender, data):
+        msg = mitogen.core.Message(data=data, dst_id=0, src_id=1, handle=100,
+                                   enc=mitogen.core.Message.ENC_BIN)
+        sender._send(msg)
+        args, kwargs = sender._writer.method_calls[-1][1:]
+        return mitogen.core.b('').join(bytes(buf) for buf in args[0])
+
+    def test_roundtrip(self):
+        sender = self.make_protocol(compression=6)
+        receiver = self.make_protocol(compression=6)
+        data = mitogen.core.b('x') * 65536
+        frame = self.send(sender, data)
+        self.assertTrue(len(frame) < 1024)
+
+        receiver.on_receive(mock.Mock(), frame)
+        msg, = [args[0] for args, kwargs
+                in receiver._router._async_route.call_args_list]
+        self.assertEqual(mitogen.core.Message.ENC_BIN, msg.enc)
+        self.assertEqual(data, msg.data)
+
+        self.assertEqual(1, sender.compressor.tx_compressed_count)
+        self.assertEqual(65536, sender.compressor.tx_compressed_in)
+        self.assertEqual(65536, receiver.compressor.rx_compressed_out)
+        stats = sender.compressor.get_stats()
+        self.assertTrue(stats['tx_compression_ratio'] < 0.1)
+
+    def test_below_threshold(self):
+        sender = self.make_protocol(compression=6)
+        data = mitogen.core.b('x') * 100
+        frame = self.send(sender, data)
+        self.assertEqual(mitogen.core.Message.HEADER_LEN + 100, len(frame))
+        self.assertEqual(0, sender.compressor.tx_compressed_count)
+
+    def test_incompressible(self):
+        sender = self.make_protocol(compression=6)
+        data = os.urandom(65536)
+        frame = self.send(sender, data)
+        self.assertEqual(data, frame[mitogen.core.Message.HEADER_LEN:])
+        self.assertEqual(1, sender.compressor.tx_incompressible_count)
+
+    def test_inflated_size_exceeded(self):
+        sender = self.make_protocol(compression=6)
+        receiver = self.make_protocol()
+        receiver._router.max_message_size = 4096
+        frame = self.send(sender, mitogen.core.b('x') * 65536)
+
+        capture = testlib.LogCapturer()
+        capture.start()
+        receiver.on_receive(mock.Mock(), frame)
+        capture.stop()
+        self.assertEqual(1, receiver.stream.on_disconnect.call_count)
+        self.assertEqual(0, receiver._router._async_route.call_count)
+        self.assertIn('Maximum message size exceeded', capture.raw())
+
+
+def make_string(size):
+    return mitogen.core.b('x') * size
+
+
+class CompressionConnectionTest(testlib.RouterMixin, testlib.TestCase):
+    def test_both_ends_compress(self):
+        c1 = self.router.local(stream_compression=6)
+        data = c1.call(make_string, 65536)
+        self.assertEqual(make_string(65536), data)
+
+        protocol = self.router.stream_by_id(c1.context_id).protocol
+        stats = protocol.compressor.get_stats()
+        self.assertEqual(1, stats['rx_compressed_out'] // 65536)
+        self.assertTrue(stats['rx_compression_ratio'] < 0.1)
+
+
+class FragmentTest(testlib.TestCase):
+    klass = mitogen.core.MitogenProtocol
+
+    def make_protocol(self):
+        router = mock.Mock()
+        router.max_message_size = 1 << 20
+        router.cork_bytes = 0
+        router._allocate_fragment_id.return_value = 7
+        protocol = self.klass(router, 1)
+        protocol.stream = mock.Mock()
+        protocol._writer = mock.Mock()
+        protocol.fragment_size = 1000
+        return protocol
+
+    def frames(self, protocol):
+        return [
+            mitogen.core.b('').join(bytes(buf) for buf in args[0])
+            for name, args, kwargs in protocol._writer.method_calls
+        ]
+
+    def routed(self, protocol):
+        return [
+            args[0]
+            for args, kwargs in protocol._router._async_route.call_args_list
+        ]
+
+    def test_fragmented(self):
+        sender = self.make_protocol()
+        receiver = self.make_protocol()
+        data = os.urandom(3500)
+        sender._send(mitogen.core.Message(
+            data=data, dst_id=0, src_id=1, handle=100,
+            priority=mitogen.core.Message.PRIO_BULK,
+        ))
+        frames = self.frames(sender)
+        self.assertEqual(4, len(frames))
+        for frame in frames:
+            self.assertTrue(len(frame) < 1100)
+            receiver.on_receive(mock.Mock(), frame)
+
+        msgs = self.routed(receiver)
+        self.assertEqual([(7, 0, 3500), (7, 1000, 3500),
+                          (7, 2000, 3500), (7, 3000, 3500)],
+                         [msg.fragment for msg in msgs])
+        self.assertEqual(data, mitogen.core.b('').join(m.data for m in msgs))
+        for msg in msgs:
+            self.assertEqual(100, msg.handle)
+            self.assertEqual(mitogen.core.Message.ENC_MGC, msg.enc)
+            self.assertEqual(mitogen.core.Message.PRIO_BULK, msg.priority)
+
+    def test_forward_fragment(self):
+        sender = self.make_protocol()
+        receiver = self.make_protocol()
+        sender._send(mitogen.core.Message(
+            data=mitogen.core.b('x') * 10, dst_id=0, src_id=1, handle=100,
+            fragment=(3, 1000, 1010),
+        ))
+        frame, = self.frames(sender)
+        receiver.on_receive(mock.Mock(), frame)
+        msg, = self.routed(receiver)
+        self.assertEqual((3, 1000, 1010), msg.fragment)
+        self.assertEqual(mitogen.core.b('x') * 10, msg.data)
+
+    def test_not_fragmented(self):
+        sender = self.make_protocol()
+        sender._send(mitogen.core.Message(
+            data=os.urandom(1000), dst_id=0, src_id=1, handle=100,
+        ))
+        self.assertEqual(1, len(self.frames(sender)))
+
+
+    def test_traced(self):
+        sender = self.make_protocol()
+        receiver = self.make_protocol()
+        sender._send(mitogen.core.Message(
+            data=mitogen.core.b('x') * 10, dst_id=0, src_id=1, handle=100,
+            trace_id=1 << 40,
+        ))
+        frame, = self.frames(sender)
+        receiver.on_receive(mock.Mock(), frame)
+        msg, = self.routed(receiver)
+        self.assertEqual(1 << 40, msg.trace_id)
+        self.assertEqual(mitogen.core.Message.ENC_MGC, msg.enc)
+        self.assertEqual(mitogen.core.b('x') * 10, msg.data)
+        self.assertEqual('enqueue', sender._router._trace.call_args[0][1])
+        self.assertEqual('receive', receiver._router._trace.call_args[0][1])
+
+    def test_traced_fragmented(self):
+        sender = self.make_protocol()
+        receiver = self.make_protocol()
+        data = os.urandom(1500)
+        sender._send(mitogen.core.Message(
+            data=data, dst_id=0, src_id=1, handle=100, trace_id=5,
+        ))
+        for frame in self.frames(sender):
+            receiver.on_receive(mock.Mock(), frame)
+        msgs = self.routed(receiver)
+        self.assertEqual([(7, 0, 1500), (7, 1000, 1500)],
+                         [msg.fragment for msg in msgs])
+        self.assertEqual([5, 5], [msg.trace_id for msg in msgs])
+        self.assertEqual(data, mitogen.core.b('').join(m.data for m in msgs))
+
+
+class PriorityTest(testlib.TestCase):
+    klass = mitogen.parent.MitogenProtocol
+
+    def sent_priority(self, **kwargs):
+        router = mock.Mock()
+        router.cork_bytes = 0
+        protocol = self.klass(router, 1)
+        protocol.stream = mock.Mock()
+        protocol._writer = mock.Mock()
+        protocol._send(mitogen.core.Message(dst_id=1, src_id=0, **kwargs))
+        return protocol._writer.priority
+
+    def test_control_handle(self):
+        self.assertEqual(mitogen.core.Message.PRIO_CONTROL,
+                         self.sent_priority(handle=mitogen.core.SHUTDOWN))
+
+    def test_default(self):
+        self.assertEqual(mitogen.core.Message.PRIO_NORMAL,
+                         self.sent_priority(handle=100))
+
+    def test_explicit(self):
+        self.assertEqual(mitogen.core.Message.PRIO_BULK, self.sent_priority(
+            handle=mitogen.core.SHUTDOWN,
+            priority=mitogen.core.Message.PRIO_BULK,
+        ))
+
+
+class BulkSendTest(testlib.RouterMixin, testlib.TestCase):
+    def test_via_intermediary(self):
+        via = self.router.local()
+        context = self.router.local(via=via)
+        recv = mitogen.core.Receiver(self.router)
+        data = os.urandom(3 * mitogen.core.CHUNK_SIZE + 1)
+        context.call(send_bulk, recv.to_sender(), data)
+        self.assertEqual(data, recv.get().unpickle())
+        self.assertRaises(mitogen.core.ChannelError,
+                          lambda: recv.get().unpickle())
+
+
+class SenderCloseTest(testlib.TestCase):
+    def sent_priorities(self, context):
+        return [args[0].priority for args, kwargs in
+                context.send.call_args_list]
+
+    def test_default_priority_not_overtaken(self):
+        context = mock.Mock()
+        sender = mitogen.core.Sender(context, 100)
+        sender.send('x')
+        sender.send('y', priority=mitogen.core.Message.PRIO_CONTROL)
+        sender.close()
+        self.assertEqual([None, mitogen.core.Message.PRIO_CONTROL,
+                          mitogen.core.Message.PRIO_NORMAL],
+                         self.sent_priorities(context))
+
+    def test_bulk_not_overtaken(self):
+        context = mock.Mock()
+        sender = mitogen.core.Sender(context, 100)
+        sender.send('x', priority=mitogen.core.Message.PRIO_BULK)
+        sender.send('y')
+        sender.close()
+        self.assertEqual(mitogen.core.Message.PRIO_BULK,
+                         self.sent_priorities(context)[-1])
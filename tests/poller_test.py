@@ -416,3 +416,86 @@ EpollTest = unittest.skipIf(
     condition=(not EpollTest.klass.SUPPORTED),
     reason='select.epoll() not available',
 )(EpollTest)
+
+
+class EdgeTriggeredEpollPoller(mitogen.parent.EpollPoller):
+    edge_triggered = True
+
+
+class EdgeTriggeredEpollTest(AllMixin, testlib.TestCase):
+    klass = EdgeTriggeredEpollPoller
+
+    # An FD still started after being yielded is assumed to have filled, as
+    # a stream that emptied its buffer stops transmitting. It is not yielded
+    # again until the kernel reports it drained, unlike the LT pollers.
+
+    def test_transmit_toggle_keeps_registration(self):
+        def poll_and_stop():
+            # Like a stream that empties its buffer while the FD is yielded.
+            for fd in self.p.poll(0):
+                self.p.stop_transmit(fd)
+                yield fd
+
+        self.p.start_receive(self.l1)
+        self.p.start_transmit(self.l1)
+        self.assertEqual([self.l1], list(poll_and_stop()))
+        wepoll = self.p._wepoll
+        self.p._wepoll = None  # Any epoll_ctl call would crash.
+        try:
+            for x in range(3):
+                self.p.start_transmit(self.l1)
+                self.assertEqual([self.l1], list(poll_and_stop()))
+        finally:
+            self.p._wepoll = wepoll
+
+    def test_writeable_after_fill_and_drain(self):
+        self.p.start_transmit(self.l1)
+        self.assertEqual([self.l1], list(self.p.poll(0)))
+        self.fill(self.l1)
+        self.assertEqual([], list(self.p.poll(0)))
+        self.drain(self.r1)
+        self.assertEqual([self.l1], list(self.p.poll(0)))
+
+    def test_still_started_not_repeated(self):
+        self.p.start_transmit(self.l1)
+        self.assertEqual([self.l1], list(self.p.poll(0)))
+        self.assertEqual([], list(self.p.poll(0)))
+
+    def test_double_unwriteable_then_Writeable(self):
+        self.fill(self.r1)
+        self.p.start_transmit(self.r1)
+        self.fill(self.r2)
+        self.p.start_transmit(self.r2)
+        self.assertEqual([], list(self.p.poll(0)))
+        self.drain(self.l1)
+        self.assertEqual([self.r1], list(self.p.poll(0)))
+        self.drain(self.l2)
+        self.assertEqual([self.r2], list(self.p.poll(0)))
+
+    def test_one_distinct(self):
+        rdata = object()
+        wdata = object()
+        self.p.start_receive(self.r1, data=rdata)
+        self.p.start_transmit(self.r1, data=wdata)
+        self.assertEqual([wdata], list(self.p.poll(0)))
+        self.fill(self.l1)
+        self.assertEqual([rdata], list(self.p.poll(0)))
+
+    def test_stop_receive_keeps_transmit(self):
+        self.p.start_receive(self.l1)
+        self.p.start_transmit(self.l1)
+        self.p.stop_receive(self.l1)
+        self.assertEqual([self.l1], list(self.p.poll(0)))
+
+    def test_batched_modify(self):
+        self.p.start_receive(self.l1)
+        self.p.start_receive(self.l2)
+        self.p.stop_receive(self.l2)
+        self.p.start_receive(self.l2)
+        self.assertEqual(set(), self.p._dirty)
+        self.assertEqual(set([self.l1, self.l2]), set(self.p._registered))
+
+EdgeTriggeredEpollTest = unittest.skipIf(
+    condition=(not EdgeTriggeredEpollTest.klass.SUPPORTED),
+    reason='select.epoll() not available',
+)(EdgeTriggeredEpollTest)
@@ -58,6 +58,42 @@ class IterationTest(testlib.RouterMixin, testlib.TestCase):
 
 
 
+class GetManyTest(testlib.RouterMixin, testlib.TestCase):
+    def test_max_items(self):
+        recv = mitogen.core.Receiver(self.router)
+        for x in range(5):
+            recv._on_receive(mitogen.core.Message.pickled(x))
+        msgs = recv.get_many(max_items=3)
+        self.assertEqual([0, 1, 2], [msg.unpickle() for msg in msgs])
+        msgs = recv.get_many()
+        self.assertEqual([3, 4], [msg.unpickle() for msg in msgs])
+
+    def test_dead_after_messages(self):
+        recv = mitogen.core.Receiver(self.router)
+        recv._on_receive(mitogen.core.Message.pickled(1))
+        recv._on_receive(mitogen.core.Message.dead())
+        msgs = recv.get_many()
+        self.assertEqual([1], [msg.unpickle() for msg in msgs])
+        self.assertRaises(mitogen.core.ChannelError, recv.get_many)
+
+    def test_dead_no_throw(self):
+        recv = mitogen.core.Receiver(self.router)
+        recv._on_receive(mitogen.core.Message.pickled(1))
+        recv._on_receive(mitogen.core.Message.dead())
+        msgs = recv.get_many(throw_dead=False)
+        self.assertEqual(2, len(msgs))
+        self.assertTrue(msgs[1].is_dead)
+
+    def test_iter_many(self):
+        recv = mitogen.core.Receiver(self.router)
+        fork = self.router.local()
+        ret = fork.call_async(yield_stuff_then_die, recv.to_sender())
+        self.assertEqual(10, ret.get().unpickle())
+        batches = list(recv.iter_many())
+        self.assertEqual(list(range(5)),
+                         [msg.unpickle() for msgs in batches for msg in msgs])
+
+
 class CloseTest(testlib.RouterMixin, testlib.TestCase):
     def wait(self, latch, wait_recv):
         try:
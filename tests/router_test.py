@@ -7,6 +7,7 @@ import testlib
 import mitogen.core
 import mitogen.master
 import mitogen.parent
+import mitogen.stats
 from mitogen.core import b
 
 try:
@@ -324,6 +325,98 @@ class MessageSizeTest(testlib.BrokerMixin, testlib.TestCase):
         self.assertIn(expect, logs.stop())
 
 
+def send_bulk_reply(sender, n):
+    sender.send(b('x') * n, priority=mitogen.core.Message.PRIO_BULK)
+    return 123
+
+
+class FragmentTest(testlib.RouterMixin, testlib.TestCase):
+    def fragments(self, recv, data, size, fragment_id=1):
+        msgs = []
+        for offset in range(0, len(data), size):
+            msgs.append(mitogen.core.Message(
+                data=data[offset:offset + size],
+                dst_id=mitogen.context_id,
+                src_id=mitogen.context_id,
+                handle=recv.handle,
+                enc=mitogen.core.Message.ENC_BIN,
+                fragment=(fragment_id, offset, len(data)),
+            ))
+        return msgs
+
+    def deliver(self, msgs):
+        def route():
+            for msg in msgs:
+                self.router._async_route(msg)
+        self.broker.defer_sync(route)
+
+    def test_reassembled(self):
+        recv = mitogen.core.Receiver(self.router)
+        data = os.urandom(3500)
+        self.deliver(self.fragments(recv, data, 1000))
+        msg = recv.get(timeout=0)
+        self.assertEqual(None, msg.fragment)
+        self.assertEqual(data, msg.data)
+        self.assertTrue(recv.empty())
+
+    def test_interleaved(self):
+        recv = mitogen.core.Receiver(self.router)
+        data1 = os.urandom(2000)
+        data2 = os.urandom(2000)
+        msgs1 = self.fragments(recv, data1, 1000, fragment_id=1)
+        msgs2 = self.fragments(recv, data2, 1000, fragment_id=2)
+        self.deliver([msgs1[0], msgs2[0], msgs2[1], msgs1[1]])
+        self.assertEqual(data2, recv.get(timeout=0).data)
+        self.assertEqual(data1, recv.get(timeout=0).data)
+
+    def test_streaming(self):
+        recv = mitogen.core.Receiver(self.router, streaming=True)
+        data = os.urandom(3500)
+        self.deliver(self.fragments(recv, data, 1000))
+        msgs = [recv.get(timeout=0) for x in range(4)]
+        self.assertEqual([0, 1000, 2000, 3000],
+                         [msg.fragment[1] for msg in msgs])
+        self.assertEqual(data, b('').join(msg.data for msg in msgs))
+
+    def test_streaming_refused_once(self):
+        recv = mitogen.core.Receiver(self.router)
+        refused = mitogen.core.Receiver(self.router)
+        handle = self.router.add_handler(lambda msg: None, streaming=True,
+                                         policy=lambda msg, stream: False)
+        msgs = self.fragments(recv, os.urandom(3500), 1000)
+        for msg in msgs:
+            msg.handle = handle
+            msg.reply_to = refused.handle
+        self.deliver(msgs)
+        e = self.assertRaises(mitogen.core.ChannelError,
+            lambda: refused.get(timeout=0).unpickle())
+        self.assertEqual(e.args[0], self.router.refused_msg)
+        self.assertTrue(refused.empty())
+
+    def test_total_size_exceeded(self):
+        self.router.max_message_size = 4096
+        recv = mitogen.core.Receiver(self.router)
+        self.deliver(self.fragments(recv, b('x') * 8192, 1000))
+        e = self.assertRaises(mitogen.core.ChannelError,
+            lambda: recv.get(timeout=0).unpickle())
+        self.assertEqual(e.args[0], self.router.too_large_msg % (4096,))
+        self.assertTrue(recv.empty())
+        self.assertEqual({}, self.router._fragments)
+
+    def test_remote_fragmented(self):
+        n = 3 * mitogen.core.CHUNK_SIZE + 1
+        recv = mitogen.core.Receiver(self.router, streaming=True)
+        child = self.router.local()
+        self.assertEqual(123, child.call(send_bulk_reply, recv.to_sender(), n))
+        msgs = [recv.get()]
+        while msgs[-1].fragment[1] + len(msgs[-1].data) < msgs[-1].fragment[2]:
+            msgs.append(recv.get())
+        self.assertTrue(len(msgs) > 1)
+        data = b('').join(msg.data for msg in msgs)
+        msg = mitogen.core.Message(data=data, enc=msgs[0].enc)
+        self.assertEqual(b('x') * n, msg.unpickle())
+
+
 class NoRouteTest(testlib.RouterMixin, testlib.TestCase):
     def test_invalid_handle_returns_dead(self):
         # Verify sending a message to an invalid handle yields a dead message
@@ -472,6 +565,74 @@ class EgressIdsTest(testlib.RouterMixin, testlib.TestCase):
         ]))
 
 
+class StatsTest(testlib.RouterMixin, testlib.TestCase):
+    def setUp(self):
+        super(StatsTest, self).setUp()
+        self.router.stats = mitogen.stats.RouterStats()
+
+    def route(self, msg):
+        msg.dst_id = mitogen.context_id
+        self.broker.defer_sync(lambda: self.router._async_route(msg))
+
+    def test_disabled(self):
+        stats = self.router.stats
+        self.router.stats = None
+        recv = mitogen.core.Receiver(self.router)
+        self.route(mitogen.core.Message.pickled(1, handle=recv.handle))
+        recv.get()
+        self.assertEqual({'handles': {}, 'streams': {}}, stats.get())
+
+    def test_persistent_handle(self):
+        recv = mitogen.core.Receiver(self.router)
+        for x in range(3):
+            self.route(mitogen.core.Message(data=b('abcd'),
+                                            handle=recv.handle))
+        stats = self.router.stats.get()['handles']
+        stats = stats[recv.handle]
+        self.assertEqual(3, stats['messages'])
+        self.assertEqual(12, stats['bytes'])
+        self.assertEqual(0, stats['drops'])
+        self.assertTrue(stats['seconds'] >= 0)
+
+    def test_oneshot_and_invalid_handles_shared(self):
+        recv = mitogen.core.Receiver(self.router, persist=False)
+        self.route(mitogen.core.Message(data=b('ab'), handle=recv.handle))
+        self.route(mitogen.core.Message(handle=recv.handle))
+        stats = self.router.stats.get()['handles']
+        self.assertNotIn(recv.handle, stats)
+        self.assertEqual(1, stats[None]['messages'])
+        self.assertEqual(2, stats[None]['bytes'])
+        self.assertEqual(1, stats[None]['drops'])
+
+    def test_policy_drop(self):
+        recv = mitogen.core.Receiver(self.router,
+                                     policy=lambda msg, stream: False)
+        self.route(mitogen.core.Message(handle=recv.handle))
+        stats = self.router.stats.get()['handles']
+        stats = stats[recv.handle]
+        self.assertEqual(0, stats['messages'])
+        self.assertEqual(1, stats['drops'])
+
+    def test_stream(self):
+        c1 = self.router.local(name='c1')
+        self.assertEqual(123, c1.call(int, 123))
+        stream = self.router.stream_by_id(c1.context_id)
+        stats = self.router.stats.get()['streams']
+        stats = stats[stream.name]
+        self.assertTrue(stats['tx_messages'] >= 1)
+        self.assertTrue(stats['tx_bytes'] > 0)
+        self.assertTrue(stats['rx_messages'] >= 1)
+        self.assertTrue(stats['rx_bytes'] > 0)
+        self.assertEqual(0, stats['drops'])
+
+    def test_router_info(self):
+        import mitogen.debug
+        recv = mitogen.core.Receiver(self.router)
+        self.route(mitogen.core.Message(handle=recv.handle))
+        info = mitogen.debug._router_info(0, self.router)
+        self.assertEqual(1, info['stats']['handles'][recv.handle]['messages'])
+
+
 class ShutdownTest(testlib.RouterMixin, testlib.TestCase):
     # 613: tests for all the weird shutdown() variants we ended up with.
 
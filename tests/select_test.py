@@ -40,7 +40,7 @@ class AddTest(testlib.RouterMixin, testlib.TestCase):
         select = self.klass()
         select.add(latch)
         self.assertEqual(1, len(select._receivers))
-        self.assertEqual(latch, select._receivers[0])
+        self.assertEqual([latch], list(select._receivers))
         self.assertEqual(select._put, latch.notify)
 
     def test_receiver(self):
@@ -48,7 +48,7 @@ class AddTest(testlib.RouterMixin, testlib.TestCase):
         select = self.klass()
         select.add(recv)
         self.assertEqual(1, len(select._receivers))
-        self.assertEqual(recv, select._receivers[0])
+        self.assertEqual([recv], list(select._receivers))
         self.assertEqual(select._put, recv.notify)
 
     def test_channel(self):
@@ -57,7 +57,7 @@ class AddTest(testlib.RouterMixin, testlib.TestCase):
         select = self.klass()
         select.add(chan)
         self.assertEqual(1, len(select._receivers))
-        self.assertEqual(chan, select._receivers[0])
+        self.assertEqual([chan], list(select._receivers))
         self.assertEqual(select._put, chan.notify)
 
     def test_subselect_empty(self):
@@ -65,7 +65,7 @@ class AddTest(testlib.RouterMixin, testlib.TestCase):
         subselect = self.klass()
         select.add(subselect)
         self.assertEqual(1, len(select._receivers))
-        self.assertEqual(subselect, select._receivers[0])
+        self.assertEqual([subselect], list(select._receivers))
         self.assertEqual(select._put, subselect.notify)
 
     def test_subselect_nonempty(self):
@@ -76,7 +76,7 @@ class AddTest(testlib.RouterMixin, testlib.TestCase):
 
         select.add(subselect)
         self.assertEqual(1, len(select._receivers))
-        self.assertEqual(subselect, select._receivers[0])
+        self.assertEqual([subselect], list(select._receivers))
         self.assertEqual(select._put, subselect.notify)
 
     def test_subselect_loop_direct(self):
@@ -113,6 +113,32 @@ class AddTest(testlib.RouterMixin, testlib.TestCase):
         self.assertEqual(str(exc), self.klass.owned_msg)
 
 
+class AddManyTest(testlib.RouterMixin, testlib.TestCase):
+    klass = mitogen.select.Select
+
+    def test_receivers(self):
+        recvs = [mitogen.core.Receiver(self.router) for x in range(3)]
+        recvs[1]._on_receive(mitogen.core.Message.pickled(1))
+        select = self.klass()
+        select.add_many(recvs)
+        self.assertEqual(set(recvs), set(select._receivers))
+        for recv in recvs:
+            self.assertEqual(select._put, recv.notify)
+        self.assertEqual(recvs[1], select.get_event().source)
+
+    def test_owned_unchanged(self):
+        recv = mitogen.core.Receiver(self.router)
+        owned = mitogen.core.Receiver(self.router)
+        other = self.klass([owned])
+        select = self.klass()
+        exc = self.assertRaises(mitogen.select.Error,
+            lambda: select.add_many([recv, owned]))
+        self.assertEqual(str(exc), self.klass.owned_msg)
+        self.assertEqual(0, len(select._receivers))
+        self.assertEqual(None, recv.notify)
+        self.assertEqual(other._put, owned.notify)
+
+
 class RemoveTest(testlib.RouterMixin, testlib.TestCase):
     klass = mitogen.select.Select
 
@@ -300,7 +326,7 @@ class OneShotTest(testlib.RouterMixin, testlib.TestCase):
 
         self.assertEqual(msg, select.get())
         self.assertEqual(1, len(select._receivers))
-        self.assertEqual(recv, select._receivers[0])
+        self.assertEqual([recv], list(select._receivers))
         self.assertEqual(select._put, recv.notify)
 
     def test_true_latch_removed_after_get(self):
@@ -318,7 +344,7 @@ class OneShotTest(testlib.RouterMixin, testlib.TestCase):
 
         self.assertEqual(123, select.get())
         self.assertEqual(1, len(select._receivers))
-        self.assertEqual(latch, select._receivers[0])
+        self.assertEqual([latch], list(select._receivers))
         self.assertEqual(select._put, latch.notify)
 
 
@@ -474,3 +500,58 @@ class GetEventTest(testlib.RouterMixin, testlib.TestCase):
         event = select.get_event()
         self.assertEqual(recv, event.source)
         self.assertEqual('123', event.data.unpickle())
+
+
+class GetEventsTest(testlib.RouterMixin, testlib.TestCase):
+    klass = mitogen.select.Select
+
+    def test_empty(self):
+        select = self.klass()
+        exc = self.assertRaises(mitogen.select.Error,
+            lambda: select.get_many())
+        self.assertEqual(str(exc), self.klass.empty_msg)
+
+    def test_timeout(self):
+        select = self.klass([mitogen.core.Latch()])
+        self.assertRaises(mitogen.core.TimeoutError,
+            lambda: select.get_many(timeout=0))
+
+    def test_mixed(self):
+        latch = mitogen.core.Latch()
+        recv = mitogen.core.Receiver(self.router)
+        select = self.klass([latch, recv], oneshot=False)
+        latch.put(1)
+        recv._on_receive(mitogen.core.Message.pickled(2))
+        latch.put(3)
+        events = select.get_events()
+        self.assertEqual([latch, recv, latch], [e.source for e in events])
+        self.assertEqual(2, events[1].data.unpickle())
+        self.assertEqual(recv, events[1].data.receiver)
+
+    def test_max_items(self):
+        latch = mitogen.core.Latch()
+        select = self.klass([latch], oneshot=False)
+        for x in range(5):
+            latch.put(x)
+        self.assertEqual([0, 1], select.get_many(max_items=2))
+        self.assertEqual([2, 3, 4], select.get_many())
+
+    def test_dead_after_events(self):
+        recv1 = mitogen.core.Receiver(self.router)
+        recv2 = mitogen.core.Receiver(self.router)
+        select = self.klass([recv1, recv2])
+        recv1._on_receive(mitogen.core.Message.pickled(1))
+        recv2._on_receive(mitogen.core.Message.dead())
+        events = select.get_events()
+        self.assertEqual([recv1], [e.source for e in events])
+        self.assertRaises(mitogen.core.ChannelError, select.get_events)
+
+    def test_iter_many(self):
+        recvs = [mitogen.core.Receiver(self.router) for x in range(3)]
+        for x, recv in enumerate(recvs):
+            recv._on_receive(mitogen.core.Message.pickled(x))
+        select = self.klass(recvs)
+        batches = list(select.iter_many())
+        self.assertEqual([0, 1, 2],
+                         [msg.unpickle() for msgs in batches for msg in msgs])
+        self.assertFalse(select)
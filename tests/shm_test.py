@@ -0,0 +1,132 @@
+import os
+import socket
+import struct
+import unittest
+
+import mitogen.core
+import mitogen.fork
+import mitogen.shm
+
+import testlib
+
+
+def echo(s):
+    return s
+
+
+class RingTest(testlib.TestCase):
+    klass = mitogen.shm.Ring
+
+    def test_wraps(self):
+        ring = self.klass(10)
+        try:
+            view = memoryview(bytearray(7))
+            for x in range(3):
+                s = mitogen.core.b(str(x)) * 7
+                self.assertEqual(10, ring.free())
+                ring.write([s[:3], s[3:]], 7)
+                ring.commit(7)
+                self.assertEqual(3, ring.free())
+                ring.read(view)
+                self.assertEqual(s, view.tobytes())
+        finally:
+            ring.close()
+
+
+class SideTest(testlib.TestCase):
+    def setUp(self):
+        super(SideTest, self).setUp()
+        self.ring = mitogen.shm.Ring(12288)
+        self.unused = mitogen.shm.Ring(4096)
+        wsock, rsock = socket.socketpair()
+        self.wstream = mitogen.shm.Stream(self.unused, self.ring)
+        self.wstream.accept(wsock, wsock)
+        self.rstream = mitogen.shm.Stream(self.ring, self.unused)
+        self.rstream.accept(rsock, rsock)
+        self.writer = self.wstream.transmit_side
+        self.reader = self.rstream.receive_side
+        self.rsock = rsock
+        self.wsock = wsock
+
+    def tearDown(self):
+        self.writer.close()
+        self.reader.close()
+        super(SideTest, self).tearDown()
+
+    def read(self, n=65536):
+        buf = bytearray(n)
+        view = memoryview(buf)
+        n = self.reader.readinto(view)
+        return bytes(buf[:n])
+
+    def test_small_inline(self):
+        self.assertEqual(3, self.writer.writev([b'abc']))
+        self.assertEqual(0, self.ring.head)
+        self.assertEqual(b'abc', self.read())
+        self.assertFalse(self.reader.pending)
+
+    def test_large_ring(self):
+        s = os.urandom(10000)
+        self.assertEqual(10000, self.writer.writev([s[:5000], s[5000:]]))
+        self.assertEqual(10000, self.ring.head)
+        self.assertEqual(s, self.read())
+        self.assertEqual(10000, self.ring.tail)
+
+    def test_ring_full_sent_inline(self):
+        s1 = os.urandom(10000)
+        s2 = os.urandom(10000)
+        self.assertEqual(10000, self.writer.writev([s1]))
+        self.assertEqual(10000, self.writer.writev([s2]))
+        self.assertEqual(10000, self.ring.head)
+        self.assertEqual(s1 + s2, self.read(20000))
+
+    def test_chunk_larger_than_buffer(self):
+        s = os.urandom(10000)
+        self.writer.writev([s])
+        self.assertEqual(s[:4000], self.read(4000))
+        self.assertTrue(self.reader.pending)
+        self.assertEqual(s[4000:8000], self.read(4000))
+        self.assertEqual(s[8000:], self.read(4000))
+        self.assertFalse(self.reader.pending)
+
+    def test_partial_header(self):
+        self.wsock.send(struct.pack('>L', 5)[:2])
+        self.assertEqual(None, self.reader.readinto(bytearray(10)))
+        self.wsock.send(struct.pack('>L', 5)[2:])
+        self.assertEqual(None, self.reader.readinto(bytearray(10)))
+        self.wsock.send(b'hello')
+        self.assertEqual(b'hello', self.read())
+
+    def test_disconnect(self):
+        self.wsock.shutdown(socket.SHUT_WR)
+        self.assertEqual(0, self.reader.readinto(bytearray(10)))
+        self.assertEqual(b'', self.reader.read())
+
+
+class ForkTest(testlib.RouterMixin, testlib.TestCase):
+    def test_roundtrip(self):
+        context = self.router.fork(shared_memory=True)
+        conn = self.router.stream_by_id(context.context_id).conn
+        for n in 0, 100, 4096, 300000, 3000000:
+            s = os.urandom(n)
+            self.assertEqual(s, context.call(echo, s))
+        self.assertTrue(conn.channel.parent_tx.head > 3000000)
+        self.assertTrue(conn.channel.parent_rx.tail > 1000000)
+
+    def test_size(self):
+        context = self.router.fork(shared_memory=8192)
+        conn = self.router.stream_by_id(context.context_id).conn
+        self.assertEqual(8192, conn.channel.parent_tx.size)
+        s = os.urandom(100000)
+        self.assertEqual(s, context.call(echo, s))
+
+    def test_via(self):
+        c1 = self.router.fork(shared_memory=True)
+        c2 = self.router.fork(via=c1, shared_memory=True)
+        s = os.urandom(100000)
+        self.assertEqual(s, c2.call(echo, s))
+
+ForkTest = unittest.skipIf(
+    condition=(not mitogen.fork.FORK_SUPPORTED),
+    reason="mitogen.fork unsupported on this platform"
+)(ForkTest)
@@ -155,6 +155,85 @@ class CancelTest(TimerListMixin, testlib.TestCase):
         self.assertEqual(0, len(timer.func.mock_calls))
 
 
+class TimerWheelMixin(TimerListMixin):
+    klass = mitogen.parent.TimerWheel
+
+
+class WheelGetTimeoutTest(TimerWheelMixin, GetTimeoutTest):
+    def test_earliest_cancelled(self):
+        self.list._now = lambda: 0
+        t1 = self.list.schedule(2, lambda: None)
+        t2 = self.list.schedule(3, lambda: None)
+        self.assertEqual(2, self.list.get_timeout())
+        t1.cancel()
+        self.assertEqual(3, self.list.get_timeout())
+
+    def test_beyond_revolution(self):
+        self.list._now = lambda: 0
+        far = self.list.resolution * self.list.size * 3
+        self.list.schedule(far + 1, lambda: None)
+        self.list.schedule(far, lambda: None)
+        self.list.schedule(1, lambda: None).cancel()
+        self.assertEqual(far, self.list.get_timeout())
+
+
+class WheelScheduleTest(TimerWheelMixin, ScheduleTest):
+    pass
+
+
+class WheelExpireTest(TimerWheelMixin, ExpireTest):
+    def test_beyond_revolution(self):
+        self.list._now = lambda: 0
+        far = self.list.resolution * self.list.size * 3
+        timer = self.list.schedule(far, mock.Mock())
+        near = self.list.schedule(far - self.list.resolution * self.list.size,
+                                  mock.Mock())
+        self.list._now = lambda: far - 1
+        self.list.expire()
+        self.assertEqual(1, len(near.func.mock_calls))
+        self.assertEqual(0, len(timer.func.mock_calls))
+        self.list._now = lambda: far
+        self.list.expire()
+        self.assertEqual(1, len(timer.func.mock_calls))
+        self.assertEqual(0, len(self.list))
+
+    def test_long_gap(self):
+        self.list._now = lambda: 0
+        timers = [self.list.schedule(x, mock.Mock()) for x in range(100)]
+        self.list._now = lambda: 1000
+        self.list.expire()
+        for timer in timers:
+            self.assertEqual(1, len(timer.func.mock_calls))
+        self.assertEqual(None, self.list.get_timeout())
+
+    def test_schedule_in_past_after_expire(self):
+        self.list._now = lambda: 10
+        self.list.schedule(20, mock.Mock())
+        self.list.expire()
+        timer = self.list.schedule(5, mock.Mock())
+        self.assertEqual(0, self.list.get_timeout())
+        self.list.expire()
+        self.assertEqual(1, len(timer.func.mock_calls))
+
+    def test_cancel_during_expire(self):
+        self.list._now = lambda: 0
+        timer2 = self.list.schedule(1, mock.Mock())
+        timer = self.list.schedule(1, timer2.cancel)
+        self.list._now = lambda: 1
+        self.list.expire()
+        self.assertEqual(0, len(self.list))
+
+
+class WheelCancelTest(TimerWheelMixin, CancelTest):
+    def test_cancel_removes(self):
+        timer = self.list.schedule(29, mock.Mock())
+        self.assertEqual(1, len(self.list))
+        timer.cancel()
+        self.assertEqual(0, len(self.list))
+        timer.cancel()
+        self.assertEqual(0, len(self.list))
+
+
 @mitogen.core.takes_econtext
 def do_timer_test_econtext(econtext):
     return do_timer_test(econtext.broker)
@@ -196,3 +275,19 @@ class BrokerTimerTest(testlib.TestCase):
             router.broker.join()
         self.assertEqual(response, 'hi')
         self.assertTrue(t1-t0 >= 0.25)
+
+
+class WheelBrokerTimerTest(testlib.TestCase):
+    def test_call_later(self):
+        class klass(mitogen.master.Broker):
+            timers_class = mitogen.parent.TimerWheel
+
+        broker = klass()
+        try:
+            self.assertIsInstance(broker.timers, mitogen.parent.TimerWheel)
+            response, t0, t1 = do_timer_test(broker)
+        finally:
+            broker.shutdown()
+            broker.join()
+        self.assertEqual(response, 'hi')
+        self.assertTrue(t1-t0 >= 0.25)
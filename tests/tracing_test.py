@@ -0,0 +1,155 @@
+import json
+import os
+import tempfile
+import time
+
+import mitogen.core
+import mitogen.tracing
+
+import testlib
+
+
+class SampleTest(testlib.RouterMixin, testlib.TestCase):
+    def get_events(self, clear=False):
+        return mitogen.tracing.get_events(clear=clear, router=self.router)
+
+    def route(self, n):
+        recv = mitogen.core.Receiver(self.router)
+        for x in range(n):
+            self.router.route(mitogen.core.Message(
+                dst_id=mitogen.context_id, handle=recv.handle,
+            ))
+        return [recv.get() for x in range(n)]
+
+    def test_disabled(self):
+        msgs = self.route(3)
+        self.assertEqual([None] * 3, [msg.trace_id for msg in msgs])
+        self.assertEqual([], self.get_events())
+
+    def test_interval(self):
+        mitogen.tracing.enable(interval=2, router=self.router)
+        msgs = self.route(4)
+        trace_ids = [msg.trace_id for msg in msgs if msg.trace_id]
+        self.assertEqual(2, len(trace_ids))
+        self.assertEqual(2, len(set(trace_ids)))
+
+        events = self.get_events()
+        self.assertEqual(
+            ['route', 'route', 'send', 'send'],
+            sorted(event for trace_id, event, ts, detail in events),
+        )
+
+    def test_clear(self):
+        mitogen.tracing.enable(interval=1, router=self.router)
+        self.route(1)
+        self.assertEqual(2, len(self.get_events(clear=True)))
+        self.assertEqual([], self.get_events())
+
+    def test_max_events(self):
+        mitogen.tracing.enable(interval=1, max_events=3, router=self.router)
+        self.route(2)
+        self.assertEqual(3, len(self.get_events()))
+
+    def test_disable(self):
+        mitogen.tracing.enable(interval=1, router=self.router)
+        self.route(1)
+        mitogen.tracing.disable(router=self.router)
+        msgs = self.route(1)
+        self.assertEqual(None, msgs[0].trace_id)
+        self.assertEqual([], self.get_events())
+
+
+class CollectTest(testlib.RouterMixin, testlib.TestCase):
+    def test_call_via_intermediary(self):
+        c1 = self.router.local(name='c1')
+        c2 = self.router.local(via=c1, name='c2')
+        c1.call(mitogen.tracing.enable)
+        c2.call(mitogen.tracing.enable)
+        mitogen.tracing.enable(interval=1, router=self.router)
+        c2.call(os.getpid)
+        mitogen.tracing.enable(interval=0, router=self.router)
+
+        events = mitogen.tracing.collect(self.router, [c1, c2])
+        trace_ids = set(tup[1] for tup in events)
+        self.assertEqual(1, len(trace_ids))
+
+        seen = set((tup[0], tup[2]) for tup in events)
+        for context_id, event in [
+                (0, 'send'), (0, 'enqueue'), (0, 'flush'),
+                (c1.context_id, 'receive'), (c1.context_id, 'enqueue'),
+                (c2.context_id, 'call_start'), (c2.context_id, 'call_end'),
+                (c2.context_id, 'enqueue'), (0, 'receive')]:
+            self.assertTrue((context_id, event) in seen, (context_id, event))
+
+        self.assertEqual([], mitogen.tracing.collect(self.router, [c1, c2]))
+
+    def test_not_enabled(self):
+        c1 = self.router.local(name='c1')
+        c1.call(os.getpid)
+        mitogen.tracing.enable(interval=1, router=self.router)
+        c1.call(os.getpid)
+        mitogen.tracing.enable(interval=0, router=self.router)
+
+        events = mitogen.tracing.collect(self.router, [c1])
+        self.assertTrue(events)
+        self.assertEqual(set([0]), set(tup[0] for tup in events))
+
+    def test_timeout(self):
+        c1 = self.router.local(name='c1')
+        c2 = self.router.local(name='c2')
+        c1.call(mitogen.tracing.enable)
+        c2.call(mitogen.tracing.enable)
+        mitogen.tracing.enable(interval=1, router=self.router)
+        c1.call(os.getpid)
+        mitogen.tracing.enable(interval=0, router=self.router)
+        c2.call_async(time.sleep, 3)
+
+        t0 = mitogen.core.now()
+        events = mitogen.tracing.collect(self.router, [c1, c2], timeout=0.5)
+        self.assertTrue(mitogen.core.now() - t0 < 2.5)
+        seen = set(tup[0] for tup in events)
+        self.assertTrue(c1.context_id in seen)
+        self.assertFalse(c2.context_id in seen)
+
+
+class ToChromeTest(testlib.TestCase):
+    events = [
+        (0, 1 << 40, 'send', 1.0, 101),
+        (0, 1 << 40, 'enqueue', 1.5, 'c1'),
+        (0, 1 << 40, 'flush', 2.0, 'c1'),
+        (1, 1 << 40, 'receive', 3.0, 'parent'),
+        (1, 1 << 40, 'call_start', 3.5, None),
+        (1, 1 << 40, 'call_end', 4.5, None),
+    ]
+
+    def test_spans(self):
+        dct = mitogen.tracing.to_chrome(self.events, {1: 'c1'})
+        trace_events = dct['traceEvents']
+        self.assertEqual(
+            {'name': 'process_name', 'ph': 'M', 'pid': 1,
+             'args': {'name': 'c1'}},
+            trace_events[0],
+        )
+        instants = [e for e in trace_events if e['ph'] == 'i']
+        self.assertEqual(6, len(instants))
+        self.assertEqual(set([1]), set(e['tid'] for e in instants))
+        self.assertEqual('%016x' % (1 << 40,), instants[0]['args']['trace_id'])
+
+        spans = [(e['name'], e['pid'], e['ts'], e['dur'])
+                 for e in trace_events if e['ph'] == 'X']
+        self.assertEqual([('write', 0, 1.5e6, 0.5e6),
+                          ('call', 1, 3.5e6, 1e6)], spans)
+
+    def test_dump(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            mitogen.tracing.dump_chrome(path, self.events)
+            fp = open(path)
+            try:
+                dct = json.load(fp)
+            finally:
+                fp.close()
+        finally:
+            os.unlink(path)
+        self.assertEqual(8, len(dct['traceEvents']))
@@ -1,3 +1,5 @@
+import binascii
+import os
 import unittest
 
 import mitogen.core
@@ -26,3 +28,12 @@ class TwoThreeCompatTest(testlib.RouterMixin, testlib.TestCase):
         spare2, = target.call(testmods.simple_pkg.ping.ping, spare)
         self.assertEqual(spare.context_id, spare2.context_id)
         self.assertEqual(spare.name, spare2.name)
+
+    def test_compressed_large_body(self):
+        # Compressed bodies above ReceiveBuffer.copy_threshold arrive as a
+        # memoryview, which Python 2's zlib does not accept.
+        data = binascii.hexlify(os.urandom(40000))
+        target = self.router.local(python_path=self.python_path,
+                                   stream_compression=6)
+        self.assertEqual(data, target.call(testmods.simple_pkg.ping.ping,
+                                           data)[0])